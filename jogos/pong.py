@@ -7,6 +7,11 @@ WIN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Pong")
 
 FPS = 60
+# Physics runs on fixed steps, independent of the render rate
+PHYSICS_HZ = 240
+PHYSICS_DT = 1 / PHYSICS_HZ
+MAX_FRAME_TIME = 0.25  # Longest stall the simulation catches up on
+MAX_BOUNCES = 4  # Collisions resolved within one physics step
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -20,7 +25,7 @@ WINNING_SCORE = 5
 
 class Paddle:
     COLOR = WHITE
-    VEL = 4
+    VEL = 240  # Pixels per second
 
     def __init__(self, x, y, width, height):
         self.x = self.original_x = x
@@ -32,11 +37,11 @@ class Paddle:
         pygame.draw.rect(
             win, self.COLOR, (self.x, self.y, self.width, self.height))
 
-    def move(self, up=True):
+    def move(self, dt, up=True):
         if up:
-            self.y -= self.VEL
+            self.y = max(0, self.y - self.VEL * dt)
         else:
-            self.y += self.VEL
+            self.y = min(HEIGHT - self.height, self.y + self.VEL * dt)
 
     def reset(self):
         self.x = self.original_x
@@ -44,7 +49,7 @@ class Paddle:
 
 
 class Ball:
-    MAX_VEL = 7
+    MAX_VEL = 420  # Pixels per second
     COLOR = WHITE
 
     def __init__(self, x, y, radius):
@@ -57,9 +62,9 @@ class Ball:
     def draw(self, win):
         pygame.draw.circle(win, self.COLOR, (self.x, self.y), self.radius)
 
-    def move(self):
-        self.x += self.x_vel
-        self.y += self.y_vel
+    def move(self, dt):
+        self.x += self.x_vel * dt
+        self.y += self.y_vel * dt
 
     def reset(self):
         self.x = self.original_x
@@ -89,45 +94,148 @@ def draw(win, paddles, ball, left_score, right_score):
     pygame.display.update()
 
 
-def handle_collision(ball, left_paddle, right_paddle):
-    if ball.y + ball.radius >= HEIGHT:
-        ball.y_vel *= -1
-    elif ball.y - ball.radius <= 0:
-        ball.y_vel *= -1
-
-    if ball.x_vel < 0:
-        if ball.y >= left_paddle.y and ball.y <= left_paddle.y + left_paddle.height:
-            if ball.x - ball.radius <= left_paddle.x + left_paddle.width:
-                ball.x_vel *= -1
-
-                middle_y = left_paddle.y + left_paddle.height / 2
-                difference_in_y = middle_y - ball.y
-                reduction_factor = (left_paddle.height / 2) / ball.MAX_VEL
-                y_vel = difference_in_y / reduction_factor
-                ball.y_vel = -1 * y_vel
-
+def circle_rect_contact(x, y, radius, rect):
+    # Surface normal and depth where a circle overlaps a rectangle, or None
+    left, top, right, bottom = rect
+    closest_x = min(max(x, left), right)
+    closest_y = min(max(y, top), bottom)
+    fx, fy = x - closest_x, y - closest_y
+    distance = (fx * fx + fy * fy) ** 0.5
+    if distance > radius:
+        return None
+    if distance > 0:
+        return (fx / distance, fy / distance), radius - distance
+
+    # Centre inside the rectangle: leave through the nearest side
+    exits = ((x - left, (-1, 0)), (right - x, (1, 0)), (y - top, (0, -1)), (bottom - y, (0, 1)))
+    depth, normal = min(exits)
+    return normal, depth + radius
+
+
+def sweep_circle_rect(x, y, dx, dy, radius, rect):
+    # Time of impact (0..1) of a circle moving from (x, y) by (dx, dy)
+    # against a rectangle, with the surface normal, or None if it misses.
+    # The circle becomes a point and the rectangle grows by the radius;
+    # near the corners the grown shape is rounded, so those hits are solved
+    # against a circle around the corner instead.
+    left, top, right, bottom = rect
+    t_enter, t_exit = -float("inf"), float("inf")
+    normal = (0, 0)
+    for start, delta, low, high, axis_normal in ((x, dx, left - radius, right + radius, (1, 0)),
+                                                 (y, dy, top - radius, bottom + radius, (0, 1))):
+        if delta == 0:
+            if start < low or start > high:
+                return None
+            continue
+        t1, t2 = (low - start) / delta, (high - start) / delta
+        side = -1
+        if t1 > t2:
+            t1, t2 = t2, t1
+            side = 1
+        if t1 > t_enter:
+            t_enter = t1
+            normal = (axis_normal[0] * side, axis_normal[1] * side)
+        t_exit = min(t_exit, t2)
+    if t_enter > t_exit or t_enter > 1 or t_exit < 0:
+        return None
+    if t_enter < 0:
+        # Starting inside the grown box: either really touching, which only
+        # counts when moving into the contact, or beside a rounded corner
+        contact = circle_rect_contact(x, y, radius, rect)
+        if contact is not None:
+            normal = contact[0]
+            if dx * normal[0] + dy * normal[1] < 0:
+                return 0, normal
+            return None
+        hit_x, hit_y = x, y
     else:
-        if ball.y >= right_paddle.y and ball.y <= right_paddle.y + right_paddle.height:
-            if ball.x + ball.radius >= right_paddle.x:
-                ball.x_vel *= -1
-
-                middle_y = right_paddle.y + right_paddle.height / 2
-                difference_in_y = middle_y - ball.y
-                reduction_factor = (right_paddle.height / 2) / ball.MAX_VEL
-                y_vel = difference_in_y / reduction_factor
-                ball.y_vel = -1 * y_vel
-
+        hit_x, hit_y = x + dx * t_enter, y + dy * t_enter
+        if left <= hit_x <= right or top <= hit_y <= bottom:
+            return t_enter, normal
+
+    corner_x = left if hit_x < left else right
+    corner_y = top if hit_y < top else bottom
+    fx, fy = x - corner_x, y - corner_y
+    a = dx * dx + dy * dy
+    b = fx * dx + fy * dy
+    c = fx * fx + fy * fy - radius * radius
+    discriminant = b * b - a * c
+    if discriminant < 0:
+        return None
+    t = (-b - discriminant ** 0.5) / a
+    if t < 0 or t > 1:
+        return None
+    return t, ((fx + dx * t) / radius, (fy + dy * t) / radius)
+
+
+def bounce_off_paddle(ball, paddle, normal):
+    if normal[0] * ball.x_vel < 0:
+        ball.x_vel *= -1
+
+        middle_y = paddle.y + paddle.height / 2
+        difference_in_y = middle_y - ball.y
+        reduction_factor = (paddle.height / 2) / ball.MAX_VEL
+        y_vel = difference_in_y / reduction_factor
+        ball.y_vel = -1 * y_vel
+    elif normal[1] * ball.y_vel < 0:
+        # Top or bottom edge of the paddle
+        ball.y_vel *= -1
 
-def handle_paddle_movement(keys, left_paddle, right_paddle):
-    if keys[pygame.K_w] and left_paddle.y - left_paddle.VEL >= 0:
-        left_paddle.move(up=True)
-    if keys[pygame.K_s] and left_paddle.y + left_paddle.VEL + left_paddle.height <= HEIGHT:
-        left_paddle.move(up=False)
 
-    if keys[pygame.K_UP] and right_paddle.y - right_paddle.VEL >= 0:
-        right_paddle.move(up=True)
-    if keys[pygame.K_DOWN] and right_paddle.y + right_paddle.VEL + right_paddle.height <= HEIGHT:
-        right_paddle.move(up=False)
+def handle_collision(ball, left_paddle, right_paddle, dt):
+    # Move the ball through one physics step, stopping at every wall or
+    # paddle hit along the way, so fast balls can't tunnel through paddles
+    remaining = 1.0
+    for _ in range(MAX_BOUNCES):
+        dx, dy = ball.x_vel * dt * remaining, ball.y_vel * dt * remaining
+        hit_time, hit = 1.0, None
+
+        if dy > 0 and ball.y + ball.radius + dy >= HEIGHT:
+            hit_time, hit = max(0, (HEIGHT - ball.radius - ball.y) / dy), "wall"
+        elif dy < 0 and ball.y - ball.radius + dy <= 0:
+            hit_time, hit = max(0, (ball.radius - ball.y) / dy), "wall"
+
+        paddle = left_paddle if ball.x_vel < 0 else right_paddle
+        rect = (paddle.x, paddle.y, paddle.x + paddle.width, paddle.y + paddle.height)
+        sweep = sweep_circle_rect(ball.x, ball.y, dx, dy, ball.radius, rect)
+        if sweep is not None and sweep[0] <= hit_time:
+            hit_time, hit = sweep[0], sweep[1]
+
+        ball.move(dt * remaining * hit_time)
+        if hit is None:
+            return
+        if hit == "wall":
+            ball.y_vel *= -1
+        else:
+            if hit_time == 0:
+                # Overlapping, e.g. a paddle moved onto the ball: push it out
+                contact = circle_rect_contact(ball.x, ball.y, ball.radius, rect)
+                if contact is not None:
+                    ball.x += hit[0] * contact[1]
+                    ball.y += hit[1] * contact[1]
+                    if ball.y < ball.radius or ball.y > HEIGHT - ball.radius:
+                        # No room between the paddle and the wall: squeeze out the front
+                        ball.y = min(max(ball.y, ball.radius), HEIGHT - ball.radius)
+                        if paddle is left_paddle:
+                            hit = (1, 0)
+                            ball.x = paddle.x + paddle.width + ball.radius
+                        else:
+                            hit = (-1, 0)
+                            ball.x = paddle.x - ball.radius
+            bounce_off_paddle(ball, paddle, hit)
+        remaining *= 1 - hit_time
+
+
+def handle_paddle_movement(keys, left_paddle, right_paddle, dt):
+    if keys[pygame.K_w]:
+        left_paddle.move(dt, up=True)
+    if keys[pygame.K_s]:
+        left_paddle.move(dt, up=False)
+
+    if keys[pygame.K_UP]:
+        right_paddle.move(dt, up=True)
+    if keys[pygame.K_DOWN]:
+        right_paddle.move(dt, up=False)
 
 
 def main():
@@ -142,9 +250,10 @@ def main():
 
     left_score = 0
     right_score = 0
+    accumulator = 0
 
     while run:
-        clock.tick(FPS)
+        accumulator += min(clock.tick(FPS) / 1000, MAX_FRAME_TIME)
         draw(WIN, [left_paddle, right_paddle], ball, left_score, right_score)
 
         for event in pygame.event.get():
@@ -152,18 +261,19 @@ def main():
                 run = False
                 break
 
+        # Keys are read once per frame and applied to every physics step
         keys = pygame.key.get_pressed()
-        handle_paddle_movement(keys, left_paddle, right_paddle)
-
-        ball.move()
-        handle_collision(ball, left_paddle, right_paddle)
-
-        if ball.x < 0:
-            right_score += 1
-            ball.reset()
-        elif ball.x > WIDTH:
-            left_score += 1
-            ball.reset()
+        while accumulator >= PHYSICS_DT:
+            accumulator -= PHYSICS_DT
+            handle_paddle_movement(keys, left_paddle, right_paddle, PHYSICS_DT)
+            handle_collision(ball, left_paddle, right_paddle, PHYSICS_DT)
+
+            if ball.x < 0:
+                right_score += 1
+                ball.reset()
+            elif ball.x > WIDTH:
+                left_score += 1
+                ball.reset()
 
         won = False
         if left_score >= WINNING_SCORE:
@@ -184,6 +294,8 @@ def main():
             right_paddle.reset()
             left_score = 0
             right_score = 0
+            accumulator = 0
+            clock.tick()
 
     pygame.quit()
 
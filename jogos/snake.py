@@ -1,10 +1,28 @@
-import pygame, sys, random, json, os
+import pygame, sys, json, os, time
 from datetime import datetime
 
+from snake_bot import SnakeBot
+from snake_engine import SnakeEngine
+from snake_replay import Ghost, Replay, ReplayRecorder
+try:
+    import numpy as np
+    from snake_arena import FREE, SnakeArena
+except ImportError:
+    # A arena precisa do NumPy; sem ele o modo arena fica desligado
+    SnakeArena = None
+
 # Config
-difficulty = 10
+difficulty = 10  # Passos da simulação por segundo
+display_fps = 60  # Leitura de input e desenho (use a taxa do monitor, ex. 144)
+turn_queue_size = 3  # Curvas guardadas entre dois passos
 block_size = 30
 
+# Arena (F3 ou --arena): muitas cobras numa grade grande, vista por viewports
+arena_cols = 240
+arena_rows = 135
+arena_bots = 300
+arena_block = 16
+
 # Inicializa Pygame
 pygame.init()
 pygame.display.set_caption('Snake')
@@ -12,6 +30,14 @@ game_window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
 frame_size_x, frame_size_y = game_window.get_size()
 clock = pygame.time.Clock()
 
+# Grade: cada célula é um índice y * grid_cols + x (regras em snake_engine)
+grid_cols = frame_size_x // block_size
+grid_rows = frame_size_y // block_size
+
+def cell_pos(index):
+    y, x = divmod(index, grid_cols)
+    return [x * block_size, y * block_size]
+
 # Cores
 colors = {
     'black': pygame.Color(0, 0, 0),
@@ -40,7 +66,8 @@ class Ranking:
         with open(self.filename, 'w') as f:
             json.dump(self.entries, f, indent=4)
 
-    def update(self, name, score):
+    def update(self, name, score, replay=None):
+        # replay: texto do snake_replay, guardado junto com o recorde
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         found = False
         for entry in self.entries:
@@ -48,10 +75,16 @@ class Ranking:
                 if score > entry['score']:
                     entry['score'] = score
                     entry['date'] = now
+                    entry.pop('replay', None)
+                    if replay:
+                        entry['replay'] = replay
                 found = True
                 break
         if not found:
-            self.entries.append({'name': name, 'score': score, 'date': now})
+            entry = {'name': name, 'score': score, 'date': now}
+            if replay:
+                entry['replay'] = replay
+            self.entries.append(entry)
         self.entries.sort(key=lambda x: x['score'], reverse=True)
         self.entries = self.entries[:self.max_entries]
         self.save()
@@ -59,29 +92,277 @@ class Ranking:
     def get_entries(self):
         return self.entries
 
+    def best_replay(self):
+        # Replay do primeiro colocado, se ele tiver um
+        if self.entries and 'replay' in self.entries[0]:
+            try:
+                return Replay.from_text(self.entries[0]['replay'])
+            except ValueError:
+                return None
+        return None
+
     def render(self, surface, pos_x, pos_y, font, color):
         for idx, entry in enumerate(self.entries):
             text = f"{idx+1}. {entry['name']} - {entry['score']} pts ({entry['date']})"
             text_surf = font.render(text, True, color)
             surface.blit(text_surf, (pos_x, pos_y + idx * 25))
 
+class SnakeRenderer:
+    # Só redesenha as células que mudaram (cabeça, cauda e comida) usando
+    # tiles pré-renderizados, e passa apenas esses retângulos para o
+    # display.update. A tela inteira só é desenhada depois de um reset.
+    # Entre dois passos a cabeça e a cauda são sprites que deslizam da
+    # célula antiga para a nova, então cada quadro mexe em poucos retângulos
+    def __init__(self, surface):
+        self.surface = surface
+        self.empty_tile = pygame.Surface((block_size, block_size)).convert()
+        self.empty_tile.fill(colors['green'])
+        self.body_tile = self.empty_tile.copy()
+        pygame.draw.rect(self.body_tile, colors['blue'], pygame.Rect(0, 0, 20, 20), border_radius=5)
+        self.food_tile = self.empty_tile.copy()
+        pygame.draw.rect(self.food_tile, colors['red'], pygame.Rect(0, 0, block_size, block_size), border_radius=50)
+        # Segmento com fundo transparente para a cabeça e a cauda em movimento
+        self.segment = pygame.Surface((20, 20), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.rect(self.segment, colors['blue'], self.segment.get_rect(), border_radius=5)
+        # Fantasma: o mesmo segmento em branco semitransparente, por cima da célula
+        self.ghost_tile = pygame.Surface((20, 20), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.rect(self.ghost_tile, (255, 255, 255, 100), self.ghost_tile.get_rect(), border_radius=5)
+        self.ghost = None
+        self.sprites = []
+
+        # Textos em cache: placar e ranking só são renderizados quando mudam
+        self.score_font = pygame.font.SysFont('consolas', 20)
+        self.ranking_font = pygame.font.SysFont('times new roman', 20)
+        self.score_surf = None
+        self.score_rect = pygame.Rect(0, 0, 0, 0)
+        self.shown_score = None
+        self.ranking_surfs = []
+
+    def cell_tile(self, engine, cell):
+        if cell == engine.body[0]:
+            # A cabeça é desenhada como sprite
+            return self.empty_tile
+        if engine.occupied[cell]:
+            return self.body_tile
+        if engine.food == cell:
+            return self.food_tile
+        return self.empty_tile
+
+    def draw_cell(self, engine, cell):
+        pos = cell_pos(cell)
+        rect = self.surface.blit(self.cell_tile(engine, cell), pos)
+        if self.ghost is not None and self.ghost.occupied[cell]:
+            self.surface.blit(self.ghost_tile, pos)
+        return rect
+
+    def draw_area(self, engine, rect):
+        # Redesenha só o retângulo: células por baixo e textos por cima
+        self.surface.set_clip(rect)
+        self.surface.fill(colors['green'], rect)
+        first_col, last_col = rect.left // block_size, min(grid_cols - 1, (rect.right - 1) // block_size)
+        first_row, last_row = rect.top // block_size, min(grid_rows - 1, (rect.bottom - 1) // block_size)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                self.draw_cell(engine, row * grid_cols + col)
+        self.surface.blits(self.sprites, doreturn=False)
+        self.surface.blits([item for item in self.hud() if item[1].colliderect(rect)], doreturn=False)
+        self.surface.set_clip(None)
+
+    def render_score(self, score):
+        self.score_surf = self.score_font.render('Pontuação: ' + str(score), True, colors['white'])
+        self.score_rect = self.score_surf.get_rect(midtop=(frame_size_x / 10, 15))
+        self.shown_score = score
+
+    def moving_sprites(self, engine, alpha):
+        # Posições interpoladas entre o passo anterior e o atual
+        def lerp(start, end):
+            x0, y0 = cell_pos(start)
+            x1, y1 = cell_pos(end)
+            return (round(x0 + (x1 - x0) * alpha), round(y0 + (y1 - y0) * alpha))
+
+        sprites = [(self.segment, lerp(engine.last_head, engine.body[0]))]
+        if engine.last_tail is not None:
+            sprites.append((self.segment, lerp(engine.last_tail, engine.body[-1])))
+        return sprites
+
+    def hud(self):
+        items = [(self.score_surf, self.score_rect)]
+        items.extend(self.ranking_surfs)
+        return items
+
+    def draw_all(self, game, alpha):
+        engine = game.engine
+        self.sprites = self.moving_sprites(engine, alpha)
+        self.surface.fill(colors['green'])
+        self.surface.blits([(self.body_tile, cell_pos(cell)) for cell in engine.body if cell != engine.body[0]],
+                           doreturn=False)
+        self.surface.blit(self.food_tile, cell_pos(engine.food))
+        if self.ghost is not None:
+            self.surface.blits([(self.ghost_tile, cell_pos(cell)) for cell in self.ghost.body], doreturn=False)
+        self.surface.blits(self.sprites, doreturn=False)
+        self.render_score(engine.score)
+        self.ranking_surfs = []
+        for idx, entry in enumerate(game.ranking.get_entries()):
+            text = f"{idx+1}. {entry['name']} - {entry['score']} pts ({entry['date']})"
+            text_surf = self.ranking_font.render(text, True, colors['white'])
+            self.ranking_surfs.append((text_surf, text_surf.get_rect(topleft=(10, 60 + idx * 25))))
+        self.surface.blits(self.hud(), doreturn=False)
+        pygame.display.update()
+
+    def draw(self, game, alpha=1.0):
+        engine = game.engine
+        self.ghost = game.ghost.engine if game.ghost is not None else None
+        if game.full_redraw:
+            game.full_redraw = False
+            game.dirty.clear()
+            self.draw_all(game, alpha)
+            return
+
+        # Onde os sprites estavam e onde vão ficar, mais as células do passo
+        old_sprites = self.sprites
+        self.sprites = self.moving_sprites(engine, alpha)
+        rects = [pygame.Rect(cell_pos(cell), (block_size, block_size)) for cell in game.dirty]
+        game.dirty.clear()
+        rects.extend(pygame.Rect(pos, self.segment.get_size()) for _, pos in old_sprites + self.sprites)
+        # O placar é refeito antes, para os retângulos já saírem com o texto novo
+        if engine.score != self.shown_score:
+            old_rect = self.score_rect
+            self.render_score(engine.score)
+            rects.append(old_rect.union(self.score_rect))
+        # Cada retângulo leva as células, os sprites e os textos por cima deles
+        for rect in rects:
+            self.draw_area(engine, rect)
+
+        pygame.display.update(rects)
+
+class ArenaRenderer:
+    # Cada jogador humano tem um viewport (tela dividida na vertical) que
+    # segue a própria cabeça. Só as células dentro do viewport são
+    # desenhadas: um recorte da grade de donos vira uma lista de blits
+    bot_palette = [(230, 120, 40), (200, 60, 160), (120, 70, 220), (40, 170, 170),
+                   (220, 200, 40), (150, 90, 40), (90, 150, 60), (230, 90, 110)]
+    player_colors = [colors['blue'], colors['white']]
+
+    def __init__(self, surface, arena):
+        self.surface = surface
+        self.arena = arena
+        self.background = pygame.Color(20, 120, 20)
+        self.bot_tiles = [self.make_tile(color) for color in self.bot_palette]
+        self.player_tiles = [self.make_tile(color) for color in self.player_colors]
+        self.head_tile = pygame.Surface((arena_block // 2, arena_block // 2)).convert()
+        self.head_tile.fill(colors['black'])
+        self.food_tile = pygame.Surface((arena_block, arena_block)).convert()
+        self.food_tile.fill(self.background)
+        pygame.draw.rect(self.food_tile, colors['red'], self.food_tile.get_rect(), border_radius=arena_block)
+        self.font = pygame.font.SysFont('consolas', 20)
+        # Última posição da câmera de cada jogador, usada enquanto ele está morto
+        self.cameras = {}
+
+    def make_tile(self, color):
+        tile = pygame.Surface((arena_block, arena_block)).convert()
+        tile.fill(self.background)
+        pygame.draw.rect(tile, color, tile.get_rect().inflate(-2, -2), border_radius=3)
+        return tile
+
+    def viewports(self, players):
+        width = frame_size_x // max(1, len(players))
+        return [(pygame.Rect(i * width, 0, width, frame_size_y), player) for i, player in enumerate(players)]
+
+    def draw_view(self, rect, player):
+        arena = self.arena
+        view_cols = rect.width // arena_block + 1
+        view_rows = rect.height // arena_block + 1
+
+        # Câmera centrada na cabeça, presa às bordas da arena
+        if arena.alive[player]:
+            hy, hx = divmod(int(arena.head[player]), arena.cols)
+            self.cameras[player] = (hx, hy)
+        hx, hy = self.cameras.get(player, (arena.cols // 2, arena.rows // 2))
+        left = min(max(0, hx - view_cols // 2), max(0, arena.cols - view_cols))
+        top = min(max(0, hy - view_rows // 2), max(0, arena.rows - view_rows))
+
+        owner = arena.owner.reshape(arena.rows, arena.cols)[top:top + view_rows, left:left + view_cols]
+        food = arena.food.reshape(arena.rows, arena.cols)[top:top + view_rows, left:left + view_cols]
+
+        self.surface.set_clip(rect)
+        self.surface.fill(colors['black'], rect)
+        self.surface.fill(self.background, pygame.Rect(rect.x, rect.y, owner.shape[1] * arena_block,
+                                                       owner.shape[0] * arena_block))
+        blits = []
+        ys, xs = np.nonzero(owner != FREE)
+        for x, y, snake in zip(xs.tolist(), ys.tolist(), owner[ys, xs].tolist()):
+            if snake < arena.humans:
+                tile = self.player_tiles[snake % len(self.player_tiles)]
+            else:
+                tile = self.bot_tiles[snake % len(self.bot_tiles)]
+            blits.append((tile, (rect.x + x * arena_block, rect.y + y * arena_block)))
+        ys, xs = np.nonzero(food)
+        blits.extend((self.food_tile, (rect.x + x * arena_block, rect.y + y * arena_block))
+                     for x, y in zip(xs.tolist(), ys.tolist()))
+
+        # Cabeças por cima, para dar para ver para onde cada cobra vai
+        heads = arena.head[arena.alive]
+        hx, hy = heads % arena.cols - left, heads // arena.cols - top
+        visible = (hx >= 0) & (hx < owner.shape[1]) & (hy >= 0) & (hy < owner.shape[0])
+        blits.extend((self.head_tile, (rect.x + x * arena_block + arena_block // 4,
+                                       rect.y + y * arena_block + arena_block // 4))
+                     for x, y in zip(hx[visible].tolist(), hy[visible].tolist()))
+        self.surface.blits(blits, doreturn=False)
+
+        if arena.alive[player]:
+            text = f'Jogador {player + 1}: tamanho {arena.length(player)}  recorde {arena.best[player]}'
+        else:
+            text = f'Jogador {player + 1}: renascendo...  recorde {arena.best[player]}'
+        self.surface.blit(self.font.render(text, True, colors['white']), (rect.x + 10, rect.y + 10))
+        self.surface.set_clip(None)
+
+    def draw(self, players):
+        for rect, player in self.viewports(players):
+            self.draw_view(rect, player)
+        alive = int(self.arena.alive.sum())
+        text = f'{alive} cobras  {clock.get_fps():.0f} FPS  WASD: jogador 2  ESC: voltar'
+        surf = self.font.render(text, True, colors['white'])
+        self.surface.blit(surf, surf.get_rect(bottomleft=(10, frame_size_y - 10)))
+        pygame.display.flip()
+
 class SnakeGame:
     def __init__(self):
+        self.renderer = SnakeRenderer(game_window)
+        # Modo fantasma (F4): o recorde do ranking corre junto, semitransparente
+        self.ghost_mode = False
         self.reset()
 
     def reset(self):
-        self.snake_pos = [block_size * 3, block_size * 3]
-        self.snake_body = [list(self.snake_pos)]
-        self.direction = 'RIGHT'
-        self.change_to = self.direction
-        self.food_pos = [random.randrange(0, frame_size_x // block_size) * block_size,
-                         random.randrange(0, frame_size_y // block_size) * block_size]
-        self.food_spawn = True
-        self.score = 0
+        # Regras na SnakeEngine (sem pygame); aqui ficam tela, input e ranking
+        self.engine = SnakeEngine(grid_cols, grid_rows, turn_queue_size=turn_queue_size)
+        # Semente + curvas com o tick de cada uma: vai para o ranking no fim
+        self.recorder = ReplayRecorder(self.engine)
+        # Piloto automático (F2); partidas com ele não entram no ranking
+        self.autopilot = None
+        self.autopilot_used = False
         self.game_over_flag = False
         self.player_name = ""
         self.input_active = False
         self.ranking = Ranking()
+        self.start_ghost()
+        # Células da cobra e do fantasma mudadas desde o último quadro
+        self.dirty = []
+        self.full_redraw = True
+
+    def start_ghost(self):
+        # O fantasma só roda se o recorde foi gravado numa grade do mesmo tamanho;
+        # se o jogo já começou, ele é adiantado até o tick atual
+        self.ghost = None
+        replay = self.ranking.best_replay() if self.ghost_mode else None
+        if replay is None or (replay.cols, replay.rows) != (grid_cols, grid_rows):
+            return
+        self.ghost = Ghost(replay)
+        while self.ghost.engine.ticks < self.engine.ticks and self.ghost.step():
+            pass
+
+    @property
+    def score(self):
+        return self.engine.score
 
     def show_score(self, pos, color, font_name, size):
         font = pygame.font.SysFont(font_name, size)
@@ -145,7 +426,9 @@ class SnakeGame:
                     if event.key == pygame.K_RETURN:
                         if self.player_name.strip() == "":
                             self.player_name = "Jogador"
-                        self.ranking.update(self.player_name.strip(), self.score)
+                        if not self.autopilot_used:
+                            self.ranking.update(self.player_name.strip(), self.score,
+                                                self.recorder.get_replay().to_text())
                         self.reset()
                         return
                     elif event.key == pygame.K_BACKSPACE:
@@ -154,71 +437,124 @@ class SnakeGame:
                         if len(self.player_name) < 15:
                             self.player_name += event.unicode
 
+    def queue_turn(self, new_direction):
+        # A engine ignora repetições, meias-voltas e curvas além da fila
+        self.engine.queue_turn(new_direction)
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN:
+                if event.key in [pygame.K_UP, ord('w')]:
+                    self.queue_turn('UP')
+                elif event.key in [pygame.K_DOWN, ord('s')]:
+                    self.queue_turn('DOWN')
+                elif event.key in [pygame.K_LEFT, ord('a')]:
+                    self.queue_turn('LEFT')
+                elif event.key in [pygame.K_RIGHT, ord('d')]:
+                    self.queue_turn('RIGHT')
+                elif event.key == pygame.K_F2:
+                    if self.autopilot is None:
+                        self.autopilot = SnakeBot()
+                        self.autopilot_used = True
+                    else:
+                        self.autopilot = None
+                elif event.key == pygame.K_F4:
+                    self.ghost_mode = not self.ghost_mode
+                    self.start_ghost()
+                    self.full_redraw = True
+                elif event.key == pygame.K_F3 and SnakeArena is not None:
+                    self.run_arena()
+                    self.full_redraw = True
+                elif event.key == pygame.K_ESCAPE:
+                    pygame.quit()
+                    sys.exit()
+
+    def step(self):
+        if self.autopilot is not None:
+            self.autopilot.steer(self.engine)
+        if self.ghost is not None:
+            running = self.ghost.step()
+            self.dirty.extend(self.ghost.engine.changed)
+            if not running:
+                # Fim do replay: o fantasma some, redesenhando as células dele
+                self.dirty.extend(self.ghost.engine.body)
+                self.ghost = None
+        alive = self.engine.step()
+        self.dirty.extend(self.engine.changed)
+        if not alive:
+            self.game_over_screen()
+
     def run(self):
+        # Input e desenho a display_fps; a simulação anda difficulty passos
+        # por segundo, pelo tempo real acumulado
+        tick_time = 1 / difficulty
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        while True:
+            self.handle_events()
+            if self.full_redraw:
+                # Voltando da arena: a cobra não anda pelo tempo que passou lá
+                accumulator = 0.0
+                last_time = time.perf_counter()
+
+            now = time.perf_counter()
+            accumulator = min(accumulator + now - last_time, tick_time * 5)
+            last_time = now
+            while accumulator >= tick_time:
+                accumulator -= tick_time
+                self.step()
+                if self.full_redraw:
+                    # Reset depois da tela de game over: recomeça a contagem
+                    accumulator = 0.0
+                    last_time = time.perf_counter()
+
+            # Desenha só o que mudou, com cabeça e cauda na fração do passo
+            self.renderer.draw(self, accumulator / tick_time)
+            clock.tick(display_fps)
+
+    def run_arena(self):
+        # Jogador 1 nas setas, jogador 2 entra ao apertar WASD; ESC volta
+        arena = SnakeArena(arena_cols, arena_rows, arena_bots, humans=2)
+        arena.activate(0)
+        renderer = ArenaRenderer(game_window, arena)
+        keys = {
+            pygame.K_UP: (0, 'UP'), pygame.K_DOWN: (0, 'DOWN'),
+            pygame.K_LEFT: (0, 'LEFT'), pygame.K_RIGHT: (0, 'RIGHT'),
+            ord('w'): (1, 'UP'), ord('s'): (1, 'DOWN'),
+            ord('a'): (1, 'LEFT'), ord('d'): (1, 'RIGHT'),
+        }
+        tick_time = 1 / difficulty
+        accumulator = 0.0
+        last_time = time.perf_counter()
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.KEYDOWN:
-                    if event.key in [pygame.K_UP, ord('w')]:
-                        self.change_to = 'UP'
-                    elif event.key in [pygame.K_DOWN, ord('s')]:
-                        self.change_to = 'DOWN'
-                    elif event.key in [pygame.K_LEFT, ord('a')]:
-                        self.change_to = 'LEFT'
-                    elif event.key in [pygame.K_RIGHT, ord('d')]:
-                        self.change_to = 'RIGHT'
-                    elif event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        sys.exit()
-
-            # Previne reversão instantânea
-            if self.change_to == 'UP' and self.direction != 'DOWN': self.direction = 'UP'
-            if self.change_to == 'DOWN' and self.direction != 'UP': self.direction = 'DOWN'
-            if self.change_to == 'LEFT' and self.direction != 'RIGHT': self.direction = 'LEFT'
-            if self.change_to == 'RIGHT' and self.direction != 'LEFT': self.direction = 'RIGHT'
-
-            # Move a cabeça
-            if self.direction == 'UP': self.snake_pos[1] -= block_size
-            if self.direction == 'DOWN': self.snake_pos[1] += block_size
-            if self.direction == 'LEFT': self.snake_pos[0] -= block_size
-            if self.direction == 'RIGHT': self.snake_pos[0] += block_size
-
-            # Atualiza corpo da cobra
-            self.snake_body.insert(0, list(self.snake_pos))
-
-            # Come comida
-            if self.snake_pos == self.food_pos:
-                self.score += 1
-                self.food_spawn = False
-            else:
-                self.snake_body.pop()
-
-            if not self.food_spawn:
-                self.food_pos = [random.randrange(0, frame_size_x // block_size) * block_size,
-                                 random.randrange(0, frame_size_y // block_size) * block_size]
-                self.food_spawn = True
-
-            # Checa colisões
-            if (self.snake_pos[0] < 0 or self.snake_pos[0] >= frame_size_x or
-                self.snake_pos[1] < 0 or self.snake_pos[1] >= frame_size_y or
-                self.snake_pos in self.snake_body[1:]):
-                self.game_over_screen()
-
-            # Desenha tudo
-            game_window.fill(colors['green'])
-            for pos in self.snake_body:
-                pygame.draw.rect(game_window, colors['blue'], pygame.Rect(pos[0], pos[1], 20, 20), border_radius=5)
-            pygame.draw.rect(game_window, colors['red'], pygame.Rect(self.food_pos[0], self.food_pos[1], block_size, block_size), border_radius=50)
+                    if event.key == pygame.K_ESCAPE:
+                        return
+                    if event.key in keys:
+                        player, direction = keys[event.key]
+                        arena.activate(player)
+                        arena.queue_turn(player, direction)
 
-            self.show_score(1, colors['white'], 'consolas', 20)
-            self.ranking.render(game_window, 10, 60, pygame.font.SysFont('times new roman', 20), colors['white'])
+            now = time.perf_counter()
+            accumulator = min(accumulator + now - last_time, tick_time * 5)
+            last_time = now
+            while accumulator >= tick_time:
+                accumulator -= tick_time
+                arena.step()
 
-            pygame.display.update()
-            clock.tick(difficulty)
+            renderer.draw([player for player in range(arena.humans) if arena.active[player]])
+            clock.tick(display_fps)
 
 
 if __name__ == "__main__":
     game = SnakeGame()
+    if '--arena' in sys.argv and SnakeArena is not None:
+        game.run_arena()
     game.run()
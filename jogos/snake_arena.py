@@ -0,0 +1,288 @@
+"""Many snakes on one shared grid.
+
+SnakeArena runs hundreds of snakes (bots and human players) on a single
+large grid with the same movement rules as SnakeEngine. The grid stores
+the id of the snake on each cell, so every collision is a lookup. A tick
+is resolved for all snakes at once:
+
+1. every snake picks its direction (bots in one vectorized pass),
+2. tails of the snakes that are not eating leave the grid,
+3. heads outside the grid, on an occupied cell, or on the same cell as
+   another head or swapping cells with it (head-on) die together,
+4. survivors enter their new cells; dead bodies turn partly into food.
+
+Dead snakes respawn after a short delay on a random free cell.
+
+    python jogos/snake_arena.py --bots 500 --cols 300 --rows 200 --ticks 2000
+"""
+import argparse
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+import numpy as np
+
+from snake_engine import OPPOSITE, TURN_QUEUE_SIZE
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+DIRECTION_DX = np.array([0, 0, -1, 1], dtype=np.int64)
+DIRECTION_DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+TURN_LEFT = np.array([2, 3, 1, 0], dtype=np.int64)   # UP->LEFT, DOWN->RIGHT, ...
+TURN_RIGHT = np.array([3, 2, 0, 1], dtype=np.int64)  # UP->RIGHT, DOWN->LEFT, ...
+
+FREE = -1
+RESPAWN_TICKS = 10
+FOOD_DENSITY = 1 / 40  # Food kept on the grid, per cell
+BOT_NOISE = 0.3  # Random tie-breaking so bots don't all move alike
+BOT_RETARGET_TICKS = 16  # Bots look for the nearest food again this often
+HEAD_ON_COST = 8  # Penalty for a cell another head can also reach next tick
+
+
+class SnakeArena:
+    """Shared grid with bot snakes and up to a few human-controlled ones
+
+    Snakes 0 .. humans - 1 belong to human players and only play once
+    activated; the rest are bots.
+    """
+
+    def __init__(self, cols: int, rows: int, bots: int, humans: int = 1,
+                 seed: Optional[int] = None, food_density: float = FOOD_DENSITY):
+        self.cols = cols
+        self.rows = rows
+        self.size = cols * rows
+        self.humans = humans
+        self.count = humans + bots
+        self.food_target = max(1, int(self.size * food_density))
+        self.rng = np.random.default_rng(seed)
+
+        self.owner = np.full(self.size, FREE, dtype=np.int32)  # Snake on each cell
+        self.food = np.zeros(self.size, dtype=bool)
+        self.food_count = 0
+
+        self.bodies: List[Deque[int]] = [deque() for _ in range(self.count)]
+        self.head = np.zeros(self.count, dtype=np.int64)
+        self.direction = np.zeros(self.count, dtype=np.int64)
+        self.alive = np.zeros(self.count, dtype=bool)
+        self.active = np.ones(self.count, dtype=bool)
+        self.active[:humans] = False
+        self.score = np.zeros(self.count, dtype=np.int64)
+        self.best = np.zeros(self.count, dtype=np.int64)
+        self.respawn = np.zeros(self.count, dtype=np.int64)
+        self.target = np.zeros(self.count, dtype=np.int64)  # Food cell each bot is after
+        self.turns: List[Deque[int]] = [deque() for _ in range(humans)]
+
+        # Statistics
+        self.ticks = 0
+        self.deaths = 0
+        self.head_on = 0
+
+        for snake in range(humans, self.count):
+            self.spawn(snake)
+        self.refill_food()
+
+    def activate(self, snake: int) -> None:
+        """Let a human player join"""
+        if not self.active[snake]:
+            self.active[snake] = True
+            self.spawn(snake)
+
+    def random_free_cell(self, margin: int = 2) -> Optional[int]:
+        """A random free cell away from the walls, None if none was found quickly"""
+        for _ in range(64):
+            x = int(self.rng.integers(margin, max(margin + 1, self.cols - margin)))
+            y = int(self.rng.integers(margin, max(margin + 1, self.rows - margin)))
+            cell = y * self.cols + x
+            if self.owner[cell] == FREE and not self.food[cell]:
+                return cell
+        return None
+
+    def spawn(self, snake: int) -> bool:
+        """Place a one-cell snake on a random free cell"""
+        cell = self.random_free_cell()
+        if cell is None:
+            self.respawn[snake] = RESPAWN_TICKS
+            return False
+        self.bodies[snake] = deque([cell])
+        self.owner[cell] = snake
+        self.head[snake] = cell
+        self.direction[snake] = self.rng.integers(len(DIRECTIONS))
+        self.alive[snake] = True
+        self.score[snake] = 0
+        self.target[snake] = cell
+        if snake < self.humans:
+            self.turns[snake].clear()
+        return True
+
+    def refill_food(self) -> None:
+        """Spawn food on random free cells until the target amount is on the grid"""
+        missing = self.food_target - self.food_count
+        if missing <= 0:
+            return
+        cells = self.rng.integers(0, self.size, size=missing * 2)
+        cells = np.unique(cells[(self.owner[cells] == FREE) & ~self.food[cells]])[:missing]
+        self.food[cells] = True
+        self.food_count += len(cells)
+
+    def queue_turn(self, snake: int, direction: str) -> None:
+        """Queue a human turn, with the same rules as SnakeEngine.queue_turn"""
+        turns = self.turns[snake]
+        last = DIRECTIONS[turns[-1] if turns else self.direction[snake]]
+        if direction in (last, OPPOSITE[last]) or len(turns) >= TURN_QUEUE_SIZE:
+            return
+        turns.append(DIRECTIONS.index(direction))
+
+    def steer_bots(self) -> None:
+        """Point every live bot at its food target, avoiding occupied cells
+
+        Each bot compares going straight, left and right: cells off the
+        grid or occupied are ruled out, the rest are ranked by Manhattan
+        distance to the target, preferring cells with free neighbours and
+        avoiding cells another head could enter on the same tick. Targets
+        are refreshed to the nearest food when eaten, and otherwise for a
+        rotating slice of the bots each tick.
+        """
+        bots = np.flatnonzero(self.alive[self.humans:]) + self.humans
+        if not len(bots):
+            return
+        heads = self.head[bots]
+        hx, hy = heads % self.cols, heads // self.cols
+
+        stale = ~self.food[self.target[bots]] | (bots % BOT_RETARGET_TICKS == self.ticks % BOT_RETARGET_TICKS)
+        foods = np.flatnonzero(self.food)
+        if stale.any() and len(foods):
+            fx, fy = foods % self.cols, foods // self.cols
+            distance = np.abs(hx[stale, None] - fx) + np.abs(hy[stale, None] - fy)
+            self.target[bots[stale]] = foods[distance.argmin(axis=1)]
+        tx, ty = self.target[bots] % self.cols, self.target[bots] // self.cols
+
+        current = self.direction[bots]
+        options = np.stack([current, TURN_LEFT[current], TURN_RIGHT[current]], axis=1)
+        x = hx[:, None] + DIRECTION_DX[options]
+        y = hy[:, None] + DIRECTION_DY[options]
+        inside = (x >= 0) & (x < self.cols) & (y >= 0) & (y < self.rows)
+        cells = np.where(inside, y * self.cols + x, 0)
+        free = inside & (self.owner[cells] == FREE)
+
+        # Free neighbours of each option, so bots avoid pockets
+        room = np.zeros(options.shape, dtype=np.int64)
+        for dx, dy in zip(DIRECTION_DX, DIRECTION_DY):
+            nx, ny = x + dx, y + dy
+            ok = (nx >= 0) & (nx < self.cols) & (ny >= 0) & (ny < self.rows)
+            room += ok & (self.owner[np.where(ok, ny * self.cols + nx, 0)] == FREE)
+
+        # Cells next to two or more heads (the bot's own included) risk a head-on
+        live_heads = self.head[self.alive]
+        near_heads = np.zeros(self.size + 1, dtype=np.int64)
+        for dx, dy in zip(DIRECTION_DX, DIRECTION_DY):
+            nx, ny = live_heads % self.cols + dx, live_heads // self.cols + dy
+            ok = (nx >= 0) & (nx < self.cols) & (ny >= 0) & (ny < self.rows)
+            np.add.at(near_heads, np.where(ok, ny * self.cols + nx, self.size), 1)
+        contested = near_heads[cells] > 1
+
+        cost = np.abs(x - tx[:, None]) + np.abs(y - ty[:, None]) - room + contested * HEAD_ON_COST
+        cost = cost + self.rng.random(options.shape) * BOT_NOISE
+        cost[~free] = np.inf
+        self.direction[bots] = options[np.arange(len(bots)), cost.argmin(axis=1)]
+
+    def step(self) -> None:
+        """Advance every snake by one tick"""
+        self.ticks += 1
+        self.steer_bots()
+        for snake, turns in enumerate(self.turns):
+            if turns and self.alive[snake]:
+                self.direction[snake] = turns.popleft()
+
+        movers = np.flatnonzero(self.alive)
+        heads = self.head[movers]
+        direction = self.direction[movers]
+        x = heads % self.cols + DIRECTION_DX[direction]
+        y = heads // self.cols + DIRECTION_DY[direction]
+        hit_wall = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        new_heads = np.where(hit_wall, 0, y * self.cols + x)
+        ate = ~hit_wall & self.food[new_heads]
+
+        # Tails leave before heads enter, except for snakes that grow
+        tails = [self.bodies[snake].pop() for snake in movers[~ate].tolist()]
+        self.owner[tails] = FREE
+
+        # Heads meeting on the same cell all die
+        entering = new_heads[~hit_wall]
+        _, inverse, counts = np.unique(entering, return_inverse=True, return_counts=True)
+        head_on = np.zeros(len(movers), dtype=bool)
+        head_on[~hit_wall] = counts[inverse] > 1
+
+        # So do heads swapping cells, which the tails leaving first would allow
+        order = np.argsort(heads)
+        other = order[np.searchsorted(heads, new_heads, sorter=order).clip(max=len(heads) - 1)]
+        swapped = ~hit_wall & (heads[other] == new_heads) & (new_heads[other] == heads) & ~hit_wall[other]
+        head_on |= swapped
+        dead = hit_wall | head_on | (~hit_wall & (self.owner[new_heads] != FREE))
+        self.head_on += int(head_on.sum())
+
+        survivors = ~dead
+        winners, cells = movers[survivors], new_heads[survivors]
+        self.owner[cells] = winners
+        self.head[winners] = cells
+        for snake, cell in zip(winners.tolist(), cells.tolist()):
+            self.bodies[snake].appendleft(cell)
+
+        eaten = cells[ate[survivors]]
+        self.food[eaten] = False
+        self.food_count -= len(eaten)
+        self.score[winners[ate[survivors]]] += 1
+        np.maximum(self.best, self.score, out=self.best)
+
+        for snake in movers[dead].tolist():
+            self.kill(snake)
+
+        waiting = np.flatnonzero(~self.alive & self.active)
+        self.respawn[waiting] -= 1
+        for snake in waiting[self.respawn[waiting] <= 0].tolist():
+            self.spawn(snake)
+        self.refill_food()
+
+    def kill(self, snake: int) -> None:
+        """Remove a snake, leaving food on every other cell of its body"""
+        body = np.fromiter(self.bodies[snake], dtype=np.int64)
+        self.bodies[snake] = deque()
+        self.owner[body] = FREE
+        remains = body[1::2]
+        remains = remains[~self.food[remains]]
+        self.food[remains] = True
+        self.food_count += len(remains)
+        self.alive[snake] = False
+        self.respawn[snake] = RESPAWN_TICKS
+        self.deaths += 1
+
+    def length(self, snake: int) -> int:
+        """Number of cells of a snake"""
+        return len(self.bodies[snake])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless Snake arena benchmark")
+    parser.add_argument("--bots", type=int, default=300, help="bot snakes")
+    parser.add_argument("--cols", type=int, default=240, help="grid width")
+    parser.add_argument("--rows", type=int, default=135, help="grid height")
+    parser.add_argument("--ticks", type=int, default=1000, help="ticks to simulate")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    arena = SnakeArena(args.cols, args.rows, args.bots, humans=0, seed=args.seed)
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        arena.step()
+    elapsed = time.perf_counter() - start
+
+    lengths = [arena.length(snake) for snake in range(arena.count)]
+    print(f"Snakes:        {arena.count} on {args.cols}x{args.rows}")
+    print(f"Ticks:         {arena.ticks}")
+    print(f"Time:          {elapsed:.2f}s")
+    print(f"Ticks/s:       {arena.ticks / elapsed:.0f}")
+    print(f"Snake moves/s: {arena.ticks * arena.count / elapsed:.0f}")
+    print(f"Deaths:        {arena.deaths} ({arena.head_on} head-on)")
+    print(f"Longest:       {max(lengths)} (best score {arena.best.max()})")
+
+
+if __name__ == "__main__":
+    main()
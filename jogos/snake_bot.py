@@ -0,0 +1,358 @@
+"""Pathfinding autopilot for Snake.
+
+The bot runs a breadth-first search from the head to the food over the
+SnakeEngine grid. The search knows when each body cell will be vacated:
+the segment k cells from the tail is gone after k + 1 steps, so paths may
+run through cells the tail is about to leave. A path is only taken if,
+after eating, the head can still reach the tail; the path is then followed
+without searching again until the food moves.
+
+When the grid has a Hamiltonian cycle (cols or rows even) and the body
+lies on it in order, the bot keeps it that way: the head only moves to
+cells ahead of it on the cycle and short of the tail, so the region in
+front of the head is always empty and the snake can never be trapped. The
+search result is used when its first move is such a shortcut toward the
+food; otherwise the bot takes the shortcut that gets closest to the food
+along the cycle, which in the worst case is just the next cycle cell.
+
+Without a usable cycle a path is only taken if the tail stays reachable,
+then the bot chases its own tail, and finally takes the move that keeps
+the most room.
+
+    python jogos/snake_bot.py --games 5 --cols 40 --rows 30
+"""
+import argparse
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from snake_engine import OPPOSITE, SnakeEngine
+
+
+def neighbor_table(cols: int, rows: int) -> List[Tuple[int, ...]]:
+    """Cells adjacent to every cell, inside the walls"""
+    table = []
+    for cell in range(cols * rows):
+        y, x = divmod(cell, cols)
+        adjacent = []
+        if y > 0:
+            adjacent.append(cell - cols)
+        if y < rows - 1:
+            adjacent.append(cell + cols)
+        if x > 0:
+            adjacent.append(cell - 1)
+        if x < cols - 1:
+            adjacent.append(cell + 1)
+        table.append(tuple(adjacent))
+    return table
+
+
+def hamiltonian_cycle(cols: int, rows: int) -> Optional[List[int]]:
+    """Every cell of the grid in the order of a cycle through all of them
+
+    Row 0 runs right, the remaining columns are swept back and forth and
+    column 0 leads back up to the start. Needs an even number of rows, so
+    the grid is transposed when only cols is even; None when both are odd.
+    """
+    if rows % 2 and cols % 2:
+        return None
+    transpose = rows % 2 == 1
+    width, height = (rows, cols) if transpose else (cols, rows)
+    if width < 2 or height < 2:
+        return None
+
+    order = [(x, 0) for x in range(width)]
+    for y in range(1, height):
+        columns = range(width - 1, 0, -1) if y % 2 else range(1, width)
+        order.extend((x, y) for x in columns)
+    order.extend((0, y) for y in range(height - 1, 0, -1))
+
+    return [x * cols + y if transpose else y * cols + x for x, y in order]
+
+
+class SnakeBot:
+    """Steers a SnakeEngine toward the food without trapping itself"""
+
+    def __init__(self):
+        # Grid tables, rebuilt when the bot meets a grid of another size
+        self._shape: Tuple[int, int] = (0, 0)
+        self._neighbors: List[Tuple[int, ...]] = []
+        self._cycle: Optional[List[int]] = None  # Position of every cell on the cycle
+
+        # Engine being played and its tick count on the last call
+        self._engine: Optional[SnakeEngine] = None
+        self._ticks = 0
+
+        # Path being followed and the food it leads to
+        self._path: Deque[int] = deque()
+        self._food: Optional[int] = None
+
+        # Cell the head was sent to and whether the body lies on the cycle in order
+        self._expected: Optional[int] = None
+        self._aligned = False
+
+        # Score seen last and the tick it changed, to detect loops
+        self._score = -1
+        self._fed_tick = 0
+
+        # Planning statistics
+        self.plans = 0
+        self.plan_time = 0.0
+        self.cycle_moves = 0
+
+    def _prepare(self, engine: SnakeEngine) -> None:
+        """Build the grid tables and forget the last game when the engine changes"""
+        if engine is not self._engine or engine.ticks < self._ticks:
+            self._engine = engine
+            self._path.clear()
+            self._expected = None
+            self._score = -1
+        self._ticks = engine.ticks
+        shape = (engine.cols, engine.rows)
+        if shape != self._shape:
+            self._shape = shape
+            self._neighbors = neighbor_table(engine.cols, engine.rows)
+            cycle = hamiltonian_cycle(engine.cols, engine.rows)
+            self._cycle = None
+            if cycle is not None:
+                self._cycle = [0] * len(cycle)
+                for position, cell in enumerate(cycle):
+                    self._cycle[cell] = position
+
+    def _search(self, body: List[int], goal: int, back: Optional[int]) -> Optional[List[int]]:
+        """Shortest path from body[0] to goal, as the cells entered in order
+
+        body lists the snake from head to tail. A body cell can be entered
+        once the tail has moved past it; back is the cell behind the head,
+        which the first move may not enter.
+        """
+        length = len(body)
+        vacated: Dict[int, int] = {cell: length - i for i, cell in enumerate(body)}
+        start = body[0]
+        neighbors = self._neighbors
+        parent = {start: start}
+        frontier = [start]
+        steps = 0
+        while frontier:
+            steps += 1
+            next_frontier = []
+            for cell in frontier:
+                for adjacent in neighbors[cell]:
+                    if adjacent in parent or vacated.get(adjacent, 0) > steps:
+                        continue
+                    if steps == 1 and adjacent == back:
+                        continue
+                    parent[adjacent] = cell
+                    if adjacent == goal:
+                        path = [adjacent]
+                        while parent[path[-1]] != start:
+                            path.append(parent[path[-1]])
+                        path.reverse()
+                        return path
+                    next_frontier.append(adjacent)
+            frontier = next_frontier
+        return None
+
+    def _safe(self, body: List[int], path: List[int], grows: bool) -> bool:
+        """Whether the tail is still reachable after following path"""
+        moved = list(reversed(path)) + body
+        new_body = moved[:len(body) + (1 if grows else 0)]
+        if len(new_body) < 2:
+            return True
+        return self._search(new_body, new_body[-1], new_body[1]) is not None
+
+    def _room(self, engine: SnakeEngine, start: int) -> int:
+        """Number of free cells reachable from start, ignoring the tail moving"""
+        occupied = engine.occupied
+        seen = {start}
+        stack = [start]
+        while stack:
+            for adjacent in self._neighbors[stack.pop()]:
+                if adjacent not in seen and not occupied[adjacent]:
+                    seen.add(adjacent)
+                    stack.append(adjacent)
+        return len(seen)
+
+    def _ahead(self, start: int, end: int) -> int:
+        """Steps along the cycle from start to end"""
+        return (self._cycle[end] - self._cycle[start]) % len(self._cycle)
+
+    def _on_cycle(self, body: List[int]) -> bool:
+        """Whether the body runs forward along the cycle from tail to head"""
+        total = 0
+        for i in range(len(body) - 1):
+            total += self._ahead(body[i + 1], body[i])
+        return total < len(self._cycle)
+
+    def _plan_cycle(self, engine: SnakeEngine, body: List[int], back: Optional[int]) -> int:
+        """Next cell that keeps the body in cycle order, heading for the food"""
+        head, food = body[0], engine.food
+        limit = self._ahead(head, body[-1]) if len(body) > 1 else len(self._cycle)
+
+        def allowed(cell: int) -> bool:
+            return cell != back and 0 < self._ahead(head, cell) < max(limit, 2)
+
+        # Only search when the food lies in the empty stretch ahead of the head
+        to_food = self._ahead(head, food)
+        if to_food < limit and (not self._path or self._food != food or
+                                self._path[0] not in self._neighbors[head]):
+            path = self._search(body, food, back)
+            self._path = deque(path or ())
+            self._food = food
+        if self._path and allowed(self._path[0]) and self._ahead(self._path[0], food) < to_food:
+            return self._path.popleft()
+
+        self._path.clear()
+        self.cycle_moves += 1
+        best, best_distance = None, None
+        for cell in self._neighbors[head]:
+            if allowed(cell):
+                distance = self._ahead(cell, food)
+                if best is None or distance < best_distance:
+                    best, best_distance = cell, distance
+        return best
+
+    def _plan(self, engine: SnakeEngine) -> Optional[int]:
+        """Choose the next cell for the head"""
+        body = list(engine.body)
+        head = body[0]
+        back = engine.neighbor(head, OPPOSITE[engine.direction])
+
+        if self._cycle is not None:
+            if head != self._expected:
+                # Someone else moved the snake: check the body again
+                self._aligned = self._on_cycle(body)
+            if self._aligned:
+                return self._plan_cycle(engine, body, back)
+
+        # After a whole grid's worth of ticks without food the stall is a
+        # loop, so an unsafe path is better than circling forever
+        if engine.score != self._score:
+            self._score, self._fed_tick = engine.score, engine.ticks
+        stalled = engine.ticks - self._fed_tick > engine.size
+
+        path = self._search(body, engine.food, back)
+        if path and (stalled or self._safe(body, path, True)):
+            self._path = deque(path)
+            self._food = engine.food
+            return self._path.popleft()
+
+        # Stall: of the moves that keep the tail reachable, take the one
+        # farthest from the food so the body reshapes instead of circling
+        fx, fy = engine.position(engine.food)
+        best, best_distance = None, -1
+        for cell in self._neighbors[head]:
+            if cell == back or (engine.occupied[cell] and cell != body[-1]):
+                continue
+            if not self._safe(body, [cell], False):
+                continue
+            x, y = engine.position(cell)
+            distance = abs(x - fx) + abs(y - fy)
+            if distance > best_distance:
+                best, best_distance = cell, distance
+        if best is not None:
+            return best
+
+        # Trapped: pick the open neighbour with the most room around it
+        best, best_room = None, -1
+        for cell in self._neighbors[head]:
+            if cell == back or (engine.occupied[cell] and cell != body[-1]):
+                continue
+            room = self._room(engine, cell)
+            if room > best_room:
+                best, best_room = cell, room
+        return best
+
+    def next_cell(self, engine: SnakeEngine) -> Optional[int]:
+        """Cell the head should enter on the next step"""
+        self._prepare(engine)
+        if not self._aligned and self._path and self._food == engine.food and \
+                self._path[0] in self._neighbors[engine.head]:
+            cell = self._path.popleft()
+        else:
+            start = time.perf_counter()
+            cell = self._plan(engine)
+            self.plans += 1
+            self.plan_time += time.perf_counter() - start
+        self._expected = cell
+        return cell
+
+    def steer(self, engine: SnakeEngine) -> None:
+        """Replace the queued turns with the move toward the next cell"""
+        cell = self.next_cell(engine)
+        engine.turns.clear()
+        if cell is None:
+            return
+        delta = cell - engine.head
+        if delta == 1:
+            direction = "RIGHT"
+        elif delta == -1:
+            direction = "LEFT"
+        elif delta == engine.cols:
+            direction = "DOWN"
+        else:
+            direction = "UP"
+        engine.queue_turn(direction)
+
+
+def play_game(bot: SnakeBot, cols: int, rows: int, seed: int, max_ticks: int,
+              buckets: List[List[float]]) -> Tuple[SnakeEngine, float]:
+    """Let the bot play one seeded game, returning it and the engine time
+
+    buckets holds [ticks, planning seconds] per tenth of the grid filled.
+    """
+    engine = SnakeEngine(cols, rows, seed=seed)
+    engine_time = 0.0
+    while engine.alive and engine.ticks < max_ticks:
+        plan_time = bot.plan_time
+        bot.steer(engine)
+        bucket = buckets[min(9, len(engine.body) * 10 // engine.size)]
+        bucket[0] += 1
+        bucket[1] += bot.plan_time - plan_time
+
+        start = time.perf_counter()
+        engine.step()
+        engine_time += time.perf_counter() - start
+    return engine, engine_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless Snake autopilot benchmark")
+    parser.add_argument("--games", type=int, default=5, help="games to play")
+    parser.add_argument("--seed", type=int, default=0, help="first game seed")
+    parser.add_argument("--cols", type=int, default=20, help="grid width")
+    parser.add_argument("--rows", type=int, default=20, help="grid height")
+    parser.add_argument("--max-ticks", type=int, default=200000, help="tick limit per game")
+    args = parser.parse_args()
+
+    bot = SnakeBot()
+    buckets = [[0, 0.0] for _ in range(10)]
+    scores, wins, ticks = [], 0, 0
+    engine_time = 0.0
+    start = time.perf_counter()
+    for i in range(args.games):
+        engine, elapsed = play_game(bot, args.cols, args.rows, args.seed + i, args.max_ticks, buckets)
+        scores.append(engine.score)
+        wins += engine.won
+        ticks += engine.ticks
+        engine_time += elapsed
+    elapsed = time.perf_counter() - start
+
+    print(f"Games:         {args.games} on {args.cols}x{args.rows}")
+    print(f"Scores:        {scores}")
+    print(f"Grids filled:  {wins}")
+    print(f"Ticks:         {ticks}")
+    print(f"Time:          {elapsed:.2f}s")
+    print(f"Ticks/s:       {ticks / elapsed:.0f}")
+    print(f"Engine only:   {ticks / max(engine_time, 1e-9):.0f} ticks/s")
+    print(f"Plans:         {bot.plans} ({bot.plan_time / max(1, bot.plans) * 1e6:.0f} us each)")
+    print(f"Cycle moves:   {bot.cycle_moves}")
+    print()
+    print(f"{'Length':>10} {'Ticks':>10} {'Plan us/tick':>13}")
+    for i, (count, plan_time) in enumerate(buckets):
+        if count:
+            print(f"{i * 10:>4}-{i * 10 + 10:>3}% {count:>10} {plan_time / count * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
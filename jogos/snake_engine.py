@@ -0,0 +1,176 @@
+"""Pygame-free Snake rules.
+
+SnakeEngine holds the same rules as the windowed SnakeGame (walls kill,
+the tail leaves before the head enters, at most one queued turn per step,
+food spawns uniformly on a free cell) on a grid of any size. Cells are
+indices y * cols + x; the body is a deque of cells with the head on the
+left, backed by an occupancy bytearray and a FreeCells index so every step
+is O(1). The engine is stepped explicitly, which lets bots, benchmarks and
+soak tests run it as fast as the CPU allows.
+"""
+import random
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+DIRECTIONS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+OPPOSITE = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+TURN_QUEUE_SIZE = 3  # Turns kept between two steps
+START_CELL = (3, 3)
+
+
+class FreeCells:
+    """Set of free cells with O(1) add, remove and uniform random choice
+
+    Free cells live in a dense list and each cell remembers its position in
+    it; removing swaps the last element into the hole.
+    """
+
+    def __init__(self, size: int):
+        self.cells = list(range(size))
+        self.position = list(range(size))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def add(self, cell: int) -> None:
+        """Mark a cell as free"""
+        self.position[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def remove(self, cell: int) -> None:
+        """Mark a free cell as taken"""
+        i = self.position[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.position[last] = i
+
+    def choice(self, rng: random.Random) -> int:
+        """Pick a free cell uniformly"""
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class SnakeEngine:
+    """One Snake game on a cols x rows grid, advanced one step at a time"""
+
+    def __init__(self, cols: int, rows: int, seed: Optional[int] = None,
+                 turn_queue_size: int = TURN_QUEUE_SIZE):
+        self.cols = cols
+        self.rows = rows
+        self.size = cols * rows
+        self.turn_queue_size = turn_queue_size
+        self.seed = 0
+        self.rng = random.Random()
+        self.recorder: Any = None  # Gets record(tick, direction) for every turn taken
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """Start a new game, with a fresh food seed if none is given"""
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng.seed(seed)
+        start = self.index(min(START_CELL[0], self.cols - 1), min(START_CELL[1], self.rows - 1))
+        self.body: Deque[int] = deque([start])
+        self.occupied = bytearray(self.size)
+        self.occupied[start] = 1
+        self.free = FreeCells(self.size)
+        self.free.remove(start)
+        self.direction = "RIGHT"
+        self.turns: Deque[str] = deque()
+        self.score = 0
+        self.ticks = 0
+        self.alive = True
+        self.won = False
+
+        # Head and tail before the last step, for interpolated drawing
+        self.last_head = start
+        self.last_tail: Optional[int] = None
+
+        # Cells changed by the last step, for redrawing only those
+        self.changed: List[int] = []
+        self.spawn_food()
+
+    def index(self, x: int, y: int) -> int:
+        """Cell index of a grid position"""
+        return y * self.cols + x
+
+    def position(self, cell: int) -> Tuple[int, int]:
+        """Grid position (x, y) of a cell index"""
+        y, x = divmod(cell, self.cols)
+        return x, y
+
+    @property
+    def head(self) -> int:
+        """Cell of the head"""
+        return self.body[0]
+
+    def spawn_food(self) -> None:
+        """Put the food on a uniformly chosen free cell"""
+        self.food = self.free.choice(self.rng)
+
+    def neighbor(self, cell: int, direction: str) -> Optional[int]:
+        """Cell next to cell in a direction, None past a wall"""
+        dx, dy = DIRECTIONS[direction]
+        x, y = self.position(cell)
+        x += dx
+        y += dy
+        if x < 0 or x >= self.cols or y < 0 or y >= self.rows:
+            return None
+        return y * self.cols + x
+
+    def queue_turn(self, direction: str) -> bool:
+        """Queue a turn, ignoring repeats, reversals and a full queue"""
+        last = self.turns[-1] if self.turns else self.direction
+        if direction in (last, OPPOSITE[last]) or len(self.turns) >= self.turn_queue_size:
+            return False
+        self.turns.append(direction)
+        return True
+
+    def step(self) -> bool:
+        """Advance one tick, returning whether the snake is still alive"""
+        self.changed.clear()
+        if not self.alive:
+            return False
+        self.ticks += 1
+        if self.turns:
+            self.direction = self.turns.popleft()
+            if self.recorder is not None:
+                self.recorder.record(self.ticks, self.direction)
+        self.last_head = self.body[0]
+        self.last_tail = None
+
+        head = self.neighbor(self.body[0], self.direction)
+        if head is None:
+            self.alive = False
+            return False
+
+        ate = head == self.food
+        if ate:
+            self.score += 1
+        else:
+            # The tail leaves before the head enters, so following it is allowed
+            tail = self.body.pop()
+            self.occupied[tail] = 0
+            self.free.add(tail)
+            self.last_tail = tail
+            self.changed.append(tail)
+
+        if self.occupied[head]:
+            self.alive = False
+            return False
+        self.body.appendleft(head)
+        self.occupied[head] = 1
+        self.free.remove(head)
+        self.changed.append(self.last_head)
+        self.changed.append(head)
+
+        if ate:
+            if not len(self.free):
+                # The snake fills the whole grid
+                self.won = True
+                self.alive = False
+                return False
+            self.spawn_food()
+            self.changed.append(self.food)
+        return True
@@ -0,0 +1,171 @@
+"""Compact Snake replays and ghost playback.
+
+A Snake game is fully determined by its food seed, the grid size and the
+turns the snake took, so a replay only stores those. The binary layout
+follows the Tetris replays:
+
+    b"SRP" | format version (1 byte)
+    varint seed, cols, rows
+    varint turn count, then one varint per turn:
+        (ticks since previous turn << 2) | index in DIRECTION_ORDER
+    varint final tick
+
+A typical run is a few hundred bytes. Recording is one list append per
+turn taken; a Ghost re-runs the replay in its own SnakeEngine one tick at a
+time next to a live game.
+
+    python jogos/snake_replay.py ranking_snake.json
+"""
+import argparse
+import base64
+import json
+import time
+from typing import List, Tuple
+
+from snake_engine import DIRECTIONS, SnakeEngine
+from varint import read_varint, write_varint
+
+MAGIC = b"SRP"
+FORMAT_VERSION = 1
+DIRECTION_BITS = 2
+DIRECTION_ORDER = tuple(DIRECTIONS)
+
+
+class Replay:
+    """Seed, grid size and timed turns of one game"""
+
+    def __init__(self, seed: int, cols: int, rows: int, events: List[Tuple[int, int]],
+                 end_tick: int):
+        self.seed = seed
+        self.cols = cols
+        self.rows = rows
+        self.events = events  # (tick, direction index)
+        self.end_tick = end_tick
+
+    def to_bytes(self) -> bytes:
+        """Encode the replay in the compact binary format"""
+        out = bytearray(MAGIC)
+        out.append(FORMAT_VERSION)
+        for value in (self.seed, self.cols, self.rows, len(self.events)):
+            write_varint(out, value)
+        last = 0
+        for tick, direction in self.events:
+            write_varint(out, (tick - last) << DIRECTION_BITS | direction)
+            last = tick
+        write_varint(out, self.end_tick)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        """Decode a replay produced by to_bytes()"""
+        if data[:3] != MAGIC:
+            raise ValueError("Not a Snake replay")
+        if data[3] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported replay version: {data[3]}")
+        pos = 4
+        header = []
+        for _ in range(4):
+            value, pos = read_varint(data, pos)
+            header.append(value)
+        seed, cols, rows, count = header
+
+        events = []
+        tick = 0
+        for _ in range(count):
+            value, pos = read_varint(data, pos)
+            tick += value >> DIRECTION_BITS
+            events.append((tick, value & ((1 << DIRECTION_BITS) - 1)))
+        end_tick, pos = read_varint(data, pos)
+        return cls(seed, cols, rows, events, end_tick)
+
+    def to_text(self) -> str:
+        """Encode as base64 text, for storing inside JSON files"""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text: str) -> "Replay":
+        """Decode a replay stored with to_text()"""
+        return cls.from_bytes(base64.b64decode(text))
+
+    def run(self) -> SnakeEngine:
+        """Re-simulate the game headless as fast as possible"""
+        ghost = Ghost(self)
+        while ghost.step():
+            pass
+        return ghost.engine
+
+
+class ReplayRecorder:
+    """Records every turn a game takes, with its tick"""
+
+    def __init__(self, engine: SnakeEngine):
+        self.engine = engine
+        self.seed = engine.seed
+        self.events: List[Tuple[int, int]] = []
+        engine.recorder = self
+
+    def record(self, tick: int, direction: str) -> None:
+        """Called by SnakeEngine.step()"""
+        self.events.append((tick, DIRECTION_ORDER.index(direction)))
+
+    def get_replay(self) -> Replay:
+        """Replay of the game so far"""
+        engine = self.engine
+        return Replay(self.seed, engine.cols, engine.rows, list(self.events), engine.ticks)
+
+
+class Ghost:
+    """Plays a replay back one tick at a time in its own engine"""
+
+    def __init__(self, replay: Replay):
+        self.replay = replay
+        self.engine = SnakeEngine(replay.cols, replay.rows, seed=replay.seed)
+        self.next_event = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the recorded game is over"""
+        return not self.engine.alive or self.engine.ticks >= self.replay.end_tick
+
+    def step(self) -> bool:
+        """Advance the ghost one tick, returning False once the replay is over"""
+        if self.finished:
+            return False
+        engine = self.engine
+        events = self.replay.events
+        if self.next_event < len(events) and events[self.next_event][0] == engine.ticks + 1:
+            engine.turns.clear()
+            engine.turns.append(DIRECTION_ORDER[events[self.next_event][1]])
+            self.next_event += 1
+        engine.step()
+        return not self.finished
+
+
+def verify_score(replay: Replay, score: int) -> bool:
+    """Check that replaying the game gives the claimed score"""
+    return replay.run().score == score
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify Snake replays stored in a ranking")
+    parser.add_argument("ranking", help="ranking JSON file with stored replays")
+    args = parser.parse_args()
+
+    with open(args.ranking, "r") as f:
+        entries = json.load(f)
+
+    for entry in entries:
+        if "replay" not in entry:
+            print(f"{entry['name']:<12} {entry['score']:>6}  no replay")
+            continue
+        replay = Replay.from_text(entry["replay"])
+        start = time.perf_counter()
+        engine = replay.run()
+        elapsed = time.perf_counter() - start
+        status = "OK" if engine.score == entry["score"] else f"MISMATCH ({engine.score})"
+        print(f"{entry['name']:<12} {entry['score']:>6}  {status}  "
+              f"{len(replay.to_bytes())} bytes, {engine.ticks} ticks in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Vectorized batch of Snake games for training agents.
+
+VecSnakeEnv steps N independent games with the SnakeEngine rules applied
+to whole NumPy arrays at once. The body is stored as a countdown grid per
+game: every body cell holds the number of steps it stays occupied, so a
+move is one subtraction over the batch (skipped for games that ate, which
+is how the snake grows) and the tail leaves exactly before the head would
+hit it, as in the engine.
+
+The interface follows gym vector environments: reset() returns the
+observations and step(actions) returns (observations, rewards, terminated,
+truncated, info). Finished games are reset automatically and their final
+score is reported in info.
+
+    python jogos/snake_vec.py --envs 4096 --steps 200 --cols 10 --rows 10
+"""
+import argparse
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from snake_engine import START_CELL
+
+# Actions are absolute directions, in the order of snake_engine.DIRECTIONS
+ACTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+ACTION_DX = np.array([0, 0, -1, 1], dtype=np.int64)
+ACTION_DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+ACTION_OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int64)
+
+FOOD_REWARD = 1.0
+DEATH_REWARD = -1.0
+STEP_REWARD = 0.0
+
+# Observation channels
+BODY, HEAD, FOOD = range(3)
+
+
+class VecSnakeEnv:
+    """N Snake games on cols x rows grids, stepped together"""
+
+    def __init__(self, num_envs: int, cols: int = 10, rows: int = 10, seed: Optional[int] = None,
+                 max_idle_steps: Optional[int] = None):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.size = cols * rows
+        # Games that go this long without eating are cut off (truncated)
+        self.max_idle_steps = max_idle_steps if max_idle_steps is not None else 4 * self.size
+        self.rng = np.random.default_rng(seed)
+        self.start = min(START_CELL[1], rows - 1) * cols + min(START_CELL[0], cols - 1)
+
+        dtype = np.int16 if self.size < np.iinfo(np.int16).max else np.int32
+        self.body = np.zeros((num_envs, self.size), dtype=dtype)  # Steps each cell stays occupied
+        self.head = np.zeros(num_envs, dtype=np.int64)
+        self.direction = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.idle = np.zeros(num_envs, dtype=np.int64)
+        self._rows = np.arange(num_envs)
+
+    @property
+    def observation_shape(self) -> Tuple[int, int, int]:
+        """Shape of one game's observation: (channels, rows, cols)"""
+        return (3, self.rows, self.cols)
+
+    def _reset_envs(self, envs: np.ndarray) -> None:
+        """Put the selected games back at the start"""
+        if not len(envs):
+            return
+        self.body[envs] = 0
+        self.body[envs, self.start] = 1
+        self.head[envs] = self.start
+        self.direction[envs] = ACTIONS.index("RIGHT")
+        self.length[envs] = 1
+        self.score[envs] = 0
+        self.steps[envs] = 0
+        self.idle[envs] = 0
+        self._spawn_food(envs)
+
+    def _spawn_food(self, envs: np.ndarray) -> None:
+        """Put food on a uniformly chosen free cell of each selected game"""
+        if not len(envs):
+            return
+        # The largest random key among the free cells is a uniform choice
+        keys = self.rng.random((len(envs), self.size))
+        keys[self.body[envs] > 0] = -1.0
+        self.food[envs] = keys.argmax(axis=1)
+
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
+        """Start every game and return the observations"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(self._rows)
+        return self.observe()
+
+    def observe(self) -> np.ndarray:
+        """Body, head and food planes of every game, as (N, 3, rows, cols) uint8"""
+        obs = np.zeros((self.num_envs, 3, self.size), dtype=np.uint8)
+        obs[:, BODY] = self.body > 0
+        obs[self._rows, HEAD, self.head] = 1
+        obs[self._rows, FOOD, self.food] = 1
+        return obs.reshape(self.num_envs, 3, self.rows, self.cols)
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """Move every snake one cell
+
+        actions holds one index into ACTIONS per game; turning back into the
+        neck is ignored, like SnakeEngine.queue_turn does.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        turn = actions != ACTION_OPPOSITE[self.direction]
+        self.direction = np.where(turn, actions, self.direction)
+
+        x = self.head % self.cols + ACTION_DX[self.direction]
+        y = self.head // self.cols + ACTION_DY[self.direction]
+        hit_wall = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        new_head = np.where(hit_wall, self.head, y * self.cols + x)
+
+        # The tail leaves before the head enters, unless the snake grows
+        ate = ~hit_wall & (new_head == self.food)
+        self.body -= (~ate).astype(self.body.dtype)[:, None]
+        np.maximum(self.body, 0, out=self.body)
+
+        hit_body = ~hit_wall & (self.body[self._rows, new_head] > 0)
+        dead = hit_wall | hit_body
+        alive = ~dead
+
+        self.length += ate
+        self.body[self._rows[alive], new_head[alive]] = self.length[alive]
+        self.head = np.where(alive, new_head, self.head)
+        self.score += ate
+        self.steps += 1
+        self.idle = np.where(ate, 0, self.idle + 1)
+
+        won = ate & (self.length == self.size)
+        self._spawn_food(self._rows[ate & ~won])
+
+        rewards = np.full(self.num_envs, STEP_REWARD)
+        rewards[ate] = FOOD_REWARD
+        rewards[dead] = DEATH_REWARD
+        terminated = dead | won
+        truncated = ~terminated & (self.idle >= self.max_idle_steps)
+
+        done = terminated | truncated
+        info = {"won": won}
+        if done.any():
+            info["final_score"] = np.where(done, self.score, -1)
+            info["final_steps"] = np.where(done, self.steps, -1)
+            self._reset_envs(self._rows[done])
+        return self.observe(), rewards, terminated, truncated, info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vectorized Snake environment benchmark")
+    parser.add_argument("--envs", type=int, default=4096, help="games stepped together")
+    parser.add_argument("--steps", type=int, default=200, help="batched steps to run")
+    parser.add_argument("--cols", type=int, default=10, help="grid width")
+    parser.add_argument("--rows", type=int, default=10, help="grid height")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    env = VecSnakeEnv(args.envs, args.cols, args.rows, seed=args.seed)
+    env.reset()
+    rng = np.random.default_rng(args.seed)
+    actions = rng.integers(0, len(ACTIONS), size=(args.steps, args.envs))
+
+    episodes, food = 0, 0
+    start = time.perf_counter()
+    for step_actions in actions:
+        _, rewards, terminated, truncated, _ = env.step(step_actions)
+        episodes += int((terminated | truncated).sum())
+        food += int((rewards == FOOD_REWARD).sum())
+    elapsed = time.perf_counter() - start
+
+    total = args.envs * args.steps
+    print(f"Envs:          {args.envs} on {args.cols}x{args.rows}")
+    print(f"Env steps:     {total}")
+    print(f"Episodes:      {episodes}")
+    print(f"Food eaten:    {food}")
+    print(f"Time:          {elapsed:.2f}s")
+    print(f"Env steps/s:   {total / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,26 @@
 import pygame
-import random
 import os
+import sys
 import json
+import time
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Any
 
-# Constants
-COLORS = [
-    (0, 0, 0),         # Black (background)
-    (120, 37, 179),    # Purple
-    (100, 179, 179),   # Cyan
-    (80, 134, 22),     # Green
-    (180, 34, 22),     # Red
-    (180, 134, 22),    # Orange
-    (180, 34, 122),    # Pink
-    (0, 180, 255),     # Light Blue
-]
+from tetris_engine import COLORS, GameStats, Tetris, TickScheduler
+from tetris_replay import ReplayRecorder
+
+try:
+    from tetris_bot import TetrisBot
+    from tetris_search import SearchBot
+except ImportError:  # NumPy is only needed for autoplay
+    TetrisBot = SearchBot = None
 
 # Game settings
-FPS = 60
-INITIAL_LEVEL = 1
-LEVEL_SPEED_FACTOR = 5  # How much faster each level is
-SCORE_PER_LINE = 100
-SCORE_BONUS_MULTIPLIER = 2  # Bonus for multiple lines at once
-SCORE_FOR_SOFT_DROP = 1
-SCORE_FOR_HARD_DROP = 2
+FPS = 60  # Default display rate, the game itself runs at TICK_RATE
+BOT_INPUTS_PER_TICK = 3  # Autoplay speed
+BOT_TIME_BUDGET = 0.008  # Autoplay thinking time per piece, in seconds
+ARENA_BOARDS = 16  # Bot games shown side by side in the spectator screen
+ARENA_INPUTS_PER_TICK = 1  # Arena bots play slower so every board stays readable
 
 # UI Colors
 BLACK = (0, 0, 0)
@@ -37,446 +33,9 @@ GOLD = (255, 215, 0)
 # File paths
 RANK_FILE = "tetris_ranking.json"
 SETTINGS_FILE = "tetris_settings.json"
+TELEMETRY_DIR = "tetris_telemetry"
 
 
-class Figure:
-    """Represents a Tetris piece (tetromino)"""
-    
-    # Tetromino definitions - each number represents a position in a 4x4 grid
-    # Each sublist represents a rotation state
-    TETROMINOS = [
-        # I-piece
-        [[1, 5, 9, 13], [4, 5, 6, 7]],
-        # Z-piece
-        [[4, 5, 9, 10], [2, 6, 5, 9]],
-        # S-piece
-        [[6, 7, 9, 10], [1, 5, 6, 10]],
-        # J-piece
-        [[1, 2, 5, 9], [0, 4, 5, 6], [1, 5, 9, 8], [4, 5, 6, 10]],
-        # L-piece
-        [[1, 2, 6, 10], [5, 6, 7, 9], [2, 6, 10, 11], [3, 5, 6, 7]],
-        # T-piece
-        [[1, 4, 5, 6], [1, 4, 5, 9], [4, 5, 6, 9], [1, 5, 6, 9]],
-        # O-piece
-        [[1, 2, 5, 6]],
-    ]
-    
-    # Names for each piece type (for display and statistics)
-    PIECE_NAMES = ["I", "Z", "S", "J", "L", "T", "O"]
-
-    x = 0
-    y = 0
-    figures = [
-        [[1, 5, 9, 13], [4, 5, 6, 7]],
-        [[4, 5, 9, 10], [2, 6, 5, 9]],
-        [[6, 7, 9, 10], [1, 5, 6, 10]],
-        [[1, 2, 5, 9], [0, 4, 5, 6], [1, 5, 9, 8], [4, 5, 6, 10]],
-        [[1, 2, 6, 10], [5, 6, 7, 9], [2, 6, 10, 11], [3, 5, 6, 7]],
-        [[1, 4, 5, 6], [1, 4, 5, 9], [4, 5, 6, 9], [1, 5, 6, 9]],
-        [[1, 2, 5, 6]],
-    ]
-
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-        self.type = random.randint(0, len(self.TETROMINOS) - 1)
-        self.color = random.randint(1, len(COLORS) - 1)
-        self.rotation = 0
-
-    def image(self) -> List[int]:
-        """Get the current rotation state of the piece"""
-        return self.TETROMINOS[self.type][self.rotation]
-
-    def rotate(self, clockwise: bool = False) -> None:
-        """Rotate the piece (counterclockwise by default)"""
-        if clockwise:
-            self.rotation = (self.rotation + 1) % len(self.TETROMINOS[self.type])
-        else:
-            self.rotation = (self.rotation - 1) % len(self.TETROMINOS[self.type])
-
-    def get_name(self) -> str:
-        """Get the name of the current piece"""
-        return self.PIECE_NAMES[self.type]
-
-
-class GameStats:
-    """Tracks game statistics"""
-    
-    def __init__(self):
-        self.lines_cleared = 0
-        self.pieces_placed = 0
-        self.piece_stats = {name: 0 for name in Figure.PIECE_NAMES}
-        self.start_time = datetime.now()
-        self.game_duration = 0
-        
-    def add_piece(self, piece_type: int) -> None:
-        """Record a placed piece"""
-        self.pieces_placed += 1
-        self.piece_stats[Figure.PIECE_NAMES[piece_type]] += 1
-        
-    def add_lines(self, lines: int) -> None:
-        """Record cleared lines"""
-        self.lines_cleared += lines
-        
-    def end_game(self) -> None:
-        """Calculate final game duration"""
-        self.game_duration = (datetime.now() - self.start_time).total_seconds()
-        
-    def get_duration_str(self) -> str:
-        """Get formatted duration string"""
-        if self.game_duration == 0:  # Game still in progress
-            seconds = (datetime.now() - self.start_time).total_seconds()
-        else:
-            seconds = self.game_duration
-            
-        minutes = int(seconds // 60)
-        seconds = int(seconds % 60)
-        return f"{minutes:02d}:{seconds:02d}"
-
-
-class Tetris:
-    """Main game logic class"""
-    
-    def __init__(self, height: int, width: int, screen_width: int, screen_height: int):
-        self.level = INITIAL_LEVEL
-        self.score = 0
-        self.state = "start"
-        self.field: List[List[int]] = []
-        self.height = height
-        self.width = width
-        self.stats = GameStats()
-        self.next_figure: Optional[Figure] = None
-        self.held_figure: Optional[Figure] = None
-        self.can_hold = True
-        
-        # Calculate zoom factor and position
-        self.zoom = min(screen_width // (width + 12), screen_height // (height + 2))
-        self.x = (screen_width - self.zoom * width) // 2
-        self.y = screen_height // 20
-        
-        # Initialize game field
-        self.reset_field()
-        
-        # Preview and hold box positions
-        self.preview_x = self.x + self.zoom * (width + 1)
-        self.preview_y = self.y + self.zoom * 2
-        self.hold_x = self.x - self.zoom * 5
-        self.hold_y = self.y + self.zoom * 2
-        
-        # Current active piece
-        self.figure: Optional[Figure] = None
-        
-        # Ghost piece (shows where piece will land)
-        self.ghost_y = 0
-        
-        # Pause state
-        self.paused = False
-        
-        # Animation effects
-        self.cleared_lines: List[int] = []
-        self.clear_animation = 0
-        self.level_up_animation = 0
-        
-        # Game over animation
-        self.game_over_animation = 0
-        
-    def reset_field(self) -> None:
-        """Initialize or reset the game field"""
-        self.field = []
-        for _ in range(self.height):
-            new_line = [0] * self.width
-            self.field.append(new_line)
-
-    def new_figure(self) -> None:
-        """Create a new active figure"""
-        if self.next_figure:
-            self.figure = self.next_figure
-            self.next_figure = Figure(3, 0)
-        else:
-            self.figure = Figure(3, 0)
-            self.next_figure = Figure(3, 0)
-        
-        # Calculate ghost piece position
-        self.update_ghost()
-        
-    def update_ghost(self) -> None:
-        """Update the ghost piece position"""
-        if not self.figure:
-            return
-            
-        # Start from current position
-        self.ghost_y = self.figure.y
-        
-        # Move down until collision
-        while not self.check_collision(0, self.ghost_y + 1):
-            self.ghost_y += 1
-    
-    def hold(self) -> None:
-        """Hold the current piece or swap with held piece"""
-        if not self.can_hold or not self.figure:
-            return
-            
-        if self.held_figure:
-            # Swap current and held
-            self.figure, self.held_figure = self.held_figure, self.figure
-            # Reset position
-            self.figure.x, self.figure.y = 3, 0
-        else:
-            # Store current and get new
-            self.held_figure = self.figure
-            self.new_figure()
-            
-        # Prevent multiple holds in a row
-        self.can_hold = False
-        
-        # Update ghost
-        self.update_ghost()
-    
-    def check_collision(self, dx: int = 0, dy: int = 0, test_rotation: int = None) -> bool:
-        """Check if the figure collides with walls or other pieces"""
-        if not self.figure:
-            return False
-            
-        # Get the rotation to test
-        old_rotation = self.figure.rotation
-        if test_rotation is not None:
-            self.figure.rotation = test_rotation
-            
-        # Check each block of the piece
-        for i in range(4):
-            for j in range(4):
-                if i * 4 + j in self.figure.image():
-                    # Calculate new position
-                    new_y = i + self.figure.y + dy
-                    new_x = j + self.figure.x + dx
-                    
-                    # Check boundaries and collisions
-                    if (new_y >= self.height or 
-                        new_x >= self.width or 
-                        new_x < 0 or 
-                        (new_y >= 0 and self.field[new_y][new_x] > 0)):
-                        
-                        # Restore rotation if needed
-                        if test_rotation is not None:
-                            self.figure.rotation = old_rotation
-                        return True
-                        
-        # Restore rotation if needed
-        if test_rotation is not None:
-            self.figure.rotation = old_rotation
-            
-        return False
-
-    def intersects(self):
-        for i in range(4):
-            for j in range(4):
-                if i * 4 + j in self.figure.image():
-                    if i + self.figure.y > self.height - 1 or \
-                            j + self.figure.x > self.width - 1 or \
-                            j + self.figure.x < 0 or \
-                            self.field[i + self.figure.y][j + self.figure.x] > 0:
-                        return True
-        return False
-
-    def break_lines(self) -> None:
-        """Check for and clear completed lines"""
-        self.cleared_lines = []
-        
-        # Find completed lines
-        for i in range(1, self.height):
-            if all(self.field[i]):
-                self.cleared_lines.append(i)
-                
-        if not self.cleared_lines:
-            return
-            
-        # Start clear animation
-        self.clear_animation = 10
-        
-        # Update stats
-        lines_count = len(self.cleared_lines)
-        self.stats.add_lines(lines_count)
-        
-        # Calculate score based on level and lines cleared
-        line_score = SCORE_PER_LINE * self.level
-        # Bonus for multiple lines
-        if lines_count > 1:
-            line_score *= lines_count * SCORE_BONUS_MULTIPLIER
-            
-        self.score += line_score
-        
-        # Check for level up (every 10 lines)
-        old_level = self.level
-        self.level = max(INITIAL_LEVEL, (self.stats.lines_cleared // 10) + INITIAL_LEVEL)
-        
-        if self.level > old_level:
-            self.level_up_animation = 20
-
-    def clear_completed_lines(self) -> None:
-        """Remove completed lines and shift blocks down"""
-        if not self.cleared_lines:
-            return
-            
-        # Clear lines from bottom to top to avoid issues
-        for line in sorted(self.cleared_lines, reverse=True):
-            # Remove the line
-            for i in range(line, 0, -1):
-                for j in range(self.width):
-                    self.field[i][j] = self.field[i-1][j]
-                    
-            # Clear the top line
-            for j in range(self.width):
-                self.field[0][j] = 0
-                
-        # Reset cleared lines
-        self.cleared_lines = []
-
-    def go_space(self) -> None:
-        """Hard drop - move piece to bottom instantly"""
-        if not self.figure or self.state != "start":
-            return
-            
-        # Count how many cells we drop for scoring
-        drop_distance = 0
-        
-        # Move down until collision
-        while not self.check_collision(0, 1):
-            self.figure.y += 1
-            drop_distance += 1
-            
-        # Add score for hard drop
-        self.score += drop_distance * SCORE_FOR_HARD_DROP
-        
-        # Lock the piece
-        self.freeze()
-
-    def go_down(self, manual: bool = False) -> None:
-        """Move piece down one cell"""
-        if not self.figure or self.state != "start":
-            return
-            
-        self.figure.y += 1
-        
-        if self.check_collision():
-            self.figure.y -= 1
-            self.freeze()
-        elif manual:  # Add points for soft drop
-            self.score += SCORE_FOR_SOFT_DROP
-
-    def freeze(self) -> None:
-        """Lock the current piece into the field"""
-        if not self.figure:
-            return
-            
-        # Add the piece to the field
-        for i in range(4):
-            for j in range(4):
-                if i * 4 + j in self.figure.image():
-                    if i + self.figure.y >= 0:  # Only if visible on field
-                        self.field[i + self.figure.y][j + self.figure.x] = self.figure.color
-        
-        # Update statistics
-        self.stats.add_piece(self.figure.type)
-        
-        # Check for completed lines
-        self.break_lines()
-        
-        # Allow holding again
-        self.can_hold = True
-        
-        # Create new piece
-        self.new_figure()
-        
-        # Check for game over
-        if self.check_collision():
-            self.state = "gameover"
-            self.stats.end_game()
-            self.game_over_animation = 60  # Frames for animation
-
-    def go_side(self, dx: int) -> None:
-        """Move piece horizontally"""
-        if not self.figure or self.state != "start":
-            return
-            
-        old_x = self.figure.x
-        self.figure.x += dx
-        
-        if self.check_collision():
-            self.figure.x = old_x
-        else:
-            # Update ghost piece
-            self.update_ghost()
-
-    def rotate(self, clockwise: bool = False) -> None:
-        """Rotate the current piece with wall kicks"""
-        if not self.figure or self.state != "start":
-            return
-            
-        old_rotation = self.figure.rotation
-        self.figure.rotate(clockwise)
-        
-        # Try basic rotation
-        if not self.check_collision():
-            # Success - update ghost
-            self.update_ghost()
-            return
-            
-        # Try wall kicks - move left/right to make rotation work
-        for kick_x in [-1, 1, -2, 2]:
-            self.figure.x += kick_x
-            if not self.check_collision():
-                # Success - update ghost
-                self.update_ghost()
-                return
-            self.figure.x -= kick_x
-            
-        # If all fails, revert rotation
-        self.figure.rotation = old_rotation
-
-    def toggle_pause(self) -> None:
-        """Toggle game pause state"""
-        if self.state == "start":
-            self.paused = not self.paused
-
-    def restart(self) -> None:
-        """Reset the game to initial state"""
-        self.level = INITIAL_LEVEL
-        self.score = 0
-        self.state = "start"
-        self.paused = False
-        self.reset_field()
-        self.stats = GameStats()
-        self.figure = None
-        self.next_figure = None
-        self.held_figure = None
-        self.can_hold = True
-        self.cleared_lines = []
-        self.clear_animation = 0
-        self.level_up_animation = 0
-        self.game_over_animation = 0
-        self.new_figure()
-
-    def update(self) -> None:
-        """Update game state for each frame"""
-        if self.state != "start" or self.paused:
-            return
-            
-        # Handle animations
-        if self.clear_animation > 0:
-            self.clear_animation -= 1
-            if self.clear_animation == 0:
-                self.clear_completed_lines()
-            return
-            
-        # Normal game update - gravity
-        self.go_down()
-
-    def rotate(self):
-        old_rotation = self.figure.rotation
-        self.figure.rotate()
-        if self.intersects():
-            self.figure.rotation = old_rotation
-
 # Funções de ranking
 RANK_FILE = "ranking.json"
 
@@ -506,10 +65,11 @@ class RankingSystem:
         except IOError:
             print(f"Error saving ranking to {self.filename}")
             
-    def add_score(self, name: str, score: int, stats: GameStats) -> bool:
+    def add_score(self, name: str, score: int, stats: GameStats, replay: Optional[str] = None) -> bool:
         """
         Add a new score to the ranking
         Returns True if it made it to the high scores
+        The optional replay (Replay.to_text()) lets the score be verified later
         """
         # Create entry with additional stats
         entry = {
@@ -520,6 +80,8 @@ class RankingSystem:
             "pieces": stats.pieces_placed,
             "duration": stats.get_duration_str()
         }
+        if replay is not None:
+            entry["replay"] = replay
         
         # Check if score is high enough
         if len(self.entries) < self.max_entries or score > self.entries[-1]["score"]:
@@ -576,7 +138,12 @@ class SettingsManager:
         "show_ghost": True,
         "show_grid": True,
         "music_volume": 0.5,
-        "sfx_volume": 0.7
+        "sfx_volume": 0.7,
+        "save_telemetry": True,
+        "fps": FPS,
+        "das_ms": 167,
+        "arr_ms": 33,
+        "soft_drop_ms": 50
     }
     
     def __init__(self, filename: str = SETTINGS_FILE):
@@ -616,6 +183,13 @@ class SettingsManager:
         """Convert pygame key code to readable name"""
         return pygame.key.name(key_code).upper()
         
+    def get_action(self, key_code: int) -> Optional[str]:
+        """Get the action bound to a key, if any"""
+        for action, key in self.controls.items():
+            if key == key_code:
+                return action
+        return None
+        
     def update_control(self, action: str, key_code: int) -> None:
         """Update a control binding"""
         if action in self.controls:
@@ -634,6 +208,343 @@ class SettingsManager:
         self.settings = self.DEFAULT_SETTINGS.copy()
         self.save()
 
+class AutoRepeat:
+    """Delayed auto shift (DAS) and auto repeat rate (ARR) for held keys
+    
+    Press times are taken with perf_counter as events are read. A held
+    move repeats every ARR after the DAS delay, soft drop repeats from the
+    start, and poll() returns every repeat that came due since the last
+    call, so rates faster than the frame rate still move the right number
+    of cells. An ARR of 0 slides straight to the wall.
+    """
+    
+    ACTIONS = ("move_left", "move_right", "soft_drop")
+    
+    def __init__(self, das: float, arr: float, soft_drop: float):
+        self.das = das
+        self.arr = arr
+        self.soft_drop = soft_drop
+        self.pressed: Dict[str, float] = {}  # Held action -> press time
+        self.repeats: Dict[str, int] = {}  # Held action -> repeats already done
+        self.direction: Optional[str] = None  # Horizontal move currently repeating
+        
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "AutoRepeat":
+        """Create from the das_ms, arr_ms and soft_drop_ms settings"""
+        return cls(settings["das_ms"] / 1000, settings["arr_ms"] / 1000,
+                   settings["soft_drop_ms"] / 1000)
+        
+    def press(self, action: str, now: float) -> None:
+        """Start charging a held action"""
+        if action in self.ACTIONS:
+            self.pressed[action] = now
+            self.repeats[action] = 0
+            if action != "soft_drop":
+                self.direction = action
+            
+    def release(self, action: str) -> None:
+        """Stop repeating an action"""
+        self.pressed.pop(action, None)
+        self.repeats.pop(action, None)
+        
+    def clear(self) -> None:
+        """Forget all held keys (focus lost, game restarted)"""
+        self.pressed.clear()
+        self.repeats.clear()
+        self.direction = None
+        
+    def due(self, action: str, now: float, limit: int) -> int:
+        """Total repeats an action has earned since it was pressed"""
+        held = now - self.pressed[action]
+        if action == "soft_drop":
+            delay, rate = self.soft_drop, self.soft_drop
+        else:
+            delay, rate = self.das, self.arr
+        if held < delay:
+            return 0
+        if rate <= 0:
+            return limit
+        return min(limit, int((held - delay) / rate) + 1)
+        
+    def poll(self, now: float, limit: int) -> List[Tuple[str, int]]:
+        """Get (action, count) for the repeats due, at most limit per action"""
+        # The last pressed direction wins; going back to a direction still
+        # held doesn't replay the repeats it earned meanwhile
+        horizontal = [a for a in ("move_left", "move_right") if a in self.pressed]
+        direction = max(horizontal, key=self.pressed.get) if horizontal else None
+        if direction != self.direction:
+            self.direction = direction
+            if direction:
+                self.repeats[direction] = self.due(direction, now, limit)
+                
+        result = []
+        for action in (direction, "soft_drop"):
+            if action not in self.pressed:
+                continue
+            total = self.due(action, now, limit)
+            count = total - self.repeats[action]
+            if count > 0:
+                self.repeats[action] = total
+                result.append((action, count))
+        return result
+
+
+class FieldRenderer:
+    """Draws the game field from cached layers
+    
+    The background and grid are pre-rendered once per zoom level, locked
+    blocks live on their own surface that is only redrawn when the field
+    changes, and every block or ghost cell is a pre-baked tile, so a frame
+    is composed with a single blits() call.
+    """
+    
+    FLASH_COLOR = 7  # Light blue flash on lines being cleared
+    GHOST_ALPHA = 80  # 0-255, lower is more transparent
+    
+    def __init__(self):
+        self.backgrounds: Dict[Tuple[int, int, int, bool], pygame.Surface] = {}
+        self.block_tiles: Dict[int, List[pygame.Surface]] = {}
+        self.ghost_tiles: Dict[int, List[pygame.Surface]] = {}
+        self.locked_layer: Optional[pygame.Surface] = None
+        self.locked_key: Optional[Tuple[int, int, int]] = None
+        
+    def get_background(self, zoom: int, width: int, height: int, show_grid: bool) -> pygame.Surface:
+        """Field background with the optional grid, including the 5px border"""
+        key = (zoom, width, height, show_grid)
+        if key not in self.backgrounds:
+            surface = pygame.Surface((zoom * width + 10, zoom * height + 10)).convert()
+            surface.fill(DARK_GRAY)
+            if show_grid:
+                for i in range(height):
+                    for j in range(width):
+                        pygame.draw.rect(surface, GRAY, [5 + zoom * j, 5 + zoom * i, zoom, zoom], 1)
+            self.backgrounds[key] = surface
+        return self.backgrounds[key]
+        
+    def get_block_tiles(self, zoom: int) -> List[pygame.Surface]:
+        """Solid block tile for every colour index"""
+        if zoom not in self.block_tiles:
+            tiles = []
+            for color in COLORS:
+                tile = pygame.Surface((zoom - 2, zoom - 2)).convert()
+                tile.fill(color)
+                tiles.append(tile)
+            self.block_tiles[zoom] = tiles
+        return self.block_tiles[zoom]
+        
+    def get_ghost_tiles(self, zoom: int) -> List[pygame.Surface]:
+        """Translucent, outlined ghost tile for every colour index"""
+        if zoom not in self.ghost_tiles:
+            tiles = []
+            for color in COLORS:
+                tile = pygame.Surface((zoom - 2, zoom - 2), pygame.SRCALPHA).convert_alpha()
+                tile.fill((*color, self.GHOST_ALPHA))
+                pygame.draw.rect(tile, color, tile.get_rect(), 1)
+                tiles.append(tile)
+            self.ghost_tiles[zoom] = tiles
+        return self.ghost_tiles[zoom]
+        
+    def get_locked_layer(self, game: Tetris) -> pygame.Surface:
+        """Surface with the locked blocks, redrawn only when the field changes"""
+        field = game.field
+        key = (id(field), field.version, game.zoom)
+        if key != self.locked_key:
+            zoom = game.zoom
+            size = (zoom * game.width, zoom * game.height)
+            if self.locked_layer is None or self.locked_layer.get_size() != size:
+                self.locked_layer = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            self.locked_layer.fill((0, 0, 0, 0))
+            tiles = self.get_block_tiles(zoom)
+            self.locked_layer.blits([
+                (tiles[color], (zoom * j + 1, zoom * i + 1))
+                for i, row in enumerate(field.colors)
+                for j, color in enumerate(row)
+                if color
+            ], doreturn=False)
+            self.locked_key = key
+        return self.locked_layer
+        
+    def draw(self, screen: pygame.Surface, game: Tetris, show_grid: bool, show_ghost: bool) -> None:
+        """Compose the field layers onto the screen"""
+        zoom = game.zoom
+        tiles = self.get_block_tiles(zoom)
+        
+        layers = [
+            (self.get_background(zoom, game.width, game.height, show_grid),
+             (game.x - 5, game.y - 5)),
+            (self.get_locked_layer(game), (game.x, game.y)),
+        ]
+        
+        # Flashing effect for lines being cleared
+        if game.cleared_lines and game.clear_animation % 2 == 0:
+            flash = tiles[self.FLASH_COLOR]
+            for i in game.cleared_lines:
+                for j in range(game.width):
+                    layers.append((flash, (game.x + zoom * j + 1, game.y + zoom * i + 1)))
+        
+        figure = game.figure
+        if figure and game.state == "start" and not game.paused:
+            # Ghost piece (shows where piece will land)
+            if show_ghost:
+                ghost = self.get_ghost_tiles(zoom)[figure.color]
+                for i, j in figure.cells():
+                    layers.append((ghost, (game.x + zoom * (j + figure.x) + 1,
+                                           game.y + zoom * (i + game.ghost_y) + 1)))
+            
+            # Active piece
+            block = tiles[figure.color]
+            for i, j in figure.cells():
+                layers.append((block, (game.x + zoom * (j + figure.x) + 1,
+                                       game.y + zoom * (i + figure.y) + 1)))
+        
+        screen.blits(layers, doreturn=False)
+
+
+class BoardView:
+    """Cached surface of one arena board and what is drawn on it"""
+    
+    def __init__(self):
+        self.surface: Optional[pygame.Surface] = None
+        self.zoom = 0
+        self.field_version = -1
+        self.rows: List[Optional[Tuple[int, ...]]] = []  # Colour rows on the surface
+        self.score = -1
+        self.label: Optional[pygame.Surface] = None
+
+
+class ArenaRenderer:
+    """Draws many games in a grid from per-board cached surfaces
+    
+    Each board keeps its locked blocks on its own surface and only redraws
+    the rows whose colours changed since the last frame (unchanged rows are
+    the same frozen tuples, so most checks are an identity test). Blocks
+    come from one tile atlas per zoom level, and the whole screen is
+    composed with a single blits() call.
+    """
+    
+    BORDER = 3
+    LABEL_HEIGHT = 18
+    
+    def __init__(self):
+        self.views: List[BoardView] = []
+        self.atlases: Dict[int, Tuple[pygame.Surface, pygame.Surface, List[pygame.Rect]]] = {}
+        self.layout_key: Optional[Tuple[Any, ...]] = None
+        self.layout: Tuple[int, int, List[Tuple[int, int]]] = (0, 0, [])
+        
+    def get_atlas(self, zoom: int) -> Tuple[pygame.Surface, pygame.Surface, List[pygame.Rect]]:
+        """Block and ghost tiles of every colour side by side, with their areas"""
+        if zoom not in self.atlases:
+            size = (zoom * len(COLORS), zoom)
+            blocks = pygame.Surface(size).convert()
+            ghosts = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            ghosts.fill((0, 0, 0, 0))
+            areas = []
+            for k, color in enumerate(COLORS):
+                area = pygame.Rect(zoom * k, 0, max(1, zoom - 2), max(1, zoom - 2))
+                blocks.fill(color, area)
+                ghosts.fill((*color, FieldRenderer.GHOST_ALPHA), area)
+                areas.append(area)
+            self.atlases[zoom] = (blocks, ghosts, areas)
+        return self.atlases[zoom]
+        
+    def get_layout(self, count: int, width: int, height: int,
+                   area: pygame.Rect) -> Tuple[int, int, List[Tuple[int, int]]]:
+        """Pick the column count giving the biggest boards, and their positions"""
+        key = (count, width, height, tuple(area))
+        if key != self.layout_key:
+            best_zoom, best_cols = 0, 1
+            for cols in range(1, count + 1):
+                rows = -(-count // cols)
+                cell_w = area.width // cols - 2 * self.BORDER - 4
+                cell_h = area.height // rows - 2 * self.BORDER - self.LABEL_HEIGHT - 4
+                zoom = min(cell_w // width, cell_h // height)
+                if zoom > best_zoom:
+                    best_zoom, best_cols = zoom, cols
+            zoom = max(best_zoom, 2)
+            board_w = zoom * width + 2 * self.BORDER
+            board_h = zoom * height + 2 * self.BORDER + self.LABEL_HEIGHT
+            rows = -(-count // best_cols)
+            left = area.x + (area.width - best_cols * (board_w + 4)) // 2
+            top = area.y + (area.height - rows * (board_h + 4)) // 2
+            positions = [(left + (k % best_cols) * (board_w + 4),
+                          top + (k // best_cols) * (board_h + 4)) for k in range(count)]
+            self.layout = (zoom, best_cols, positions)
+            self.layout_key = key
+        return self.layout
+        
+    def update_view(self, view: BoardView, game: Tetris, zoom: int, font) -> None:
+        """Bring a board's cached surface up to date, redrawing only dirty rows"""
+        border = self.BORDER
+        if view.surface is None or view.zoom != zoom:
+            view.surface = pygame.Surface((zoom * game.width + 2 * border,
+                                           zoom * game.height + 2 * border)).convert()
+            view.surface.fill(DARK_GRAY)
+            view.surface.fill(BLACK, (border, border, zoom * game.width, zoom * game.height))
+            view.zoom = zoom
+            view.field_version = -1
+            view.rows = [None] * game.height
+            
+        if game.score != view.score:
+            view.label = font.render(f"{game.score}", True, WHITE)
+            view.score = game.score
+            
+        field = game.field
+        if field.version == view.field_version:
+            return
+        blocks, _, areas = self.get_atlas(zoom)
+        tiles = []
+        for i, row in enumerate(field.frozen_colors()):
+            drawn = view.rows[i]
+            if row is drawn or row == drawn:
+                view.rows[i] = row
+                continue
+            y = border + zoom * i
+            view.surface.fill(BLACK, (border, y, zoom * game.width, zoom))
+            for j, color in enumerate(row):
+                if color:
+                    tiles.append((blocks, (border + zoom * j + 1, y + 1), areas[color]))
+            view.rows[i] = row
+        view.surface.blits(tiles, doreturn=False)
+        view.field_version = field.version
+        
+    def draw(self, screen: pygame.Surface, games: List[Tetris], area: pygame.Rect, font) -> None:
+        """Draw every game into its slot of the grid"""
+        if not games:
+            return
+        while len(self.views) < len(games):
+            self.views.append(BoardView())
+        zoom, _, positions = self.get_layout(len(games), games[0].width, games[0].height, area)
+        blocks, ghosts, areas = self.get_atlas(zoom)
+        border = self.BORDER
+        
+        layers = []
+        for game, view, (x, y) in zip(games, self.views, positions):
+            self.update_view(view, game, zoom, font)
+            layers.append((view.surface, (x, y)))
+            layers.append((view.label, (x, y + view.surface.get_height())))
+            x += border + 1
+            y += border + 1
+            
+            # Flashing lines being cleared
+            if game.cleared_lines and game.clear_animation % 2 == 0:
+                flash = areas[FieldRenderer.FLASH_COLOR]
+                for i in game.cleared_lines:
+                    for j in range(game.width):
+                        layers.append((blocks, (x + zoom * j, y + zoom * i), flash))
+                        
+            # Active piece and its ghost
+            figure = game.figure
+            if figure and game.state == "start":
+                tile = areas[figure.color]
+                for i, j in figure.cells():
+                    layers.append((ghosts, (x + zoom * (j + figure.x),
+                                            y + zoom * (i + game.ghost_y)), tile))
+                for i, j in figure.cells():
+                    layers.append((blocks, (x + zoom * (j + figure.x),
+                                            y + zoom * (i + figure.y)), tile))
+        screen.blits(layers, doreturn=False)
+
+
 class TetrisGame:
     """Main game class that handles the game loop and UI"""
     
@@ -659,8 +570,9 @@ class TetrisGame:
         self.small_font = pygame.font.SysFont('Arial', 30, True, False)
         self.tiny_font = pygame.font.SysFont('Arial', 20, True, False)
         
-        # Set up clock
+        # Set up clock and the fixed game ticks it drives
         self.clock = pygame.time.Clock()
+        self.ticks = TickScheduler()
         
         # Initialize ranking system
         self.ranking = RankingSystem()
@@ -674,6 +586,34 @@ class TetrisGame:
         self.selected_setting = 0
         self.changing_control = None
         
+        # Input recording of the current game, stored with its ranking entry
+        self.recorder: Optional[ReplayRecorder] = None
+        
+        # Work time of the last frame and whether this game's telemetry was exported
+        self.frame_time = 0.0
+        self.telemetry_saved = False
+        
+        # Held movement keys and when the oldest input not yet on screen was read
+        self.auto_repeat = AutoRepeat.from_settings(self.settings.settings)
+        self.input_time: Optional[float] = None
+        
+        # Cached field layers
+        self.field_renderer = FieldRenderer()
+        
+        # Autoplay (F2 during a game)
+        self.bot = None
+        self.autoplay = False
+        self.autoplay_used = False
+        
+        # Practice mode (F3 during a game): F4 undoes the last drop, F5 redoes it
+        self.practice = False
+        self.practice_used = False
+        
+        # Spectator screen with several bot games
+        self.arena_games: List[Tetris] = []
+        self.arena_bots: List[Any] = []
+        self.arena_renderer = ArenaRenderer()
+        
     def update_screen_mode(self) -> None:
         """Update screen based on fullscreen setting"""
         if self.settings.settings["fullscreen"]:
@@ -721,6 +661,8 @@ class TetrisGame:
             "3 - Settings",
             "ESC - Exit"
         ]
+        if TetrisBot is not None:
+            options.insert(3, "4 - Watch Bots")
         
         for i, option in enumerate(options):
             self.draw_centered_text(option, menu_y + i * menu_spacing)
@@ -882,105 +824,27 @@ class TetrisGame:
         self.draw_centered_text("Press any key to return to menu", 
                               self.screen.get_height() - 50, self.small_font, GRAY)
         
+    def draw_arena(self) -> None:
+        """Draw the spectator screen with every bot game"""
+        self.screen.fill(BLACK)
+        self.draw_text(f"{len(self.arena_games)} BOTS  {self.clock.get_fps():.0f} FPS  ESC: Menu",
+                       self.tiny_font, GRAY, 10, 5)
+        area = self.screen.get_rect()
+        area.top += 30
+        area.height -= 30
+        self.arena_renderer.draw(self.screen, self.arena_games, area, self.tiny_font)
+        
     def draw_game_field(self) -> None:
         """Draw the main game field"""
         if not self.game:
             return
             
-        # Draw field background
-        field_bg = pygame.Rect(
-            self.game.x - 5, 
-            self.game.y - 5,
-            self.game.zoom * self.game.width + 10,
-            self.game.zoom * self.game.height + 10
+        self.field_renderer.draw(
+            self.screen,
+            self.game,
+            self.settings.settings["show_grid"],
+            self.settings.settings["show_ghost"]
         )
-        pygame.draw.rect(self.screen, DARK_GRAY, field_bg)
-        
-        # Draw grid and blocks
-        for i in range(self.game.height):
-            for j in range(self.game.width):
-                # Draw grid if enabled
-                if self.settings.settings["show_grid"]:
-                    pygame.draw.rect(
-                        self.screen, 
-                        GRAY, 
-                        [
-                            self.game.x + self.game.zoom * j, 
-                            self.game.y + self.game.zoom * i, 
-                            self.game.zoom, 
-                            self.game.zoom
-                        ], 
-                        1
-                    )
-                
-                # Draw blocks
-                if self.game.field[i][j] > 0:
-                    color_idx = self.game.field[i][j]
-                    
-                    # Flashing effect for lines being cleared
-                    if i in self.game.cleared_lines:
-                        if self.game.clear_animation % 2 == 0:
-                            color_idx = 7  # Use light blue for flash effect
-                    
-                    pygame.draw.rect(
-                        self.screen, 
-                        COLORS[color_idx], 
-                        [
-                            self.game.x + self.game.zoom * j + 1, 
-                            self.game.y + self.game.zoom * i + 1, 
-                            self.game.zoom - 2, 
-                            self.game.zoom - 2
-                        ]
-                    )
-        
-        # Draw ghost piece if enabled
-        if (self.settings.settings["show_ghost"] and 
-            self.game.figure and 
-            self.game.state == "start" and
-            not self.game.paused):
-            
-            for i in range(4):
-                for j in range(4):
-                    p = i * 4 + j
-                    if p in self.game.figure.image():
-                        # Draw ghost piece with transparency
-                        ghost_rect = pygame.Rect(
-                            self.game.x + self.game.zoom * (j + self.game.figure.x) + 1,
-                            self.game.y + self.game.zoom * (i + self.game.ghost_y) + 1,
-                            self.game.zoom - 2,
-                            self.game.zoom - 2
-                        )
-                        
-                        # Create a transparent surface
-                        s = pygame.Surface((ghost_rect.width, ghost_rect.height))
-                        s.set_alpha(80)  # 0-255, lower is more transparent
-                        s.fill(COLORS[self.game.figure.color])
-                        self.screen.blit(s, ghost_rect)
-                        
-                        # Draw outline
-                        pygame.draw.rect(
-                            self.screen,
-                            COLORS[self.game.figure.color],
-                            ghost_rect,
-                            1
-                        )
-        
-        # Draw active piece
-        if self.game.figure and self.game.state == "start" and not self.game.paused:
-            for i in range(4):
-                for j in range(4):
-                    p = i * 4 + j
-                    if p in self.game.figure.image():
-                        pygame.draw.rect(
-                            self.screen, 
-                            COLORS[self.game.figure.color], 
-                            [
-                                self.game.x + self.game.zoom * (j + self.game.figure.x) + 1, 
-                                self.game.y + self.game.zoom * (i + self.game.figure.y) + 1, 
-                                self.game.zoom - 2, 
-                                self.game.zoom - 2
-                            ]
-                        )
     
     def draw_preview_box(self) -> None:
         """Draw the next piece preview box"""
@@ -1002,20 +866,17 @@ class TetrisGame:
         pygame.draw.rect(self.screen, GRAY, preview_bg, 2)
         
         # Draw next piece
-        for i in range(4):
-            for j in range(4):
-                p = i * 4 + j
-                if p in self.game.next_figure.image():
-                    pygame.draw.rect(
-                        self.screen,
-                        COLORS[self.game.next_figure.color],
-                        [
-                            self.game.preview_x + self.game.zoom * j,
-                            self.game.preview_y + self.game.zoom * i,
-                            self.game.zoom - 2,
-                            self.game.zoom - 2
-                        ]
-                    )
+        for i, j in self.game.next_figure.cells():
+            pygame.draw.rect(
+                self.screen,
+                COLORS[self.game.next_figure.color],
+                [
+                    self.game.preview_x + self.game.zoom * j,
+                    self.game.preview_y + self.game.zoom * i,
+                    self.game.zoom - 2,
+                    self.game.zoom - 2
+                ]
+            )
     
     def draw_hold_box(self) -> None:
         """Draw the hold piece box"""
@@ -1038,26 +899,23 @@ class TetrisGame:
         
         # Draw held piece if exists
         if self.game.held_figure:
-            for i in range(4):
-                for j in range(4):
-                    p = i * 4 + j
-                    if p in self.game.held_figure.image():
-                        # Use a dimmed color if can't hold
-                        color = COLORS[self.game.held_figure.color]
-                        if not self.game.can_hold:
-                            # Create a dimmed version of the color
-                            color = tuple(max(c // 2, 0) for c in color)
-                            
-                        pygame.draw.rect(
-                            self.screen,
-                            color,
-                            [
-                                self.game.hold_x + self.game.zoom * j,
-                                self.game.hold_y + self.game.zoom * i,
-                                self.game.zoom - 2,
-                                self.game.zoom - 2
-                            ]
-                        )
+            # Use a dimmed color if can't hold
+            color = COLORS[self.game.held_figure.color]
+            if not self.game.can_hold:
+                # Create a dimmed version of the color
+                color = tuple(max(c // 2, 0) for c in color)
+                
+            for i, j in self.game.held_figure.cells():
+                pygame.draw.rect(
+                    self.screen,
+                    color,
+                    [
+                        self.game.hold_x + self.game.zoom * j,
+                        self.game.hold_y + self.game.zoom * i,
+                        self.game.zoom - 2,
+                        self.game.zoom - 2
+                    ]
+                )
     
     def draw_stats(self) -> None:
         """Draw game statistics"""
@@ -1109,6 +967,16 @@ class TetrisGame:
         self.draw_text(f"Pause: {self.settings.get_key_name(self.settings.controls['pause'])}", 
                       self.tiny_font, WHITE, stats_x, controls_y + spacing * 2)
         self.draw_text("ESC: Menu", self.tiny_font, WHITE, stats_x, controls_y + spacing * 3)
+        
+        # Autoplay indicator
+        if self.autoplay and self.bot:
+            self.draw_text(f"AUTOPLAY {self.bot.decisions_per_second:.0f} dec/s", self.tiny_font,
+                          GOLD, stats_x, controls_y + spacing * 5)
+        
+        # Practice indicator
+        if self.practice:
+            self.draw_text("PRACTICE F4: Undo F5: Redo", self.tiny_font, GOLD, stats_x,
+                          controls_y + spacing * 6)
     
     def draw_game_over(self) -> None:
         """Draw game over screen overlay"""
@@ -1214,6 +1082,8 @@ class TetrisGame:
             elif event.key == pygame.K_3:
                 self.state = "settings"
                 self.selected_setting = 0
+            elif event.key == pygame.K_4 and TetrisBot is not None:
+                self.start_arena()
             elif event.key == pygame.K_ESCAPE:
                 pygame.quit()
                 exit()
@@ -1226,6 +1096,13 @@ class TetrisGame:
                 self.state = "game"
                 self.game = Tetris(20, 10, self.screen.get_width(), self.screen.get_height())
                 self.game.new_figure()
+                self.recorder = ReplayRecorder(self.game)
+                self.telemetry_saved = False
+                self.autoplay_used = self.autoplay
+                self.auto_repeat = AutoRepeat.from_settings(self.settings.settings)
+                self.practice_used = self.practice
+                if self.practice:
+                    self.game.enable_history()
             elif event.key == pygame.K_BACKSPACE:
                 self.player_name = self.player_name[:-1]
             elif event.key == pygame.K_ESCAPE:
@@ -1316,47 +1193,102 @@ class TetrisGame:
         if event.type == pygame.KEYDOWN:
             # Game controls
             if self.game.state == "start" and not self.game.paused:
-                # Movement and rotation
-                if event.key == self.settings.controls["move_left"]:
-                    self.game.go_side(-1)
-                elif event.key == self.settings.controls["move_right"]:
-                    self.game.go_side(1)
-                elif event.key == self.settings.controls["rotate_ccw"]:
-                    self.game.rotate()
-                elif event.key == self.settings.controls["rotate_cw"]:
-                    self.game.rotate(True)
-                elif event.key == self.settings.controls["soft_drop"]:
-                    self.game.go_down(True)
-                elif event.key == self.settings.controls["hard_drop"]:
-                    self.game.go_space()
-                elif event.key == self.settings.controls["hold"]:
-                    self.game.hold()
+                # Movement, rotation, drops and hold
+                action = self.settings.get_action(event.key)
+                if action and action != "pause":
+                    now = time.perf_counter()
+                    self.game.apply(action)
+                    self.auto_repeat.press(action, now)
+                    if self.input_time is None:
+                        self.input_time = now
                 
             # Pause toggle
             if event.key == self.settings.controls["pause"] and self.game.state == "start":
-                self.game.toggle_pause()
+                self.game.apply("pause")
                 
             # Other controls
-            if event.key == pygame.K_r and (self.game.paused or self.game.state == "gameover"):
+            if event.key == pygame.K_F2 and SearchBot is not None:
+                # Toggle autoplay
+                if self.bot is None:
+                    self.bot = SearchBot(time_budget=BOT_TIME_BUDGET)
+                self.autoplay = not self.autoplay
+                self.autoplay_used = self.autoplay_used or self.autoplay
+            elif event.key == pygame.K_F3:
+                # Toggle practice mode
+                self.practice = not self.practice
+                self.practice_used = self.practice_used or self.practice
+                if self.practice:
+                    self.game.enable_history()
+                else:
+                    self.game.disable_history()
+            elif event.key == pygame.K_F4 and self.practice:
+                self.game.undo()
+            elif event.key == pygame.K_F5 and self.practice:
+                self.game.redo()
+            elif event.key == pygame.K_r and (self.game.paused or self.game.state == "gameover"):
                 # Restart game
                 self.game.restart()
+                self.recorder = ReplayRecorder(self.game)
+                self.telemetry_saved = False
+                self.autoplay_used = self.autoplay
+                self.auto_repeat.clear()
+                self.practice_used = self.practice
             elif event.key == pygame.K_ESCAPE:
                 if self.game.paused or self.game.state == "gameover":
                     # Return to menu
                     self.state = "menu"
                 else:
                     # Pause the game
-                    self.game.toggle_pause()
+                    self.game.apply("pause")
             elif event.key == pygame.K_RETURN and self.game.state == "gameover":
                 # Game over - add score to ranking
                 if self.game.game_over_animation <= 0:
-                    is_high_score = self.ranking.add_score(
-                        self.player_name, self.game.score, self.game.stats)
-                    self.state = "ranking" if is_high_score else "menu"
+                    if self.autoplay_used or self.practice_used:
+                        # Bot and practice games don't go into the ranking
+                        self.state = "menu"
+                    else:
+                        is_high_score = self.ranking.add_score(
+                            self.player_name, self.game.score, self.game.stats,
+                            self.recorder.get_replay().to_text())
+                        self.state = "ranking" if is_high_score else "menu"
                     
         elif event.type == pygame.KEYUP:
-            # Handle key releases
-            pass
+            # Stop auto repeat
+            action = self.settings.get_action(event.key)
+            if action:
+                self.auto_repeat.release(action)
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # Key releases won't arrive while the window is in the background
+            self.auto_repeat.clear()
+    
+    def handle_arena_input(self, event: pygame.event.Event) -> None:
+        """Handle input on the spectator screen"""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.state = "menu"
+            self.arena_games = []
+            self.arena_bots = []
+    
+    def start_arena(self) -> None:
+        """Start ARENA_BOARDS bot games with different seeds"""
+        self.state = "arena"
+        self.arena_games = []
+        self.arena_bots = []
+        for seed in range(ARENA_BOARDS):
+            game = Tetris(20, 10, seed=seed)
+            game.new_figure()
+            self.arena_games.append(game)
+            self.arena_bots.append(TetrisBot())
+    
+    def update_arena_tick(self) -> None:
+        """Advance every bot game by one tick, restarting the ones that topped out"""
+        for game, bot in zip(self.arena_games, self.arena_bots):
+            if game.state == "gameover":
+                game.restart()
+                continue
+            for _ in range(ARENA_INPUTS_PER_TICK):
+                if bot.step(game) in (None, "hard_drop"):
+                    break
+            game.update()
     
     def handle_input(self) -> None:
         """Handle all input events"""
@@ -1378,25 +1310,82 @@ class TetrisGame:
                 self.handle_controls_input(event)
             elif self.state == "game":
                 self.handle_game_input(event)
+            elif self.state == "arena":
+                self.handle_arena_input(event)
     
     def update_game(self) -> None:
         """Update game state"""
+        # Ticks due since the last frame, so the game speed doesn't depend on the FPS
+        ticks = self.ticks.advance()
         if self.state == "game" and self.game:
-            # Update animations
-            if self.game.level_up_animation > 0:
-                self.game.level_up_animation -= 1
+            self.update_auto_repeat()
+            
+            # Telemetry
+            if self.game.state == "start" and not self.game.paused:
+                self.game.stats.record_frame(self.frame_time, self.game.stack_height())
+            elif self.game.state == "gameover" and not self.telemetry_saved:
+                self.save_telemetry()
                 
-            if self.game.game_over_animation > 0:
-                self.game.game_over_animation -= 1
+            for _ in range(ticks):
+                self.update_tick()
+        elif self.state == "arena":
+            for _ in range(ticks):
+                self.update_arena_tick()
                 
-            # Update game logic
-            if not self.game.paused:
-                self.game.update()
+    def update_auto_repeat(self) -> None:
+        """Apply the repeats of held movement keys due by now"""
+        # Drop keys released without a KEYUP we saw
+        keys = pygame.key.get_pressed()
+        for action in list(self.auto_repeat.pressed):
+            if not keys[self.settings.controls[action]]:
+                self.auto_repeat.release(action)
+                
+        now = time.perf_counter()
+        repeats = self.auto_repeat.poll(now, self.game.width)
+        if not repeats or self.game.state != "start" or self.game.paused:
+            return
+        for action, count in repeats:
+            for _ in range(count):
+                self.game.apply(action)
+        if self.input_time is None:
+            self.input_time = now
+            
+    def update_tick(self) -> None:
+        """Advance the game and its animations by one tick"""
+        # Update animations
+        if self.game.level_up_animation > 0:
+            self.game.level_up_animation -= 1
+            
+        if self.game.game_over_animation > 0:
+            self.game.game_over_animation -= 1
+            
+        # Update game logic
+        if not self.game.paused:
+            if self.autoplay and self.bot:
+                for _ in range(BOT_INPUTS_PER_TICK):
+                    if self.bot.step(self.game) in (None, "hard_drop"):
+                        break
+            self.game.update()
+    
+    def save_telemetry(self) -> None:
+        """Export the finished game's telemetry samples to CSV"""
+        self.telemetry_saved = True
+        if not self.settings.settings["save_telemetry"]:
+            return
+        try:
+            os.makedirs(TELEMETRY_DIR, exist_ok=True)
+            filename = os.path.join(
+                TELEMETRY_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.player_name}.csv")
+            self.game.stats.telemetry.write_csv(filename)
+        except IOError:
+            print(f"Error saving telemetry to {TELEMETRY_DIR}")
     
     def run(self) -> None:
         """Main game loop"""
         running = True
         while running:
+            frame_start = time.perf_counter()
+            
             # Handle input
             self.handle_input()
             
@@ -1416,30 +1405,42 @@ class TetrisGame:
                 self.draw_controls_menu()
             elif self.state == "game":
                 self.draw_game_screen()
+            elif self.state == "arena":
+                self.draw_arena()
             
             # Update display
             pygame.display.flip()
+            now = time.perf_counter()
+            self.frame_time = now - frame_start
+            
+            # Input latency: from reading the input to showing its result
+            if self.input_time is not None:
+                if self.game:
+                    self.game.stats.record_input(now - self.input_time)
+                self.input_time = None
             
             # Cap framerate
-            self.clock.tick(FPS)
+            self.clock.tick(self.settings.settings["fps"])
 
-# Pygame
-pygame.init()
-info = pygame.display.Info()
-screen_width = info.current_w
-screen_height = info.current_h
-screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
-pygame.display.set_caption("Tetris Rank")
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-GRAY = (128, 128, 128)
-
-font = pygame.font.SysFont('Calibri', 40, True, False)
-small_font = pygame.font.SysFont('Calibri', 30, True, False)
-
-clock = pygame.time.Clock()
+# Menu antigo (tela "Tetris Rank"), aberto com --legacy
+screen = None
+screen_width = screen_height = 0
+font = small_font = None
+clock = None
 fps = 25
 
+def init_legacy_display():
+    global screen, screen_width, screen_height, font, small_font, clock
+    pygame.init()
+    info = pygame.display.Info()
+    screen_width = info.current_w
+    screen_height = info.current_h
+    screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
+    pygame.display.set_caption("Tetris Rank")
+    font = pygame.font.SysFont('Calibri', 40, True, False)
+    small_font = pygame.font.SysFont('Calibri', 30, True, False)
+    clock = pygame.time.Clock()
+
 def draw_text_center(text, y):
     txt = font.render(text, True, WHITE)
     screen.blit(txt, ((screen_width - txt.get_width()) // 2, y))
@@ -1495,72 +1496,74 @@ def show_ranking():
             if event.type == pygame.QUIT:
                 pygame.quit(); exit()
 
-while True:
-    choice = menu()
-    if choice == "ranking":
-        show_ranking()
-    elif choice == "jogar":
-        player_name = get_player_name()
-        game = Tetris(20, 10, screen_width, screen_height)
-        counter = 0
-        pressing_down = False
-        done = False
-        while not done:
-            if game.figure is None:
-                game.new_figure()
-            counter += 1
-            if counter > 100000:
-                counter = 0
-            if counter % (fps // game.level // 2) == 0 or pressing_down:
-                if game.state == "start":
-                    game.go_down()
+def run_legacy():
+    init_legacy_display()
+    while True:
+        choice = menu()
+        if choice == "ranking":
+            show_ranking()
+        elif choice == "jogar":
+            player_name = get_player_name()
+            game = Tetris(20, 10, screen_width, screen_height)
+            ticks = TickScheduler()
+            pressing_down = False
+            done = False
+            while not done:
+                if game.figure is None:
+                    game.new_figure()
+                # Gravidade em ticks fixos, a mesma velocidade com qualquer fps
+                for _ in range(ticks.advance()):
+                    game.update()
+                    if pressing_down and game.state == "start":
+                        game.go_down()
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    done = True
-                    pygame.quit(); exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        game.rotate()
-                    if event.key == pygame.K_DOWN:
-                        pressing_down = True
-                    if event.key == pygame.K_LEFT:
-                        game.go_side(-1)
-                    if event.key == pygame.K_RIGHT:
-                        game.go_side(1)
-                    if event.key == pygame.K_SPACE:
-                        game.go_space()
-                    if event.key == pygame.K_ESCAPE:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
                         done = True
-                if event.type == pygame.KEYUP:
-                    if event.key == pygame.K_DOWN:
-                        pressing_down = False
+                        pygame.quit(); exit()
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_UP:
+                            game.rotate()
+                        if event.key == pygame.K_DOWN:
+                            pressing_down = True
+                        if event.key == pygame.K_LEFT:
+                            game.go_side(-1)
+                        if event.key == pygame.K_RIGHT:
+                            game.go_side(1)
+                        if event.key == pygame.K_SPACE:
+                            game.go_space()
+                        if event.key == pygame.K_ESCAPE:
+                            done = True
+                    if event.type == pygame.KEYUP:
+                        if event.key == pygame.K_DOWN:
+                            pressing_down = False
 
-            screen.fill(BLACK)
-            for i in range(game.height):
-                for j in range(game.width):
-                    pygame.draw.rect(screen, GRAY, [game.x + game.zoom * j, game.y + game.zoom * i, game.zoom, game.zoom], 1)
-                    if game.field[i][j] > 0:
-                        pygame.draw.rect(screen, colors[game.field[i][j]], [game.x + game.zoom * j + 1, game.y + game.zoom * i + 1, game.zoom - 2, game.zoom - 1])
+                screen.fill(BLACK)
+                for i in range(game.height):
+                    for j in range(game.width):
+                        pygame.draw.rect(screen, GRAY, [game.x + game.zoom * j, game.y + game.zoom * i, game.zoom, game.zoom], 1)
+                        if game.field[i][j] > 0:
+                            pygame.draw.rect(screen, COLORS[game.field[i][j]], [game.x + game.zoom * j + 1, game.y + game.zoom * i + 1, game.zoom - 2, game.zoom - 1])
 
-            if game.figure is not None:
-                for i in range(4):
-                    for j in range(4):
-                        p = i * 4 + j
-                        if p in game.figure.image():
-                            pygame.draw.rect(screen, colors[game.figure.color], [game.x + game.zoom * (j + game.figure.x) + 1, game.y + game.zoom * (i + game.figure.y) + 1, game.zoom - 2, game.zoom - 2])
+                if game.figure is not None:
+                    for i, j in game.figure.cells():
+                        pygame.draw.rect(screen, COLORS[game.figure.color], [game.x + game.zoom * (j + game.figure.x) + 1, game.y + game.zoom * (i + game.figure.y) + 1, game.zoom - 2, game.zoom - 2])
 
-            score_text = small_font.render("Score: " + str(game.score), True, WHITE)
-            screen.blit(score_text, [game.x, game.y - 30])      
+                score_text = small_font.render("Score: " + str(game.score), True, WHITE)
+                screen.blit(score_text, [game.x, game.y - 30])      
 
-            if game.state == "gameover":
-                draw_text_center("Game Over", screen_height // 2)
-                draw_text_center("Pressione ESC", screen_height // 2 + 50)
-                add_score(player_name, game.score)
+                if game.state == "gameover":
+                    draw_text_center("Game Over", screen_height // 2)
+                    draw_text_center("Pressione ESC", screen_height // 2 + 50)
+                    add_score(player_name, game.score)
+
+                pygame.display.flip()
+                clock.tick(fps)
 
-            pygame.display.flip()
-            clock.tick(fps)
 
 if __name__ == "__main__":
-    game = TetrisGame()
-    game.run()
\ No newline at end of file
+    if "--legacy" in sys.argv:
+        run_legacy()
+    else:
+        game = TetrisGame()
+        game.run()
\ No newline at end of file
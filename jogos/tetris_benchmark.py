@@ -0,0 +1,78 @@
+"""Headless Tetris throughput benchmark.
+
+Plays games with the pygame-free engine as fast as possible, using random
+rotations and shifts followed by a hard drop, and reports how many pieces
+and cleared lines the engine processes per second.
+
+    python jogos/tetris_benchmark.py --pieces 50000 --seed 1
+"""
+import argparse
+import random
+import time
+
+from tetris_engine import Tetris
+
+
+def play_random_piece(game: Tetris, rng: random.Random) -> None:
+    """Rotate, shift and hard drop the current piece at random"""
+    for _ in range(rng.randrange(4)):
+        game.apply("rotate_cw")
+    shift = rng.randint(-5, 5)
+    action = "move_left" if shift < 0 else "move_right"
+    for _ in range(abs(shift)):
+        game.apply(action)
+    if rng.random() < 0.1:
+        game.apply("hold")
+    game.apply("hard_drop")
+
+
+def run_benchmark(pieces: int, seed: int, width: int = 10, height: int = 20) -> dict:
+    """Drop the given number of pieces and return the measured rates"""
+    random.seed(seed)
+    rng = random.Random(seed)
+    game = Tetris(height, width, line_clear_frames=0)
+    game.new_figure()
+    games = 1
+    placed = 0
+    lines = 0
+
+    start = time.perf_counter()
+    while placed + game.stats.pieces_placed < pieces:
+        if game.state != "start":
+            lines += game.stats.lines_cleared
+            placed += game.stats.pieces_placed
+            game.restart()
+            games += 1
+            continue
+        play_random_piece(game, rng)
+    lines += game.stats.lines_cleared
+    placed += game.stats.pieces_placed
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "pieces": placed,
+        "lines": lines,
+        "seconds": elapsed,
+        "pieces_per_second": placed / elapsed,
+        "lines_per_second": lines / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless Tetris engine benchmark")
+    parser.add_argument("--pieces", type=int, default=20000, help="pieces to drop")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.pieces, args.seed)
+    print(f"Games:         {result['games']}")
+    print(f"Pieces:        {result['pieces']}")
+    print(f"Lines:         {result['lines']}")
+    print(f"Time:          {result['seconds']:.2f}s")
+    print(f"Pieces/s:      {result['pieces_per_second']:.0f}")
+    print(f"Line clears/s: {result['lines_per_second']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Heuristic Tetris autoplayer.
+
+The bot enumerates every final placement of the current piece (and of the
+piece a hold would bring in), builds the resulting boards and scores all of
+them in one NumPy batch using classic board features. It drives the game
+through the normal Tetris API, one input at a time, so the same bot works
+in the windowed TetrisGame (attract mode) and in headless soak tests.
+
+    python jogos/tetris_bot.py --games 20 --lookahead
+"""
+import argparse
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tetris_engine import Figure, Tetris, column_tops, lock_rows, rows_collide, skyline_drop
+
+# Order of the columns returned by board_features() and of the weights
+FEATURES = ("lines", "height", "holes", "bumpiness", "wells")
+
+DEFAULT_WEIGHTS = {
+    "lines": 0.76,
+    "height": -0.51,
+    "holes": -0.36,
+    "bumpiness": -0.18,
+    "wells": -0.1,
+}
+
+# Score given to a branch where the following piece has nowhere to go
+TOP_OUT_SCORE = -1e9
+
+
+class Placement(NamedTuple):
+    """Final position chosen for a piece"""
+    hold: bool
+    rotation: int
+    x: int
+    y: int
+
+
+def enumerate_placements(rows: Sequence[int], full_row: int, width: int, piece_type: int,
+                         spawn_y: int = 0, tops: Optional[Sequence[int]] = None
+                         ) -> List[Tuple[int, int, int, List[int], int]]:
+    """List every (rotation, x, y, rows after lock, lines cleared) for a piece
+
+    A placement is any column and rotation where the piece fits at the spawn
+    row, hard dropped straight down. tops is the column skyline of rows and
+    is computed when not given.
+    """
+    if tops is None:
+        tops = column_tops(rows, width)
+    placements = []
+    for rotation, masks in enumerate(Figure.ROW_MASKS[piece_type]):
+        min_col, _, max_col, _ = Figure.BOUNDS[piece_type][rotation]
+        bottoms = Figure.BOTTOMS[piece_type][rotation]
+        for x in range(-min_col, width - max_col):
+            if rows_collide(rows, full_row, masks, x, spawn_y):
+                continue
+            distance = skyline_drop(tops, bottoms, x, spawn_y)
+            if distance is None:
+                distance = 0
+                while not rows_collide(rows, full_row, masks, x, spawn_y + distance + 1):
+                    distance += 1
+            y = spawn_y + distance
+            new_rows, cleared = lock_rows(rows, full_row, masks, x, y)
+            placements.append((rotation, x, y, new_rows, cleared))
+    return placements
+
+
+def board_features(boards: np.ndarray, lines: np.ndarray, width: int) -> np.ndarray:
+    """Compute the FEATURES of a batch of boards
+
+    boards is an (N, height) array of row bitmasks and lines the number of
+    lines each board cleared. Returns an (N, len(FEATURES)) float array.
+    """
+    height = boards.shape[1]
+    cells = ((boards[:, :, None] >> np.arange(width)) & 1).astype(bool)
+
+    # Column heights measured from the floor
+    filled = cells.any(axis=1)
+    heights = np.where(filled, height - cells.argmax(axis=1), 0)
+
+    # Holes are empty cells with a filled cell somewhere above them
+    covered = np.logical_or.accumulate(cells, axis=1)
+    holes = (covered & ~cells).sum(axis=(1, 2))
+
+    bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+
+    # Walls count as full height when measuring wells
+    padded = np.pad(heights, ((0, 0), (1, 1)), constant_values=height)
+    wells = np.clip(np.minimum(padded[:, :-2], padded[:, 2:]) - heights, 0, None).sum(axis=1)
+
+    return np.stack([lines, heights.sum(axis=1), holes, bumpiness, wells], axis=1).astype(float)
+
+
+class TetrisBot:
+    """Plays Tetris by scoring every final placement of the current piece"""
+
+    def __init__(self, weights: Optional[Sequence[float]] = None, use_hold: bool = True,
+                 lookahead: bool = False):
+        if weights is None:
+            weights = [DEFAULT_WEIGHTS[name] for name in FEATURES]
+        self.weights = np.asarray(weights, dtype=float)
+        self.use_hold = use_hold
+        self.lookahead = lookahead
+
+        # Decision statistics
+        self.decisions = 0
+        self.decision_time = 0.0
+
+        # Plan being executed, the figure it belongs to and the inputs left
+        self._plan: Optional[Placement] = None
+        self._figure: Optional[Figure] = None
+        self._path: Optional[List[str]] = None
+
+    @property
+    def decisions_per_second(self) -> float:
+        """Average number of placements chosen per second of thinking"""
+        if self.decision_time == 0:
+            return 0.0
+        return self.decisions / self.decision_time
+
+    def _evaluate(self, game: Tetris, candidates: List[Tuple[bool, int, int, int, List[int], int]],
+                  follow_up: List[Optional[int]]) -> np.ndarray:
+        """Score candidate boards, optionally looking one piece further ahead"""
+        width = game.width
+        full_row = game.field.full_row
+
+        if not self.lookahead:
+            boards = np.array([c[4] for c in candidates], dtype=np.int64)
+            lines = np.array([c[5] for c in candidates])
+            return board_features(boards, lines, width) @ self.weights
+
+        # Second ply: every placement of the following piece on every board,
+        # evaluated as one batch and reduced to the best score per candidate
+        boards, lines, groups = [], [], []
+        for index, (hold, _, _, _, rows, cleared) in enumerate(candidates):
+            piece = follow_up[1 if hold else 0]
+            if piece is None:
+                boards.append(rows)
+                lines.append(cleared)
+                groups.append(index)
+                continue
+            for _, _, _, new_rows, more in enumerate_placements(rows, full_row, width, piece):
+                boards.append(new_rows)
+                lines.append(cleared + more)
+                groups.append(index)
+
+        scores = np.full(len(candidates), TOP_OUT_SCORE)
+        if boards:
+            values = board_features(np.array(boards, dtype=np.int64), np.array(lines),
+                                    width) @ self.weights
+            np.maximum.at(scores, np.array(groups), values)
+        return scores
+
+    def choose(self, game: Tetris) -> Optional[Placement]:
+        """Pick the best placement for the current piece"""
+        if not game.figure:
+            return None
+        start = time.perf_counter()
+        rows = game.field.rows
+        full_row = game.field.full_row
+
+        # The piece a hold would bring in, and what comes after each choice
+        swap = None
+        if self.use_hold and game.can_hold:
+            swap = game.held_figure or game.next_figure
+        next_type = game.next_figure.type if game.next_figure else None
+        if swap is game.next_figure:
+            # Holding into an empty slot consumes the preview piece
+            follow_up = [next_type, game.figure.type]
+        else:
+            follow_up = [next_type, next_type]
+
+        candidates = []
+        for hold, figure in ((False, game.figure), (True, swap)):
+            if figure is None:
+                continue
+            for rotation, x, y, new_rows, cleared in enumerate_placements(
+                    rows, full_row, game.width, figure.type, game.figure.y, game.field.tops):
+                candidates.append((hold, rotation, x, y, new_rows, cleared))
+
+        best = None
+        if candidates:
+            scores = self._evaluate(game, candidates, follow_up)
+            hold, rotation, x, y, _, _ = candidates[int(np.argmax(scores))]
+            best = Placement(hold, rotation, x, y)
+
+        self.decisions += 1
+        self.decision_time += time.perf_counter() - start
+        return best
+
+    def next_action(self, game: Tetris) -> Optional[str]:
+        """Get the next input needed to reach the planned placement"""
+        if game.paused or not game.accepts_input():
+            return None
+        if self._figure is not game.figure:
+            self._plan = self.choose(game)
+            self._figure = game.figure
+            self._path = None
+        plan = self._plan
+        if plan is None:
+            return "hard_drop"
+        if plan.hold:
+            return "hold"
+        if self._path:
+            return self._path.pop(0)
+        if game.figure.rotation != plan.rotation:
+            return "rotate_cw"
+        if game.figure.x < plan.x:
+            return "move_right"
+        if game.figure.x > plan.x:
+            return "move_left"
+        return "hard_drop"
+
+    def step(self, game: Tetris) -> Optional[str]:
+        """Apply one input of the plan and return the action taken"""
+        action = self.next_action(game)
+        if action is None:
+            return None
+        figure = game.figure
+        before = (figure.rotation, figure.x)
+        game.apply(action)
+
+        if action == "hold":
+            # Keep following the same plan with the swapped-in piece
+            self._plan = self._plan._replace(hold=False)
+            self._figure = game.figure
+        elif action != "hard_drop" and game.figure is figure and \
+                (figure.rotation, figure.x) == before:
+            # Blocked on the way: ask the pathfinder once, then give up and
+            # lock the piece where it is
+            plan = self._plan
+            path = None
+            if self._path is None:
+                path = game.reachable_placements().get((plan.x, plan.y, plan.rotation))
+            if path:
+                self._path = path
+            else:
+                game.apply("hard_drop")
+                action = "hard_drop"
+        return action
+
+    def play_piece(self, game: Tetris) -> None:
+        """Apply inputs until the current piece is locked"""
+        while self.step(game) not in (None, "hard_drop"):
+            pass
+
+
+def play_game(bot: TetrisBot, seed: int, max_pieces: int) -> Tetris:
+    """Let the bot play one seeded game until it tops out or hits max_pieces"""
+    game = Tetris(20, 10, line_clear_frames=0, seed=seed)
+    game.new_figure()
+    while game.state == "start" and game.stats.pieces_placed < max_pieces:
+        bot.play_piece(game)
+    return game
+
+
+def run_headless(games: int, seed: int, max_pieces: int, bot: TetrisBot) -> dict:
+    """Let the bot play several seeded games and collect the results"""
+    lines, pieces = [], []
+    start = time.perf_counter()
+    for i in range(games):
+        game = play_game(bot, seed + i, max_pieces)
+        lines.append(game.stats.lines_cleared)
+        pieces.append(game.stats.pieces_placed)
+    elapsed = time.perf_counter() - start
+    return {
+        "lines": lines,
+        "pieces": pieces,
+        "seconds": elapsed,
+        "decisions_per_second": bot.decisions_per_second,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless Tetris bot soak test")
+    parser.add_argument("--games", type=int, default=5, help="games to play")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--max-pieces", type=int, default=1000, help="piece limit per game")
+    parser.add_argument("--lookahead", action="store_true", help="also search the next piece")
+    parser.add_argument("--no-hold", action="store_true", help="never use the hold slot")
+    args = parser.parse_args()
+
+    bot = TetrisBot(use_hold=not args.no_hold, lookahead=args.lookahead)
+    result = run_headless(args.games, args.seed, args.max_pieces, bot)
+    print(f"Games:         {args.games}")
+    print(f"Lines:         {result['lines']}")
+    print(f"Pieces:        {sum(result['pieces'])}")
+    print(f"Time:          {result['seconds']:.2f}s")
+    print(f"Decisions/s:   {result['decisions_per_second']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
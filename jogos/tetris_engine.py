@@ -0,0 +1,1251 @@
+"""Pygame-free Tetris rules.
+
+Everything needed to play a game programmatically lives here: the field,
+the pieces, scoring and statistics. The windowed front end in tetris.py
+and the headless tools (benchmarks, bots) drive the same Tetris class.
+"""
+import csv
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Sequence, Tuple, Optional
+
+# Constants
+COLORS = [
+    (0, 0, 0),         # Black (background)
+    (120, 37, 179),    # Purple
+    (100, 179, 179),   # Cyan
+    (80, 134, 22),     # Green
+    (180, 34, 22),     # Red
+    (180, 134, 22),    # Orange
+    (180, 34, 122),    # Pink
+    (0, 180, 255),     # Light Blue
+]
+
+# Game settings
+INITIAL_LEVEL = 1
+LEVEL_SPEED_FACTOR = 5  # How much faster each level is
+SCORE_PER_LINE = 100
+SCORE_BONUS_MULTIPLIER = 2  # Bonus for multiple lines at once
+SCORE_FOR_SOFT_DROP = 1
+SCORE_FOR_HARD_DROP = 2
+LINE_CLEAR_FRAMES = 10  # Frames the clear animation lasts before rows collapse
+KICKS = (0, -1, 1, -2, 2)  # Horizontal offsets tried, in order, when rotating
+
+# Timing - the game advances in fixed ticks whatever the display rate
+TICK_RATE = 60  # Ticks per second (Tetris.frame counts ticks)
+MAX_TICKS_PER_UPDATE = 8  # Ticks run at once before falling behind real time
+MAX_GRAVITY = 20.0  # Cells per tick, the whole field height
+LOCK_DELAY = 30  # Ticks a landed piece waits before locking
+LOCK_RESETS = 15  # Moves or rotations allowed to restart the lock delay
+
+# Zobrist hashing
+ZOBRIST_SEED = "tetris-zobrist"
+
+# Undo history of practice mode
+HISTORY_SIZE = 100  # Pieces that can be undone
+
+# Telemetry
+TELEMETRY_INTERVAL = 1.0  # Seconds per sample
+TELEMETRY_SIZE = 3600  # Samples kept (an hour at one per second)
+
+
+def rows_collide(rows: Sequence[int], full_row: int, masks: Tuple[int, ...],
+                 x: int, y: int) -> bool:
+    """Check piece row masks placed with their top-left corner at (x, y)"""
+    height = len(rows)
+    for i, mask in enumerate(masks):
+        if not mask:
+            continue
+        if x >= 0:
+            shifted = mask << x
+        elif mask & ((1 << -x) - 1):
+            return True  # Left wall
+        else:
+            shifted = mask >> -x
+        if shifted & ~full_row:
+            return True  # Right wall
+        row = y + i
+        if row >= height:
+            return True  # Floor
+        if row >= 0 and rows[row] & shifted:
+            return True
+    return False
+
+
+def lock_rows(rows: Sequence[int], full_row: int, masks: Tuple[int, ...],
+              x: int, y: int) -> Tuple[List[int], int]:
+    """Lock piece masks into a copy of the rows and clear completed lines
+
+    Follows the same rules as Tetris.freeze() and returns the new rows with
+    the number of lines cleared.
+    """
+    new_rows = list(rows)
+    for i, mask in enumerate(masks):
+        if mask and y + i >= 0:
+            new_rows[y + i] |= mask << x if x >= 0 else mask >> -x
+    kept = [new_rows[0]] + [r for r in new_rows[1:] if r != full_row]
+    cleared = len(new_rows) - len(kept)
+    if cleared:
+        kept = [0] * cleared + kept
+    return kept, cleared
+
+
+def column_tops(rows: Sequence[int], width: int) -> List[int]:
+    """Get the row of the highest block in each column (len(rows) if empty)"""
+    height = len(rows)
+    tops = [height] * width
+    seen = 0
+    full_row = (1 << width) - 1
+    for i, row in enumerate(rows):
+        new = row & ~seen
+        while new:
+            low = new & -new
+            tops[low.bit_length() - 1] = i
+            new ^= low
+        seen |= row
+        if seen == full_row:
+            break
+    return tops
+
+
+def skyline_drop(tops: Sequence[int], bottoms: Tuple[int, ...], x: int, y: int) -> Optional[int]:
+    """Get how many rows a piece at (x, y) falls before landing
+
+    Uses only the column skyline and the piece's lowest cell per column.
+    Returns None when a column already has a block above the piece (the
+    piece is tucked under an overhang) and the skyline can't tell.
+    """
+    distance = None
+    for j, bottom in enumerate(bottoms):
+        if bottom < 0:
+            continue
+        gap = tops[x + j] - (y + bottom) - 1
+        if gap < 0:
+            return None
+        if distance is None or gap < distance:
+            distance = gap
+    return distance
+
+
+def gravity_for_level(level: int) -> float:
+    """Get the falling speed of a level in cells per tick (G)
+
+    Seconds per row follow the usual (0.8 - (level - 1) * 0.007) ** (level - 1)
+    curve: one row per second at level 1, about 1G at level 13 and MAX_GRAVITY from
+    level 19 on.
+    """
+    level = min(level, 20)  # Past MAX_GRAVITY the curve stops making sense
+    seconds = (0.8 - (level - 1) * 0.007) ** (level - 1)
+    return min(MAX_GRAVITY, 1 / (seconds * TICK_RATE))
+
+
+def fit_masks(rows: Sequence[int], width: int, piece_type: int) -> List[Dict[int, int]]:
+    """Get where a piece fits, as [rotation][x] -> bitmask over y
+
+    Bit y is set when the piece fits with its top-left corner at (x, y).
+    The board is transposed into one occupancy bitmask per column, so each
+    (rotation, x) costs one shift and OR per block instead of a collision
+    check per row.
+    """
+    height = len(rows)
+    columns = [0] * width
+    for i, row in enumerate(rows):
+        while row:
+            low = row & -row
+            columns[low.bit_length() - 1] |= 1 << i
+            row ^= low
+
+    masks = []
+    for rotation, cells in enumerate(Figure.CELLS[piece_type]):
+        min_col, _, max_col, max_row = Figure.BOUNDS[piece_type][rotation]
+        floor = (1 << (height - max_row)) - 1
+        fits = {}
+        for x in range(-min_col, width - max_col):
+            blocked = 0
+            for i, j in cells:
+                blocked |= columns[x + j] >> i
+            fits[x] = ~blocked & floor
+        masks.append(fits)
+    return masks
+
+
+def reachable_placements(rows: Sequence[int], width: int, piece_type: int, x: int, y: int,
+                         rotation: int) -> Dict[Tuple[int, int, int], List[str]]:
+    """Find every lock position reachable from (x, y, rotation) and how
+
+    Breadth-first search over (x, y, rotation) using the same moves and
+    KICKS as Tetris, without gravity. Returns the shortest list of
+    Tetris.ACTIONS leading to each (x, y, rotation) the piece can lock at,
+    always ending with a hard drop.
+    """
+    fits = fit_masks(rows, width, piece_type)
+    rotations = len(fits)
+    start = (x, y, rotation)
+    if not fits[rotation].get(x, 0) >> y & 1:
+        return {}
+
+    parents: Dict[Tuple[int, int, int], Tuple[Optional[Tuple[int, int, int]], str]] = {
+        start: (None, "")}
+    placements: Dict[Tuple[int, int, int], List[str]] = {}
+    queue = [start]
+    for state in queue:
+        x, y, rotation = state
+        column = fits[rotation][x]
+
+        # Hard drop: lowest fitting y below the current one
+        blocked = ~column >> (y + 1)
+        landing = (x, y + (blocked & -blocked).bit_length() - 1, rotation)
+        if landing not in placements:
+            path = ["hard_drop"]
+            while state != start:
+                state, action = parents[state]
+                path.append(action)
+            placements[landing] = path[::-1]
+
+        moves = [((x - 1, y, rotation), "move_left"), ((x + 1, y, rotation), "move_right"),
+                 ((x, y + 1, rotation), "soft_drop")]
+        for action, turn in (("rotate_ccw", -1), ("rotate_cw", 1)):
+            new_rotation = (rotation + turn) % rotations
+            for kick in KICKS:
+                if fits[new_rotation].get(x + kick, 0) >> y & 1:
+                    moves.append(((x + kick, y, new_rotation), action))
+                    break
+        for target, action in moves:
+            if target not in parents and fits[target[2]].get(target[0], 0) >> target[1] & 1:
+                parents[target] = ((x, y, rotation), action)
+                queue.append(target)
+    return placements
+
+
+_zobrist_tables: Dict[Tuple[int, int], List[List[int]]] = {}
+
+
+def zobrist_table(height: int, width: int) -> List[List[int]]:
+    """Get the random 64-bit key of every cell, shared by fields of one size"""
+    size = (height, width)
+    if size not in _zobrist_tables:
+        rng = random.Random(f"{ZOBRIST_SEED}-{height}x{width}")
+        _zobrist_tables[size] = [[rng.getrandbits(64) for _ in range(width)]
+                                 for _ in range(height)]
+    return _zobrist_tables[size]
+
+
+def zobrist_row(keys: List[int], mask: int) -> int:
+    """XOR of the keys of the cells set in one row mask"""
+    value = 0
+    while mask:
+        low = mask & -mask
+        value ^= keys[low.bit_length() - 1]
+        mask ^= low
+    return value
+
+
+def zobrist_hash(table: List[List[int]], rows: Sequence[int]) -> int:
+    """Hash a whole board from scratch"""
+    value = 0
+    for keys, row in zip(table, rows):
+        if row:
+            value ^= zobrist_row(keys, row)
+    return value
+
+
+def piece_hash(table: List[List[int]], masks: Tuple[int, ...], x: int, y: int) -> int:
+    """Hash of the cells a piece adds when locked at (x, y)"""
+    value = 0
+    for i, mask in enumerate(masks):
+        if mask and y + i >= 0:
+            value ^= zobrist_row(table[y + i], mask << x if x >= 0 else mask >> -x)
+    return value
+
+
+class BitboardField:
+    """Game field stored as one integer occupancy bitmask per row.
+
+    Bit ``j`` of ``rows[i]`` is set when cell (i, j) holds a block. Colours
+    live in a parallel list of rows used only for rendering, so
+    ``field[i][j]`` still returns the colour index of a cell. ``tops`` is the
+    column skyline (row of the highest block, height when empty), kept up to
+    date as pieces lock and lines clear. ``version`` changes whenever the
+    contents change, so renderers know when to redraw, and ``hash`` is the
+    Zobrist hash of the occupied cells, updated cell by cell as pieces lock.
+    
+    ``frozen`` keeps an immutable copy of each colour row until the row is
+    written to, so consecutive snapshots share every row that didn't change.
+    """
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+        self.full_row = (1 << width) - 1
+        self.rows: List[int] = []
+        self.colors: List[List[int]] = []
+        self.tops: List[int] = []
+        self.frozen: List[Optional[Tuple[int, ...]]] = []
+        self.version = 0
+        self.zobrist = zobrist_table(height, width)
+        self.hash = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Empty every row"""
+        self.rows = [0] * self.height
+        self.colors = [[0] * self.width for _ in range(self.height)]
+        self.tops = [self.height] * self.width
+        self.frozen = [(0,) * self.width] * self.height
+        self.version += 1
+        self.hash = 0
+
+    def __getitem__(self, i: int) -> List[int]:
+        return self.colors[i]
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __iter__(self):
+        return iter(self.colors)
+
+    def collides(self, masks: Tuple[int, ...], x: int, y: int) -> bool:
+        """Check piece row masks placed with their top-left corner at (x, y)"""
+        return rows_collide(self.rows, self.full_row, masks, x, y)
+
+    def place(self, masks: Tuple[int, ...], x: int, y: int, color: int) -> None:
+        """Write piece row masks into the field with the given colour"""
+        self.version += 1
+        for i, mask in enumerate(masks):
+            row = y + i
+            if not mask or row < 0:
+                continue
+            shifted = mask << x if x >= 0 else mask >> -x
+            self.hash ^= zobrist_row(self.zobrist[row], shifted & ~self.rows[row])
+            self.rows[row] |= shifted
+            self.frozen[row] = None
+            colors = self.colors[row]
+            tops = self.tops
+            while shifted:
+                low = shifted & -shifted
+                col = low.bit_length() - 1
+                colors[col] = color
+                if row < tops[col]:
+                    tops[col] = row
+                shifted ^= low
+
+    def full_rows(self) -> List[int]:
+        """Indexes of completed rows (the top row never counts)"""
+        full = self.full_row
+        return [i for i in range(1, self.height) if self.rows[i] == full]
+
+    def clear_rows(self, lines: List[int]) -> None:
+        """Remove the given rows and compact everything above them in one pass"""
+        if not lines:
+            return
+        self.version += 1
+        removed = set(lines)
+        keep = [i for i in range(self.height) if i not in removed]
+        count = self.height - len(keep)
+        self.rows = [0] * count + [self.rows[i] for i in keep]
+        self.colors = ([[0] * self.width for _ in range(count)] +
+                       [self.colors[i] for i in keep])
+        self.frozen = [(0,) * self.width] * count + [self.frozen[i] for i in keep]
+        
+        # Every remaining cell moved, so the hash is rebuilt
+        self.hash = zobrist_hash(self.zobrist, self.rows)
+        
+        # Cleared rows are full, so no column top is below the first of them.
+        # Tops above it just move down; columns whose top was cleared are
+        # rescanned from the first non-empty row.
+        first = min(removed)
+        for j, top in enumerate(self.tops):
+            if top < first:
+                self.tops[j] = top + count
+            else:
+                bit = 1 << j
+                top = count
+                while top < self.height and not self.rows[top] & bit:
+                    top += 1
+                self.tops[j] = top
+
+    def frozen_colors(self) -> Tuple[Tuple[int, ...], ...]:
+        """Immutable copy of the colours, reusing rows unchanged since the last one"""
+        frozen = self.frozen
+        for i, row in enumerate(frozen):
+            if row is None:
+                frozen[i] = tuple(self.colors[i])
+        return tuple(frozen)
+
+    def restore(self, rows: Sequence[int], colors: Sequence[Tuple[int, ...]],
+                field_hash: int) -> None:
+        """Replace the contents with rows and colours from a snapshot"""
+        self.rows = list(rows)
+        self.colors = [list(row) for row in colors]
+        self.frozen = list(colors)
+        self.tops = column_tops(self.rows, self.width)
+        self.hash = field_hash
+        self.version += 1
+
+    def drop_distance(self, bottoms: Tuple[int, ...], x: int, y: int) -> Optional[int]:
+        """Rows a piece at (x, y) can fall, or None under an overhang"""
+        return skyline_drop(self.tops, bottoms, x, y)
+
+
+class Figure:
+    """Represents a Tetris piece (tetromino)"""
+    
+    # Tetromino definitions - each number represents a position in a 4x4 grid
+    # Each sublist represents a rotation state
+    TETROMINOS = [
+        # I-piece
+        [[1, 5, 9, 13], [4, 5, 6, 7]],
+        # Z-piece
+        [[4, 5, 9, 10], [2, 6, 5, 9]],
+        # S-piece
+        [[6, 7, 9, 10], [1, 5, 6, 10]],
+        # J-piece
+        [[1, 2, 5, 9], [0, 4, 5, 6], [1, 5, 9, 8], [4, 5, 6, 10]],
+        # L-piece
+        [[1, 2, 6, 10], [5, 6, 7, 9], [2, 6, 10, 11], [3, 5, 6, 7]],
+        # T-piece
+        [[1, 4, 5, 6], [1, 4, 5, 9], [4, 5, 6, 9], [1, 5, 6, 9]],
+        # O-piece
+        [[1, 2, 5, 6]],
+    ]
+    
+    # Names for each piece type (for display and statistics)
+    PIECE_NAMES = ["I", "Z", "S", "J", "L", "T", "O"]
+    
+    # Geometry precomputed at import by _build_piece_tables(), indexed
+    # [type][rotation]:
+    #   CELLS     - (row, col) offset of each block inside the 4x4 grid
+    #   ROW_MASKS - occupancy bitmask of each of the 4 rows (bit = column)
+    #   BOUNDS    - (min_col, min_row, max_col, max_row) of the blocks
+    #   BOTTOMS   - lowest occupied row of each of the 4 columns, -1 if empty
+    CELLS: List[List[Tuple[Tuple[int, int], ...]]] = []
+    ROW_MASKS: List[List[Tuple[int, ...]]] = []
+    BOUNDS: List[List[Tuple[int, int, int, int]]] = []
+    BOTTOMS: List[List[Tuple[int, ...]]] = []
+
+    x = 0
+    y = 0
+    figures = [
+        [[1, 5, 9, 13], [4, 5, 6, 7]],
+        [[4, 5, 9, 10], [2, 6, 5, 9]],
+        [[6, 7, 9, 10], [1, 5, 6, 10]],
+        [[1, 2, 5, 9], [0, 4, 5, 6], [1, 5, 9, 8], [4, 5, 6, 10]],
+        [[1, 2, 6, 10], [5, 6, 7, 9], [2, 6, 10, 11], [3, 5, 6, 7]],
+        [[1, 4, 5, 6], [1, 4, 5, 9], [4, 5, 6, 9], [1, 5, 6, 9]],
+        [[1, 2, 5, 6]],
+    ]
+
+    def __init__(self, x: int, y: int, rng: Optional[random.Random] = None):
+        if rng is None:
+            rng = random
+        self.x = x
+        self.y = y
+        self.type = rng.randint(0, len(self.TETROMINOS) - 1)
+        self.color = rng.randint(1, len(COLORS) - 1)
+        self.rotation = 0
+
+    def image(self) -> List[int]:
+        """Get the current rotation state of the piece"""
+        return self.TETROMINOS[self.type][self.rotation]
+
+    def rotate(self, clockwise: bool = False) -> None:
+        """Rotate the piece (counterclockwise by default)"""
+        if clockwise:
+            self.rotation = (self.rotation + 1) % len(self.TETROMINOS[self.type])
+        else:
+            self.rotation = (self.rotation - 1) % len(self.TETROMINOS[self.type])
+
+    def get_name(self) -> str:
+        """Get the name of the current piece"""
+        return self.PIECE_NAMES[self.type]
+
+    def cells(self) -> Tuple[Tuple[int, int], ...]:
+        """Get the (row, col) offsets of the blocks of the current rotation"""
+        return self.CELLS[self.type][self.rotation]
+
+    def row_masks(self) -> Tuple[int, ...]:
+        """Get the occupancy bitmask of each row of the current rotation"""
+        return self.ROW_MASKS[self.type][self.rotation]
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """Get (min_col, min_row, max_col, max_row) of the current rotation"""
+        return self.BOUNDS[self.type][self.rotation]
+
+    def bottom_profile(self) -> Tuple[int, ...]:
+        """Get the lowest occupied row of each column (-1 if empty)"""
+        return self.BOTTOMS[self.type][self.rotation]
+
+    def state(self) -> Tuple[int, int, int, int, int]:
+        """Get (type, color, rotation, x, y) for a snapshot"""
+        return (self.type, self.color, self.rotation, self.x, self.y)
+
+    @classmethod
+    def from_state(cls, state: Tuple[int, int, int, int, int]) -> "Figure":
+        """Rebuild a figure from state() without touching any RNG"""
+        figure = cls.__new__(cls)
+        figure.type, figure.color, figure.rotation, figure.x, figure.y = state
+        return figure
+
+
+def _build_piece_tables() -> None:
+    """Precompute the geometry of every tetromino rotation"""
+    for rotations in Figure.TETROMINOS:
+        cells, masks, bounds, bottoms = [], [], [], []
+        for image in rotations:
+            offsets = tuple(sorted(divmod(p, 4) for p in image))
+            row_masks = [0, 0, 0, 0]
+            bottom = [-1, -1, -1, -1]
+            for i, j in offsets:
+                row_masks[i] |= 1 << j
+                bottom[j] = max(bottom[j], i)
+            cols = [j for _, j in offsets]
+            rows = [i for i, _ in offsets]
+            cells.append(offsets)
+            masks.append(tuple(row_masks))
+            bounds.append((min(cols), min(rows), max(cols), max(rows)))
+            bottoms.append(tuple(bottom))
+        Figure.CELLS.append(cells)
+        Figure.ROW_MASKS.append(masks)
+        Figure.BOUNDS.append(bounds)
+        Figure.BOTTOMS.append(bottoms)
+
+
+_build_piece_tables()
+
+
+class TetrisSnapshot(NamedTuple):
+    """Immutable state of a Tetris game at one moment
+    
+    Rows are shared with earlier snapshots when unchanged, so taking one
+    costs a couple of tuples of references.
+    """
+    rows: Tuple[int, ...]
+    colors: Tuple[Tuple[int, ...], ...]
+    field_hash: int
+    figure: Optional[Tuple[int, int, int, int, int]]
+    next_figure: Optional[Tuple[int, int, int, int, int]]
+    held_figure: Optional[Tuple[int, int, int, int, int]]
+    can_hold: bool
+    score: int
+    level: int
+    lines_cleared: int
+    pieces_placed: int
+    piece_stats: Tuple[int, ...]
+    cleared_lines: Tuple[int, ...]
+    clear_animation: int
+    state: str
+    frame: int
+    rng_state: Any
+
+
+class SnapshotHistory:
+    """Undo and redo stacks of snapshots, each step O(1)"""
+    
+    def __init__(self, size: int = HISTORY_SIZE):
+        self.done: Deque[TetrisSnapshot] = deque(maxlen=size)
+        self.undone: List[TetrisSnapshot] = []
+        
+    def push(self, snapshot: TetrisSnapshot) -> None:
+        """Record a new current state, dropping anything that was undone"""
+        self.done.append(snapshot)
+        self.undone.clear()
+        
+    def current(self) -> Optional[TetrisSnapshot]:
+        """The latest recorded state"""
+        return self.done[-1] if self.done else None
+        
+    def undo(self) -> Optional[TetrisSnapshot]:
+        """Step back to the previous state, if there is one"""
+        if len(self.done) < 2:
+            return None
+        self.undone.append(self.done.pop())
+        return self.done[-1]
+        
+    def redo(self) -> Optional[TetrisSnapshot]:
+        """Step forward again after an undo"""
+        if not self.undone:
+            return None
+        snapshot = self.undone.pop()
+        self.done.append(snapshot)
+        return snapshot
+        
+    def clear(self) -> None:
+        """Forget every state"""
+        self.done.clear()
+        self.undone.clear()
+
+
+class TelemetryBuffer:
+    """Fixed-size ring buffer of telemetry samples, oldest overwritten first"""
+    
+    FIELDS = ("seconds", "pieces_per_minute", "lines_per_minute", "stack_height",
+              "frame_ms", "max_frame_ms", "input_ms", "max_input_ms")
+    
+    def __init__(self, size: int = TELEMETRY_SIZE):
+        self.size = size
+        self.samples: List[Optional[Tuple[float, ...]]] = [None] * size
+        self.next = 0
+        self.count = 0
+        
+    def __len__(self) -> int:
+        return self.count
+        
+    def append(self, sample: Tuple[float, ...]) -> None:
+        """Store a sample, dropping the oldest one when full"""
+        self.samples[self.next] = sample
+        self.next = (self.next + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        
+    def ordered(self) -> List[Tuple[float, ...]]:
+        """Get the stored samples, oldest first"""
+        if self.count < self.size:
+            return self.samples[:self.count]
+        return self.samples[self.next:] + self.samples[:self.next]
+        
+    def write_csv(self, filename: str) -> None:
+        """Export the samples with a header row"""
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.FIELDS)
+            for sample in self.ordered():
+                writer.writerow(f"{value:.3f}" for value in sample)
+
+
+class TickScheduler:
+    """Turns elapsed real time into a whole number of game ticks
+
+    Time left over from one call carries into the next, so a loop drawing
+    at 30, 60 or 144 FPS runs the same number of ticks per second. After a
+    long stall at most MAX_TICKS_PER_UPDATE ticks run and the rest of the
+    backlog is dropped.
+    """
+    
+    def __init__(self, rate: int = TICK_RATE, max_ticks: int = MAX_TICKS_PER_UPDATE):
+        self.tick_time = 1.0 / rate
+        self.max_ticks = max_ticks
+        self.last_time: Optional[float] = None
+        self.accumulator = 0.0
+        
+    def reset(self) -> None:
+        """Start counting from the next call (after pauses and menus)"""
+        self.last_time = None
+        self.accumulator = 0.0
+        
+    def advance(self, now: Optional[float] = None) -> int:
+        """Get how many ticks are due since the previous call"""
+        if now is None:
+            now = time.perf_counter()
+        if self.last_time is not None:
+            self.accumulator += now - self.last_time
+        self.last_time = now
+        
+        ticks = int(self.accumulator / self.tick_time)
+        if ticks > self.max_ticks:
+            self.accumulator = 0.0
+            return self.max_ticks
+        self.accumulator -= ticks * self.tick_time
+        return ticks
+
+
+class GameStats:
+    """Tracks game statistics
+    
+    Time is measured with the monotonic perf_counter. When the front end
+    reports its frames through record_frame(), one telemetry sample is
+    stored per TELEMETRY_INTERVAL; in between, frames only update a few
+    running totals.
+    """
+    
+    def __init__(self):
+        self.lines_cleared = 0
+        self.pieces_placed = 0
+        self.piece_stats = {name: 0 for name in Figure.PIECE_NAMES}
+        self.start_time = time.perf_counter()
+        self.game_duration = 0
+        
+        # Last formatted duration and the second it shows
+        self.shown_second = -1
+        self.duration_str = "00:00"
+        
+        # Telemetry for the interval in progress
+        self.telemetry = TelemetryBuffer()
+        self.sample_start = self.start_time
+        self.sample_pieces = 0
+        self.sample_lines = 0
+        self.frame_time_sum = 0.0
+        self.frame_time_max = 0.0
+        self.frame_count = 0
+        self.last_stack_height = 0
+        self.input_latency_sum = 0.0
+        self.input_latency_max = 0.0
+        self.input_count = 0
+        
+    def add_piece(self, piece_type: int) -> None:
+        """Record a placed piece"""
+        self.pieces_placed += 1
+        self.piece_stats[Figure.PIECE_NAMES[piece_type]] += 1
+        
+    def add_lines(self, lines: int) -> None:
+        """Record cleared lines"""
+        self.lines_cleared += lines
+        
+    def elapsed(self) -> float:
+        """Seconds since the game started (final duration once it ended)"""
+        if self.game_duration:
+            return self.game_duration
+        return time.perf_counter() - self.start_time
+        
+    def end_game(self) -> None:
+        """Calculate final game duration"""
+        now = time.perf_counter()
+        self.game_duration = now - self.start_time
+        if self.frame_count:
+            self.take_sample(now, self.last_stack_height)
+        
+    def get_duration_str(self) -> str:
+        """Get formatted duration string (only reformatted when the second changes)"""
+        seconds = int(self.elapsed())
+        if seconds != self.shown_second:
+            self.shown_second = seconds
+            self.duration_str = f"{seconds // 60:02d}:{seconds % 60:02d}"
+        return self.duration_str
+        
+    def record_frame(self, frame_time: float, stack_height: int) -> None:
+        """Record one frame's work time (seconds) and the current stack height"""
+        self.frame_time_sum += frame_time
+        self.frame_count += 1
+        if frame_time > self.frame_time_max:
+            self.frame_time_max = frame_time
+        self.last_stack_height = stack_height
+        
+        now = time.perf_counter()
+        if now - self.sample_start >= TELEMETRY_INTERVAL:
+            self.take_sample(now, stack_height)
+            
+    def record_input(self, latency: float) -> None:
+        """Record the seconds between reading an input and showing its result"""
+        self.input_latency_sum += latency
+        self.input_count += 1
+        if latency > self.input_latency_max:
+            self.input_latency_max = latency
+            
+    def take_sample(self, now: float, stack_height: int) -> None:
+        """Close the current interval and store it in the telemetry buffer"""
+        minutes = (now - self.sample_start) / 60
+        if minutes <= 0:
+            return
+        self.telemetry.append((
+            now - self.start_time,
+            (self.pieces_placed - self.sample_pieces) / minutes,
+            (self.lines_cleared - self.sample_lines) / minutes,
+            stack_height,
+            1000 * self.frame_time_sum / max(self.frame_count, 1),
+            1000 * self.frame_time_max,
+            1000 * self.input_latency_sum / max(self.input_count, 1),
+            1000 * self.input_latency_max,
+        ))
+        self.sample_start = now
+        self.sample_pieces = self.pieces_placed
+        self.sample_lines = self.lines_cleared
+        self.frame_time_sum = 0.0
+        self.frame_time_max = 0.0
+        self.frame_count = 0
+        self.input_latency_sum = 0.0
+        self.input_latency_max = 0.0
+        self.input_count = 0
+
+
+class Tetris:
+    """Main game logic class
+    
+    The screen size is only used to lay out the board for the windowed game
+    and can be left at 0 when playing headless. With line_clear_frames=0,
+    completed rows collapse as soon as the piece locks instead of waiting
+    for the clear animation to run through update().
+    
+    Pieces come from the game's own RNG, so a game is fully determined by
+    its seed, the actions passed to apply() and the frame (number of
+    update() calls) each one happened on. A recorder with a
+    record(frame, action) method can be attached to log them.
+    
+    update() is one tick of 1/TICK_RATE seconds, whatever the display rate;
+    use a TickScheduler to know how many to run. Gravity accumulates
+    fractions of a cell per tick, and a landed piece only locks after
+    LOCK_DELAY ticks without moving.
+    
+    snapshot() and restore() save and bring back the whole game state. With
+    a history enabled (practice mode), a snapshot is recorded as each piece
+    appears and undo() / redo() step between them. Restoring rewinds the
+    frame, so it detaches the recorder: the inputs recorded so far no longer
+    lead to the restored state.
+    """
+    
+    # Input actions understood by apply(), named like the control bindings
+    ACTIONS = ("move_left", "move_right", "rotate_ccw", "rotate_cw",
+               "soft_drop", "hard_drop", "hold", "pause")
+    
+    def __init__(self, height: int, width: int, screen_width: int = 0, screen_height: int = 0,
+                 line_clear_frames: int = LINE_CLEAR_FRAMES, seed: Optional[int] = None):
+        self.seed = 0
+        self.rng = random.Random()
+        self.reseed(seed)
+        self.frame = 0
+        self.recorder = None
+        self.history: Optional[SnapshotHistory] = None
+        self.level = INITIAL_LEVEL
+        self.score = 0
+        self.state = "start"
+        self.height = height
+        self.width = width
+        self.field = BitboardField(height, width)
+        self.stats = GameStats()
+        self.next_figure: Optional[Figure] = None
+        self.held_figure: Optional[Figure] = None
+        self.can_hold = True
+        self.line_clear_frames = line_clear_frames
+        
+        # Calculate zoom factor and position
+        self.zoom = min(screen_width // (width + 12), screen_height // (height + 2))
+        self.x = (screen_width - self.zoom * width) // 2
+        self.y = screen_height // 20
+        
+        # Initialize game field
+        self.reset_field()
+        
+        # Preview and hold box positions
+        self.preview_x = self.x + self.zoom * (width + 1)
+        self.preview_y = self.y + self.zoom * 2
+        self.hold_x = self.x - self.zoom * 5
+        self.hold_y = self.y + self.zoom * 2
+        
+        # Current active piece
+        self.figure: Optional[Figure] = None
+        
+        # Ghost piece (shows where piece will land)
+        self.ghost_y = 0
+        
+        # Gravity and lock delay of the active piece
+        self.gravity_progress = 0.0
+        self.lock_timer = 0
+        self.lock_resets = 0
+        
+        # Pause state
+        self.paused = False
+        
+        # Animation effects
+        self.cleared_lines: List[int] = []
+        self.clear_animation = 0
+        self.level_up_animation = 0
+        
+        # Game over animation
+        self.game_over_animation = 0
+        
+    def reseed(self, seed: Optional[int] = None) -> None:
+        """Restart the piece sequence from a seed (a fresh one if None)"""
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng.seed(seed)
+
+    def snapshot(self) -> TetrisSnapshot:
+        """Capture the game state, sharing unchanged rows with earlier snapshots"""
+        return TetrisSnapshot(
+            rows=tuple(self.field.rows),
+            colors=self.field.frozen_colors(),
+            field_hash=self.field.hash,
+            figure=self.figure.state() if self.figure else None,
+            next_figure=self.next_figure.state() if self.next_figure else None,
+            held_figure=self.held_figure.state() if self.held_figure else None,
+            can_hold=self.can_hold,
+            score=self.score,
+            level=self.level,
+            lines_cleared=self.stats.lines_cleared,
+            pieces_placed=self.stats.pieces_placed,
+            piece_stats=tuple(self.stats.piece_stats.values()),
+            cleared_lines=tuple(self.cleared_lines),
+            clear_animation=self.clear_animation,
+            state=self.state,
+            frame=self.frame,
+            rng_state=self.rng.getstate(),
+        )
+        
+    def restore(self, snapshot: TetrisSnapshot) -> None:
+        """Go back to a state captured by snapshot()"""
+        self.field.restore(snapshot.rows, snapshot.colors, snapshot.field_hash)
+        self.figure = Figure.from_state(snapshot.figure) if snapshot.figure else None
+        self.next_figure = Figure.from_state(snapshot.next_figure) if snapshot.next_figure else None
+        self.held_figure = Figure.from_state(snapshot.held_figure) if snapshot.held_figure else None
+        self.can_hold = snapshot.can_hold
+        self.score = snapshot.score
+        self.level = snapshot.level
+        self.stats.lines_cleared = snapshot.lines_cleared
+        self.stats.pieces_placed = snapshot.pieces_placed
+        self.stats.piece_stats = dict(zip(Figure.PIECE_NAMES, snapshot.piece_stats))
+        self.cleared_lines = list(snapshot.cleared_lines)
+        self.clear_animation = snapshot.clear_animation
+        self.state = snapshot.state
+        self.frame = snapshot.frame
+        self.rng.setstate(snapshot.rng_state)
+        self.recorder = None
+        if self.state == "start":
+            self.stats.game_duration = 0
+            self.game_over_animation = 0
+        self.reset_gravity()
+        self.update_ghost()
+        
+    def enable_history(self, size: int = HISTORY_SIZE) -> None:
+        """Start recording a snapshot per piece for undo and redo"""
+        self.history = SnapshotHistory(size)
+        if self.figure and self.state == "start":
+            self.history.push(self.snapshot())
+            
+    def disable_history(self) -> None:
+        """Stop recording snapshots"""
+        self.history = None
+        
+    def undo(self) -> bool:
+        """Take back the last piece dropped, if the history allows it"""
+        if self.history is None:
+            return False
+        if self.state == "gameover":
+            # The piece that topped out was never recorded, return to it
+            snapshot = self.history.current()
+        else:
+            snapshot = self.history.undo()
+        if snapshot is None:
+            return False
+        self.restore(snapshot)
+        return True
+        
+    def redo(self) -> bool:
+        """Put back a piece taken back by undo()"""
+        snapshot = self.history.redo() if self.history else None
+        if snapshot is None:
+            return False
+        self.restore(snapshot)
+        return True
+
+    def stack_height(self) -> int:
+        """Height of the tallest column"""
+        return self.height - min(self.field.tops)
+
+    def accepts_input(self) -> bool:
+        """Check if the active piece can be moved (not during a line clear)"""
+        return self.figure is not None and self.state == "start" and not self.clear_animation
+
+    def reset_field(self) -> None:
+        """Initialize or reset the game field"""
+        self.field.reset()
+
+    def new_figure(self) -> None:
+        """Create a new active figure"""
+        if self.next_figure:
+            self.figure = self.next_figure
+            self.next_figure = Figure(3, 0, self.rng)
+        else:
+            self.figure = Figure(3, 0, self.rng)
+            self.next_figure = Figure(3, 0, self.rng)
+        self.reset_gravity()
+        
+        # Calculate ghost piece position
+        self.update_ghost()
+        
+    def reset_gravity(self) -> None:
+        """Start gravity and lock delay over for a fresh piece"""
+        self.gravity_progress = 0.0
+        self.lock_timer = 0
+        self.lock_resets = 0
+        
+    def reset_lock_delay(self) -> None:
+        """Restart the lock delay after a move, a limited number of times"""
+        if self.lock_timer and self.lock_resets < LOCK_RESETS:
+            self.lock_timer = 0
+            self.lock_resets += 1
+        
+    def update_ghost(self) -> None:
+        """Update the ghost piece position"""
+        if not self.figure:
+            return
+            
+        self.ghost_y = self.figure.y + self.drop_distance()
+    
+    def drop_distance(self) -> int:
+        """Rows the active piece can fall before it lands"""
+        if not self.figure:
+            return 0
+            
+        # Straight from the skyline in the common case
+        distance = self.field.drop_distance(self.figure.bottom_profile(),
+                                            self.figure.x, self.figure.y)
+        if distance is None:
+            # Under an overhang - move down until collision
+            distance = 0
+            while not self.check_collision(0, distance + 1):
+                distance += 1
+        return distance
+    
+    def hold(self) -> None:
+        """Hold the current piece or swap with held piece"""
+        if not self.can_hold or not self.accepts_input():
+            return
+            
+        if self.held_figure:
+            # Swap current and held
+            self.figure, self.held_figure = self.held_figure, self.figure
+            # Reset position
+            self.figure.x, self.figure.y = 3, 0
+            self.reset_gravity()
+        else:
+            # Store current and get new
+            self.held_figure = self.figure
+            self.new_figure()
+            
+        # Prevent multiple holds in a row
+        self.can_hold = False
+        
+        # Update ghost
+        self.update_ghost()
+    
+    def reachable_placements(self) -> Dict[Tuple[int, int, int], List[str]]:
+        """Shortest ACTIONS to every (x, y, rotation) the active piece can lock at"""
+        if not self.accepts_input():
+            return {}
+        return reachable_placements(self.field.rows, self.width, self.figure.type,
+                                    self.figure.x, self.figure.y, self.figure.rotation)
+    
+    def check_collision(self, dx: int = 0, dy: int = 0, test_rotation: int = None) -> bool:
+        """Check if the figure collides with walls or other pieces"""
+        if not self.figure:
+            return False
+            
+        # Get the rotation to test
+        rotation = self.figure.rotation if test_rotation is None else test_rotation
+        masks = Figure.ROW_MASKS[self.figure.type][rotation]
+        
+        return self.field.collides(masks, self.figure.x + dx, self.figure.y + dy)
+
+    def break_lines(self) -> None:
+        """Check for and clear completed lines"""
+        # Find completed lines
+        self.cleared_lines = self.field.full_rows()
+                
+        if not self.cleared_lines:
+            return
+            
+        # Start clear animation
+        self.clear_animation = self.line_clear_frames
+        
+        # Update stats
+        lines_count = len(self.cleared_lines)
+        self.stats.add_lines(lines_count)
+        
+        # Calculate score based on level and lines cleared
+        line_score = SCORE_PER_LINE * self.level
+        # Bonus for multiple lines
+        if lines_count > 1:
+            line_score *= lines_count * SCORE_BONUS_MULTIPLIER
+            
+        self.score += line_score
+        
+        # Check for level up (every 10 lines)
+        old_level = self.level
+        self.level = max(INITIAL_LEVEL, (self.stats.lines_cleared // 10) + INITIAL_LEVEL)
+        
+        if self.level > old_level:
+            self.level_up_animation = 20
+            
+        # Without an animation the rows go away immediately
+        if not self.line_clear_frames:
+            self.clear_completed_lines()
+
+    def clear_completed_lines(self) -> None:
+        """Remove completed lines and shift blocks down"""
+        if not self.cleared_lines:
+            return
+            
+        # Drop all cleared rows at once and compact the rest
+        self.field.clear_rows(self.cleared_lines)
+                
+        # Reset cleared lines
+        self.cleared_lines = []
+        
+        # The stack moved under the active piece
+        self.update_ghost()
+
+    def go_space(self) -> None:
+        """Hard drop - move piece to bottom instantly"""
+        if not self.accepts_input():
+            return
+            
+        # Count how many cells we drop for scoring
+        drop_distance = self.drop_distance()
+        self.figure.y += drop_distance
+            
+        # Add score for hard drop
+        self.score += drop_distance * SCORE_FOR_HARD_DROP
+        
+        # Lock the piece
+        self.freeze()
+
+    def go_down(self, manual: bool = False) -> None:
+        """Move piece down one cell"""
+        if not self.accepts_input():
+            return
+            
+        self.figure.y += 1
+        
+        if self.check_collision():
+            self.figure.y -= 1
+            self.freeze()
+        elif manual:  # Add points for soft drop
+            self.score += SCORE_FOR_SOFT_DROP
+
+    def freeze(self) -> None:
+        """Lock the current piece into the field"""
+        if not self.figure:
+            return
+            
+        # Add the piece to the field (rows above the top are skipped)
+        self.field.place(self.figure.row_masks(), self.figure.x, self.figure.y,
+                         self.figure.color)
+        
+        # Update statistics
+        self.stats.add_piece(self.figure.type)
+        
+        # Check for completed lines
+        self.break_lines()
+        
+        # Allow holding again
+        self.can_hold = True
+        
+        # Create new piece
+        self.new_figure()
+        
+        # Check for game over
+        if self.check_collision():
+            self.state = "gameover"
+            self.stats.end_game()
+            self.game_over_animation = 60  # Frames for animation
+        elif self.history is not None:
+            self.history.push(self.snapshot())
+
+    def go_side(self, dx: int) -> None:
+        """Move piece horizontally"""
+        if not self.accepts_input():
+            return
+            
+        old_x = self.figure.x
+        self.figure.x += dx
+        
+        if self.check_collision():
+            self.figure.x = old_x
+        else:
+            # Update ghost piece
+            self.update_ghost()
+            self.reset_lock_delay()
+
+    def rotate(self, clockwise: bool = False) -> None:
+        """Rotate the current piece with wall kicks"""
+        if not self.accepts_input():
+            return
+            
+        old_rotation = self.figure.rotation
+        self.figure.rotate(clockwise)
+        
+        # Try basic rotation, then wall kicks - move left/right to make it work
+        for kick_x in KICKS:
+            self.figure.x += kick_x
+            if not self.check_collision():
+                # Success - update ghost
+                self.update_ghost()
+                self.reset_lock_delay()
+                return
+            self.figure.x -= kick_x
+            
+        # If all fails, revert rotation
+        self.figure.rotation = old_rotation
+
+    def apply(self, action: str) -> None:
+        """Perform one of the named input ACTIONS"""
+        if action not in self.ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+        if self.recorder is not None:
+            self.recorder.record(self.frame, action)
+            
+        if action == "move_left":
+            self.go_side(-1)
+        elif action == "move_right":
+            self.go_side(1)
+        elif action == "rotate_ccw":
+            self.rotate()
+        elif action == "rotate_cw":
+            self.rotate(True)
+        elif action == "soft_drop":
+            self.go_down(True)
+        elif action == "hard_drop":
+            self.go_space()
+        elif action == "hold":
+            self.hold()
+        elif action == "pause":
+            self.toggle_pause()
+
+    def toggle_pause(self) -> None:
+        """Toggle game pause state"""
+        if self.state == "start":
+            self.paused = not self.paused
+
+    def restart(self, seed: Optional[int] = None) -> None:
+        """Reset the game to initial state with a new seed"""
+        self.reseed(seed)
+        self.frame = 0
+        self.level = INITIAL_LEVEL
+        self.score = 0
+        self.state = "start"
+        self.paused = False
+        self.reset_field()
+        self.stats = GameStats()
+        self.figure = None
+        self.next_figure = None
+        self.held_figure = None
+        self.can_hold = True
+        self.reset_gravity()
+        self.cleared_lines = []
+        self.clear_animation = 0
+        self.level_up_animation = 0
+        self.game_over_animation = 0
+        self.new_figure()
+        if self.history is not None:
+            self.history.clear()
+            self.history.push(self.snapshot())
+
+    def update(self) -> None:
+        """Advance the game by one tick"""
+        self.frame += 1
+        if self.state != "start" or self.paused:
+            return
+            
+        # Handle animations
+        if self.clear_animation > 0:
+            self.clear_animation -= 1
+            if self.clear_animation == 0:
+                self.clear_completed_lines()
+            return
+            
+        if not self.accepts_input():
+            return
+            
+        # Gravity - whole cells fall once enough fractions add up, several
+        # per tick above 1G
+        self.gravity_progress += gravity_for_level(self.level)
+        while self.gravity_progress >= 1 and not self.check_collision(0, 1):
+            self.figure.y += 1
+            self.gravity_progress -= 1
+            self.lock_timer = 0
+            
+        # Lock delay - a landed piece locks after resting long enough
+        if self.check_collision(0, 1):
+            self.gravity_progress = 0.0
+            self.lock_timer += 1
+            if self.lock_timer >= LOCK_DELAY:
+                self.freeze()
@@ -0,0 +1,160 @@
+"""Compact Tetris replays.
+
+A game is fully determined by its seed and the actions applied on each
+frame, so a replay only stores those. The binary layout is:
+
+    b"TRP" | format version (1 byte)
+    varint seed, width, height, line_clear_frames
+    varint event count, then one varint per event:
+        (frames since previous event << 3) | index in Tetris.ACTIONS
+    varint final frame
+
+Replaying re-simulates the whole game headless, which is how ranking
+scores are verified and how recorded sessions become benchmarks.
+
+    python jogos/tetris_replay.py ranking.json
+"""
+import argparse
+import base64
+import json
+import time
+from typing import List, Tuple
+
+from tetris_engine import Tetris
+from varint import read_varint, write_varint
+
+MAGIC = b"TRP"
+FORMAT_VERSION = 2  # 2: gravity and lock delay run on fixed ticks
+ACTION_BITS = 3  # Enough for the 8 entries of Tetris.ACTIONS
+
+
+class Replay:
+    """Seed, board settings and timed actions of one game"""
+
+    def __init__(self, seed: int, width: int, height: int, line_clear_frames: int,
+                 events: List[Tuple[int, int]], end_frame: int):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.line_clear_frames = line_clear_frames
+        self.events = events  # (frame, action index)
+        self.end_frame = end_frame
+
+    def to_bytes(self) -> bytes:
+        """Encode the replay in the compact binary format"""
+        out = bytearray(MAGIC)
+        out.append(FORMAT_VERSION)
+        for value in (self.seed, self.width, self.height, self.line_clear_frames,
+                      len(self.events)):
+            write_varint(out, value)
+        last = 0
+        for frame, action in self.events:
+            write_varint(out, (frame - last) << ACTION_BITS | action)
+            last = frame
+        write_varint(out, self.end_frame)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        """Decode a replay produced by to_bytes()"""
+        if data[:3] != MAGIC:
+            raise ValueError("Not a Tetris replay")
+        if data[3] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported replay version: {data[3]}")
+        pos = 4
+        header = []
+        for _ in range(5):
+            value, pos = read_varint(data, pos)
+            header.append(value)
+        seed, width, height, line_clear_frames, count = header
+
+        events = []
+        frame = 0
+        for _ in range(count):
+            value, pos = read_varint(data, pos)
+            frame += value >> ACTION_BITS
+            action = value & ((1 << ACTION_BITS) - 1)
+            if action >= len(Tetris.ACTIONS):
+                raise ValueError(f"Unknown action index: {action}")
+            events.append((frame, action))
+        end_frame, pos = read_varint(data, pos)
+        return cls(seed, width, height, line_clear_frames, events, end_frame)
+
+    def to_text(self) -> str:
+        """Encode as base64 text, for storing inside JSON files"""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text: str) -> "Replay":
+        """Decode a replay stored with to_text()"""
+        return cls.from_bytes(base64.b64decode(text))
+
+    def run(self) -> Tetris:
+        """Re-simulate the game headless as fast as possible"""
+        game = Tetris(self.height, self.width, line_clear_frames=self.line_clear_frames,
+                      seed=self.seed)
+        game.new_figure()
+        for frame, action in self.events:
+            while game.frame < frame:
+                game.update()
+            game.apply(Tetris.ACTIONS[action])
+        while game.frame < self.end_frame:
+            game.update()
+        return game
+
+
+class ReplayRecorder:
+    """Records every action applied to a game, with its frame"""
+
+    def __init__(self, game: Tetris):
+        self.game = game
+        self.seed = game.seed
+        self.events: List[Tuple[int, int]] = []
+        game.recorder = self
+
+    def record(self, frame: int, action: str) -> None:
+        """Called by Tetris.apply()"""
+        self.events.append((frame, Tetris.ACTIONS.index(action)))
+
+    def get_replay(self) -> Replay:
+        """Replay of the game so far"""
+        game = self.game
+        return Replay(self.seed, game.width, game.height, game.line_clear_frames,
+                      list(self.events), game.frame)
+
+
+def verify_score(replay: Replay, score: int) -> bool:
+    """Check that replaying the game gives the claimed score"""
+    return replay.run().score == score
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify and benchmark Tetris replays")
+    parser.add_argument("ranking", help="ranking JSON file with stored replays")
+    args = parser.parse_args()
+
+    with open(args.ranking, "r") as f:
+        entries = json.load(f)
+
+    total_frames = 0
+    total_time = 0.0
+    for entry in entries:
+        if "replay" not in entry:
+            print(f"{entry['name']:<12} {entry['score']:>8}  no replay")
+            continue
+        replay = Replay.from_text(entry["replay"])
+        start = time.perf_counter()
+        game = replay.run()
+        elapsed = time.perf_counter() - start
+        total_frames += game.frame
+        total_time += elapsed
+        status = "OK" if game.score == entry["score"] else f"MISMATCH ({game.score})"
+        print(f"{entry['name']:<12} {entry['score']:>8}  {status}  "
+              f"{game.frame} frames in {elapsed:.3f}s")
+
+    if total_time:
+        print(f"Replay speed: {total_frames / total_time:.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
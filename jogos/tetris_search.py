@@ -0,0 +1,298 @@
+"""Time-bounded lookahead search for the Tetris bot.
+
+SearchBot looks past the current piece into every piece it already knows
+(the preview and the held piece), trying both placing and holding at each
+step. Boards are identified by the Zobrist hash kept by BitboardField, so
+positions reached through different move orders are searched once: a
+bounded LRU transposition table remembers the value of searched nodes and
+the static evaluation of every board seen.
+
+Search is iterative deepening under a per-piece time budget. One ply
+always completes and ranks every move; deeper plies only follow the
+SEARCH_BEAM best moves at each step, ordered by the previous ply at the
+root and by the static evaluation below it, so the preview piece fits in
+the budget. When the budget runs out the best move among the candidates
+already searched at that depth is played, so the bot never stalls the game
+loop and a partial ply is not wasted.
+
+    python jogos/tetris_search.py --games 5 --budget 0.05 --depth 3
+"""
+import argparse
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tetris_bot import TOP_OUT_SCORE, Placement, TetrisBot, board_features, enumerate_placements, \
+    run_headless
+from tetris_engine import Figure, Tetris, piece_hash, zobrist_hash
+
+SEARCH_TIME_BUDGET = 0.008  # Seconds per piece, half of a 60 FPS frame
+SEARCH_MAX_DEPTH = 3        # Current piece, preview piece and held piece
+SEARCH_BEAM = 6             # Moves searched deeper at each ply
+TABLE_SIZE = 200000
+MIN_TABLE_SIZE = 1000       # Room for the positions of one decision
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is spent"""
+
+
+class TranspositionTable:
+    """Bounded mapping that forgets the least recently used entries"""
+
+    def __init__(self, capacity: int = TABLE_SIZE):
+        if capacity < MIN_TABLE_SIZE:
+            raise ValueError(f"Table size must be at least {MIN_TABLE_SIZE}")
+        self.capacity = capacity
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Look up a key, marking it as recently used"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the oldest entry when full"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget everything"""
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class SearchBot(TetrisBot):
+    """TetrisBot that searches every known piece within a time budget"""
+
+    def __init__(self, weights: Optional[Sequence[float]] = None, use_hold: bool = True,
+                 time_budget: float = SEARCH_TIME_BUDGET, max_depth: int = SEARCH_MAX_DEPTH,
+                 table_size: int = TABLE_SIZE, beam_width: int = SEARCH_BEAM):
+        super().__init__(weights, use_hold)
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.beam_width = beam_width
+        self.table = TranspositionTable(table_size)
+
+        # Search statistics
+        self.nodes = 0
+        self.depth_total = 0
+        self.timeouts = 0
+
+        # Set up for each decision
+        self._deadline = 0.0
+        self._zobrist: List[List[int]] = []
+        self._piece_hashes: Dict[Tuple[int, int, int, int], int] = {}
+        self._width = 0
+        self._full_row = 0
+
+    @property
+    def average_depth(self) -> float:
+        """Average number of plies completed per decision"""
+        if self.decisions == 0:
+            return 0.0
+        return self.depth_total / self.decisions
+
+    def _static_values(self, boards: List[Tuple[int, List[int]]]) -> Dict[int, float]:
+        """Evaluate boards, batching the ones missing from the table, by hash
+
+        The values come back directly since storing a large batch can evict
+        the first entries of the same batch.
+        """
+        values = {}
+        missing = {}
+        entries = self.table.entries
+        for board_hash, rows in boards:
+            value = entries.get(("static", board_hash))
+            if value is None:
+                missing[board_hash] = rows
+            else:
+                values[board_hash] = value
+        if missing:
+            features = board_features(np.array(list(missing.values()), dtype=np.int64),
+                                      np.zeros(len(missing)), self._width)
+            for board_hash, value in zip(missing, (features @ self.weights).tolist()):
+                self.table.put(("static", board_hash), value)
+                values[board_hash] = value
+        return values
+
+    def _static_value(self, board_hash: int, rows: List[int]) -> float:
+        """Evaluation of a board, ignoring how many lines it cleared"""
+        value = self.table.get(("static", board_hash))
+        if value is None:
+            value = self._static_values([(board_hash, rows)])[board_hash]
+        return value
+
+    def _candidates(self, moves: List[Tuple[Any, ...]], depth: int) -> List[Tuple[Any, ...]]:
+        """Moves worth searching: all on the last ply, else the beam by static value"""
+        values = self._static_values([(move[2], move[1]) for move in moves])
+        if depth == 1:
+            return moves
+        line_weight = self.weights[0]
+        ranked = sorted(moves, key=lambda move: line_weight * move[3] + values[move[2]],
+                        reverse=True)
+        return ranked[:self.beam_width]
+
+    def _piece_hash(self, piece: int, rotation: int, x: int, y: int) -> int:
+        """Hash of a locked piece, cached since only a few hundred positions exist"""
+        key = (piece, rotation, x, y)
+        value = self._piece_hashes.get(key)
+        if value is None:
+            value = piece_hash(self._zobrist, Figure.ROW_MASKS[piece][rotation], x, y)
+            self._piece_hashes[key] = value
+        return value
+
+    def _moves(self, rows: List[int], board_hash: int, current: int, queue: Tuple[int, ...],
+               held: Optional[int], can_hold: bool, spawn_y: int = 0,
+               tops: Optional[Sequence[int]] = None) -> List[Tuple[Any, ...]]:
+        """List (placement, rows, hash, lines, current, queue, held) after each move"""
+        options = [(False, current, queue, held)]
+        if can_hold and self.use_hold:
+            if held is not None:
+                options.append((True, held, queue, current))
+            elif queue:
+                options.append((True, queue[0], queue[1:], current))
+
+        moves = []
+        for hold, piece, rest, new_held in options:
+            following = rest[0] if rest else None
+            for rotation, x, y, new_rows, cleared in enumerate_placements(
+                    rows, self._full_row, self._width, piece, spawn_y, tops):
+                if cleared:
+                    new_hash = zobrist_hash(self._zobrist, new_rows)
+                else:
+                    new_hash = board_hash ^ self._piece_hash(piece, rotation, x, y)
+                moves.append((Placement(hold, rotation, x, y), new_rows, new_hash, cleared,
+                              following, rest[1:], new_held))
+        return moves
+
+    def _search(self, rows: List[int], board_hash: int, depth: int, current: Optional[int],
+                queue: Tuple[int, ...], held: Optional[int], can_hold: bool) -> float:
+        """Best value reachable from a position by placing up to depth pieces"""
+        if depth == 0 or current is None:
+            return self._static_value(board_hash, rows)
+
+        key = (board_hash, depth, current, queue, held, can_hold)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        if time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+        self.nodes += 1
+
+        moves = self._candidates(self._moves(rows, board_hash, current, queue, held, can_hold), depth)
+
+        line_weight = self.weights[0]
+        best = TOP_OUT_SCORE
+        for _, new_rows, new_hash, cleared, following, rest, new_held in moves:
+            value = line_weight * cleared + self._search(
+                new_rows, new_hash, depth - 1, following, rest, new_held, True)
+            if value > best:
+                best = value
+        self.table.put(key, best)
+        return best
+
+    def _value(self, move: Tuple[Any, ...], depth: int) -> float:
+        """Value of a root move looking depth pieces ahead"""
+        _, new_rows, new_hash, cleared, following, rest, new_held = move
+        return self.weights[0] * cleared + self._search(
+            new_rows, new_hash, depth - 1, following, rest, new_held, True)
+
+    def choose(self, game: Tetris) -> Optional[Placement]:
+        """Pick the best placement found by iterative deepening within the budget"""
+        if not game.figure:
+            return None
+        start = time.perf_counter()
+        if self._zobrist is not game.field.zobrist:
+            self._zobrist = game.field.zobrist
+            self._piece_hashes.clear()
+        self._width = game.width
+        self._full_row = game.field.full_row
+
+        field = game.field
+        queue = (game.next_figure.type,) if game.next_figure else ()
+        held = game.held_figure.type if game.held_figure else None
+        moves = self._moves(field.rows, field.hash, game.figure.type, queue, held,
+                            game.can_hold, game.figure.y, field.tops)
+        if not moves:
+            return None
+
+        # One ply always completes so there is always a move
+        self._deadline = float("inf")
+        self._candidates(moves, 1)
+        values = [self._value(move, 1) for move in moves]
+        ranked = sorted(zip(values, range(len(moves))), reverse=True)
+        best = moves[ranked[0][1]][0]
+
+        # Deeper plies follow the beam, best move of the previous ply first
+        self._deadline = start + self.time_budget
+        beam = [moves[i] for _, i in ranked[:self.beam_width]]
+        depth_reached = 1
+        for depth in range(2, self.max_depth + 1):
+            searched = []
+            try:
+                for move in beam:
+                    searched.append((self._value(move, depth), move))
+            except SearchTimeout:
+                self.timeouts += 1
+            if searched:
+                # The previous best move is searched first, so a partial ply still
+                # compares it against every alternative that got searched
+                best = max(searched, key=lambda item: item[0])[1][0]
+            if len(searched) < len(beam):
+                break
+            depth_reached = depth
+            beam = [move for _, move in sorted(searched, key=lambda item: item[0], reverse=True)]
+
+        self.decisions += 1
+        self.depth_total += depth_reached
+        self.decision_time += time.perf_counter() - start
+        return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless Tetris search bot soak test")
+    parser.add_argument("--games", type=int, default=5, help="games to play")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--max-pieces", type=int, default=1000, help="piece limit per game")
+    parser.add_argument("--budget", type=float, default=SEARCH_TIME_BUDGET,
+                        help="thinking time per piece in seconds")
+    parser.add_argument("--depth", type=int, default=SEARCH_MAX_DEPTH, help="maximum plies")
+    parser.add_argument("--table-size", type=int, default=TABLE_SIZE,
+                        help="transposition table entries")
+    parser.add_argument("--beam", type=int, default=SEARCH_BEAM, help="moves searched past ply 1")
+    parser.add_argument("--no-hold", action="store_true", help="never use the hold slot")
+    args = parser.parse_args()
+    if args.table_size < MIN_TABLE_SIZE:
+        parser.error(f"--table-size must be at least {MIN_TABLE_SIZE}")
+
+    bot = SearchBot(use_hold=not args.no_hold, time_budget=args.budget, max_depth=args.depth,
+                    table_size=args.table_size, beam_width=args.beam)
+    result = run_headless(args.games, args.seed, args.max_pieces, bot)
+    table = bot.table
+    print(f"Games:         {args.games}")
+    print(f"Lines:         {result['lines']}")
+    print(f"Pieces:        {sum(result['pieces'])}")
+    print(f"Time:          {result['seconds']:.2f}s")
+    print(f"Decisions/s:   {result['decisions_per_second']:.0f}")
+    print(f"Avg depth:     {bot.average_depth:.2f}")
+    print(f"Timeouts:      {bot.timeouts}")
+    print(f"Nodes:         {bot.nodes}")
+    print(f"Table hits:    {table.hits / max(1, table.hits + table.misses):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Parallel self-play tuner for the Tetris bot weights.
+
+Generates candidate weight vectors around the defaults (or reads them from
+a JSON file), has every candidate play the same seeded games in a process
+pool and prints a ranking with the lines-cleared distribution of each.
+Work is split into (candidate, block of seeds) tasks so every core stays
+busy until the end.
+
+    python jogos/tetris_tuner.py --candidates 32 --games 50 --workers 8
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+from tetris_bot import DEFAULT_WEIGHTS, FEATURES, TetrisBot, play_game
+
+
+def play_seeds(weights: Sequence[float], seeds: Sequence[int], max_pieces: int,
+               lookahead: bool) -> List[int]:
+    """Worker task: play one game per seed and return the lines cleared"""
+    bot = TetrisBot(weights, lookahead=lookahead)
+    return [play_game(bot, seed, max_pieces).stats.lines_cleared for seed in seeds]
+
+
+def random_candidates(count: int, sigma: float, seed: int) -> List[List[float]]:
+    """The default weights followed by random multiplicative perturbations"""
+    rng = random.Random(seed)
+    base = [DEFAULT_WEIGHTS[name] for name in FEATURES]
+    candidates = [base]
+    for _ in range(count - 1):
+        candidates.append([w * rng.lognormvariate(0, sigma) for w in base])
+    return candidates
+
+
+def percentile(values: Sequence[int], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(weights: Sequence[float], lines: List[int]) -> Dict:
+    """Distribution of the lines cleared by one candidate"""
+    return {
+        "weights": dict(zip(FEATURES, weights)),
+        "games": len(lines),
+        "mean": statistics.mean(lines),
+        "stdev": statistics.pstdev(lines),
+        "min": min(lines),
+        "p10": percentile(lines, 0.1),
+        "median": percentile(lines, 0.5),
+        "p90": percentile(lines, 0.9),
+        "max": max(lines),
+        "lines": lines,
+    }
+
+
+def tune(candidates: List[List[float]], seeds: List[int], max_pieces: int, workers: int,
+         chunk: int, lookahead: bool) -> List[Dict]:
+    """Evaluate every candidate on every seed in parallel, best first"""
+    tasks: List[Tuple[int, int]] = []  # (candidate, first seed index)
+    for index in range(len(candidates)):
+        for start in range(0, len(seeds), chunk):
+            tasks.append((index, start))
+
+    results: List[List[int]] = [[0] * len(seeds) for _ in candidates]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(play_seeds, candidates[index], seeds[start:start + chunk],
+                        max_pieces, lookahead): (index, start)
+            for index, start in tasks
+        }
+        for future, (index, start) in futures.items():
+            lines = future.result()
+            results[index][start:start + len(lines)] = lines
+
+    report = [summarize(weights, lines) for weights, lines in zip(candidates, results)]
+    report.sort(key=lambda entry: (entry["mean"], entry["min"]), reverse=True)
+    return report
+
+
+def print_report(report: List[Dict], elapsed: float, total_games: int) -> None:
+    """Print the ranked candidates"""
+    header = f"{'#':>3} {'mean':>8} {'p10':>6} {'median':>6} {'p90':>6} {'min':>6} {'max':>6}  weights"
+    print(header)
+    print("-" * len(header))
+    for rank, entry in enumerate(report, 1):
+        weights = " ".join(f"{name}={value:+.3f}" for name, value in entry["weights"].items())
+        print(f"{rank:>3} {entry['mean']:>8.1f} {entry['p10']:>6} {entry['median']:>6} "
+              f"{entry['p90']:>6} {entry['min']:>6} {entry['max']:>6}  {weights}")
+    print(f"\n{total_games} games in {elapsed:.1f}s ({total_games / elapsed:.1f} games/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tune Tetris bot weights by self-play")
+    parser.add_argument("--candidates", type=int, default=16, help="random candidates to try")
+    parser.add_argument("--weights-file", help="JSON list of weight vectors (or name->value dicts)")
+    parser.add_argument("--sigma", type=float, default=0.3, help="spread of random candidates")
+    parser.add_argument("--games", type=int, default=20, help="games per candidate")
+    parser.add_argument("--seed", type=int, default=0, help="first game seed")
+    parser.add_argument("--max-pieces", type=int, default=500, help="piece limit per game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk", type=int, default=5, help="games per worker task")
+    parser.add_argument("--lookahead", action="store_true", help="bots also search the next piece")
+    parser.add_argument("--output", help="write the full report as JSON")
+    args = parser.parse_args()
+
+    if args.weights_file:
+        with open(args.weights_file, "r") as f:
+            loaded = json.load(f)
+        candidates = [[w[name] for name in FEATURES] if isinstance(w, dict) else list(w)
+                      for w in loaded]
+    else:
+        candidates = random_candidates(args.candidates, args.sigma, args.seed)
+    seeds = list(range(args.seed, args.seed + args.games))
+
+    start = time.perf_counter()
+    report = tune(candidates, seeds, args.max_pieces, args.workers, args.chunk, args.lookahead)
+    elapsed = time.perf_counter() - start
+
+    print_report(report, elapsed, len(candidates) * len(seeds))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Unsigned LEB128 integers, shared by the Tetris and Snake replay formats.
+
+Small values take one byte and every further 7 bits one more byte, which
+keeps replays of mostly short gaps between inputs compact.
+"""
+from typing import Tuple
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 integer"""
+    if value < 0:
+        raise ValueError(f"Negative varint: {value}")
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 integer, returning (value, new position)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated replay")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
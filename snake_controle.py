@@ -1,7 +1,10 @@
-import pygame, sys, random
+import pygame, sys, random, time
+from collections import deque
 
 # Config
-difficulty = 10
+difficulty = 10  # Passos da cobra por segundo
+display_fps = 60  # Quadros (e leituras de input) por segundo
+turn_queue_size = 3
 frame_size_x = 720
 frame_size_y = 480
 
@@ -32,13 +35,59 @@ clock = pygame.time.Clock()
 
 # Variáveis do jogo
 block_size = 30
+grid_cols = frame_size_x // block_size
+grid_rows = frame_size_y // block_size
+
+# Cada célula é um índice y * grid_cols + x
+def cell_index(pos):
+    return (pos[1] // block_size) * grid_cols + pos[0] // block_size
+
+def cell_pos(index):
+    y, x = divmod(index, grid_cols)
+    return [x * block_size, y * block_size]
+
+# Corpo como deque de índices (cabeça à esquerda) + grade de ocupação
 snake_pos = [block_size * 3, block_size * 3]
-snake_body = [list(snake_pos)]
+snake_body = deque([cell_index(snake_pos)])
+occupied = bytearray(grid_cols * grid_rows)
+occupied[snake_body[0]] = 1
+
+# Células livres numa lista densa + posição de cada uma na lista: remover
+# troca com a última, então adicionar, remover e sortear custam O(1)
+free_cells = list(range(grid_cols * grid_rows))
+free_position = list(range(grid_cols * grid_rows))
+
+def free_add(cell):
+    free_position[cell] = len(free_cells)
+    free_cells.append(cell)
+
+def free_remove(cell):
+    i = free_position[cell]
+    last = free_cells.pop()
+    if last != cell:
+        free_cells[i] = last
+        free_position[last] = i
+
+def random_free_pos():
+    return cell_pos(free_cells[random.randrange(len(free_cells))])
+
+free_remove(snake_body[0])
 direction = 'RIGHT'
-change_to = direction
 
-food_pos = [random.randrange(0, frame_size_x // block_size) * block_size,
-            random.randrange(0, frame_size_y // block_size) * block_size]
+# Curvas pedidas e ainda não aplicadas, uma por passo
+turns = deque()
+opposite = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+
+def queue_turn(new_direction):
+    # Compara com a última curva da fila (ou a direção atual): ignora
+    # repetições e reversões, e descarta curvas além do tamanho da fila
+    last = turns[-1] if turns else direction
+    if new_direction == last or new_direction == opposite[last]:
+        return
+    if len(turns) < turn_queue_size:
+        turns.append(new_direction)
+
+food_pos = random_free_pos()
 food_spawn = True
 
 score = 0
@@ -83,78 +132,101 @@ def show_score(pos, color, font, size):
     game_window.blit(score_surf, score_rect)
 
 # Loop principal
+tick_time = 1 / difficulty
+accumulator = 0.0
+last_time = time.perf_counter()
 while True:
     # Input do jogador (teclado e controle)
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             pygame.quit(); sys.exit()
         if event.type == pygame.KEYDOWN:
-            if event.key in [pygame.K_UP, ord('w')]: change_to = 'UP'
-            elif event.key in [pygame.K_DOWN, ord('s')]: change_to = 'DOWN'
-            elif event.key in [pygame.K_LEFT, ord('a')]: change_to = 'LEFT'
-            elif event.key in [pygame.K_RIGHT, ord('d')]: change_to = 'RIGHT'
+            if event.key in [pygame.K_UP, ord('w')]: queue_turn('UP')
+            elif event.key in [pygame.K_DOWN, ord('s')]: queue_turn('DOWN')
+            elif event.key in [pygame.K_LEFT, ord('a')]: queue_turn('LEFT')
+            elif event.key in [pygame.K_RIGHT, ord('d')]: queue_turn('RIGHT')
             elif event.key == pygame.K_ESCAPE: pygame.quit(); sys.exit()
 
         # Entrada do controle (d-pad)
         if event.type == pygame.JOYHATMOTION:
             hat_x, hat_y = event.value
-            if hat_y == 1: change_to = 'UP'
-            elif hat_y == -1: change_to = 'DOWN'
-            elif hat_x == -1: change_to = 'LEFT'
-            elif hat_x == 1: change_to = 'RIGHT'
+            if hat_y == 1: queue_turn('UP')
+            elif hat_y == -1: queue_turn('DOWN')
+            elif hat_x == -1: queue_turn('LEFT')
+            elif hat_x == 1: queue_turn('RIGHT')
 
         # Analógico esquerdo
         if event.type == pygame.JOYAXISMOTION and joystick:
             axis_x = joystick.get_axis(0)
             axis_y = joystick.get_axis(1)
             threshold = 0.5
-            if axis_y < -threshold: change_to = 'UP'
-            elif axis_y > threshold: change_to = 'DOWN'
-            elif axis_x < -threshold: change_to = 'LEFT'
-            elif axis_x > threshold: change_to = 'RIGHT'
-
-    # Previne reversão instantânea
-    if change_to == 'UP' and direction != 'DOWN': direction = 'UP'
-    if change_to == 'DOWN' and direction != 'UP': direction = 'DOWN'
-    if change_to == 'LEFT' and direction != 'RIGHT': direction = 'LEFT'
-    if change_to == 'RIGHT' and direction != 'LEFT': direction = 'RIGHT'
-
-    # Move a cabeça
-    if direction == 'UP': snake_pos[1] -= block_size
-    if direction == 'DOWN': snake_pos[1] += block_size
-    if direction == 'LEFT': snake_pos[0] -= block_size
-    if direction == 'RIGHT': snake_pos[0] += block_size
-
-    # Adiciona nova posição ao corpo
-    snake_body.insert(0, list(snake_pos))
-
-    # Colisão com comida
-    if snake_pos == food_pos:
-        score += 1
-        food_spawn = False
-    else:
-        if snake_body: snake_body.pop()
-
-    # Spawnar comida nova
-    if not food_spawn:
-        food_pos = [random.randrange(0, frame_size_x // block_size) * block_size,
-                    random.randrange(0, frame_size_y // block_size) * block_size]
-        food_spawn = True
-
-    # Verifica colisões
-    if (
-        snake_pos[0] < 0 or snake_pos[0] >= frame_size_x or
-        snake_pos[1] < 0 or snake_pos[1] >= frame_size_y or
-        snake_pos in snake_body[1:]
-    ):
-        game_over()
-
-    # Desenhar tudo
+            if axis_y < -threshold: queue_turn('UP')
+            elif axis_y > threshold: queue_turn('DOWN')
+            elif axis_x < -threshold: queue_turn('LEFT')
+            elif axis_x > threshold: queue_turn('RIGHT')
+
+    # A simulação anda em passos fixos de 1 / difficulty segundos, enquanto
+    # o input e o relógio rodam a display_fps
+    now = time.perf_counter()
+    accumulator = min(accumulator + now - last_time, tick_time * 5)
+    last_time = now
+    stepped = False
+    while accumulator >= tick_time:
+        accumulator -= tick_time
+        stepped = True
+
+        # Aplica no máximo uma curva da fila por passo
+        if turns:
+            direction = turns.popleft()
+
+        # Move a cabeça
+        if direction == 'UP': snake_pos[1] -= block_size
+        if direction == 'DOWN': snake_pos[1] += block_size
+        if direction == 'LEFT': snake_pos[0] -= block_size
+        if direction == 'RIGHT': snake_pos[0] += block_size
+
+        # Verifica colisão com as paredes
+        if (
+            snake_pos[0] < 0 or snake_pos[0] >= grid_cols * block_size or
+            snake_pos[1] < 0 or snake_pos[1] >= grid_rows * block_size
+        ):
+            game_over()
+
+        # Colisão com comida
+        if snake_pos == food_pos:
+            score += 1
+            food_spawn = False
+        else:
+            # A cauda sai antes de a cabeça entrar
+            tail = snake_body.pop()
+            occupied[tail] = 0
+            free_add(tail)
+
+        # Verifica colisão com o corpo e adiciona a nova cabeça
+        head = cell_index(snake_pos)
+        if occupied[head]:
+            game_over()
+        snake_body.appendleft(head)
+        occupied[head] = 1
+        free_remove(head)
+
+        # Spawnar comida nova, sorteada entre as células livres
+        if not food_spawn:
+            if not free_cells:
+                game_over()
+            food_pos = random_free_pos()
+            food_spawn = True
+
+    # Desenhar tudo, só quando a cobra andou
+    if not stepped:
+        clock.tick(display_fps)
+        continue
     game_window.fill(green)
-    for pos in snake_body:
+    for index in snake_body:
+        pos = cell_pos(index)
         pygame.draw.rect(game_window, blue, pygame.Rect(pos[0], pos[1], 20, 20), border_radius=5)
     pygame.draw.rect(game_window, red, pygame.Rect(food_pos[0], food_pos[1], block_size, block_size), border_radius=50)
 
     show_score(1, white, 'consolas', 20)
     pygame.display.update()
-    clock.tick(difficulty)
+    clock.tick(display_fps)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The games import their sibling modules directly and open a window on import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "jogos"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
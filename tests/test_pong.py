@@ -0,0 +1,48 @@
+from pong import (BALL_RADIUS, HEIGHT, PADDLE_HEIGHT, PADDLE_WIDTH, PHYSICS_DT, WIDTH, Ball, Paddle,
+                  handle_collision)
+
+
+def paddles():
+    left = Paddle(10, 200, PADDLE_WIDTH, PADDLE_HEIGHT)
+    right = Paddle(WIDTH - 10 - PADDLE_WIDTH, 200, PADDLE_WIDTH, PADDLE_HEIGHT)
+    return left, right
+
+
+def test_ball_beside_paddle_corner_keeps_moving():
+    # Inside the paddle's grown box but outside its rounded corner
+    left, right = paddles()
+    ball = Ball(692.5, 309.5, BALL_RADIUS)
+    ball.x_vel, ball.y_vel = 114.6, -478.8
+
+    handle_collision(ball, left, right, PHYSICS_DT)
+    position = (ball.x, ball.y)
+    for _ in range(240):
+        handle_collision(ball, left, right, PHYSICS_DT)
+
+    assert (ball.x, ball.y) != position
+    assert ball.x > WIDTH
+
+
+def test_paddle_pushing_ball_into_wall_releases_it():
+    left, right = paddles()
+    left.y = 8
+    ball = Ball(20, 6, BALL_RADIUS)
+    ball.x_vel, ball.y_vel = -Ball.MAX_VEL, 300
+
+    for _ in range(60):
+        left.move(PHYSICS_DT, up=True)
+        handle_collision(ball, left, right, PHYSICS_DT)
+
+    assert ball.x > left.x + left.width + ball.radius
+    assert ball.radius <= ball.y <= HEIGHT - ball.radius
+
+
+def test_fast_ball_does_not_tunnel_through_paddle():
+    left, right = paddles()
+    ball = Ball(300, 250, BALL_RADIUS)
+    ball.x_vel, ball.y_vel = 100000, 0
+
+    handle_collision(ball, left, right, PHYSICS_DT)
+
+    assert ball.x_vel < 0
+    assert ball.x < right.x
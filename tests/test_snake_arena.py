@@ -0,0 +1,54 @@
+from collections import deque
+
+from snake_arena import DIRECTIONS, FREE, SnakeArena
+
+
+def place(arena, snake, cells, direction):
+    arena.bodies[snake] = deque(cells)
+    arena.owner[cells] = snake
+    arena.head[snake] = cells[0]
+    arena.direction[snake] = DIRECTIONS.index(direction)
+    arena.alive[snake] = True
+    arena.active[snake] = True
+
+
+def two_player_arena():
+    arena = SnakeArena(10, 10, bots=0, humans=2, seed=0, food_density=0)
+    arena.food[:] = False
+    arena.food_count = 0
+    arena.food_target = 0
+    return arena
+
+
+def test_heads_swapping_cells_both_die():
+    arena = two_player_arena()
+    place(arena, 0, [arena.cols * 5 + 4], "RIGHT")
+    place(arena, 1, [arena.cols * 5 + 5], "LEFT")
+
+    arena.step()
+
+    assert not arena.alive[0] and not arena.alive[1]
+    assert arena.head_on == 2
+    assert (arena.owner == FREE).all()
+
+
+def test_heads_on_same_cell_both_die():
+    arena = two_player_arena()
+    place(arena, 0, [arena.cols * 5 + 3], "RIGHT")
+    place(arena, 1, [arena.cols * 5 + 5], "LEFT")
+
+    arena.step()
+
+    assert not arena.alive[0] and not arena.alive[1]
+    assert arena.head_on == 2
+
+
+def test_following_a_tail_is_allowed():
+    arena = two_player_arena()
+    place(arena, 0, [arena.cols * 5 + 4], "RIGHT")
+    place(arena, 1, [arena.cols * 5 + 5], "RIGHT")
+
+    arena.step()
+
+    assert arena.alive[0] and arena.alive[1]
+    assert arena.head_on == 0
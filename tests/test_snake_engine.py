@@ -0,0 +1,47 @@
+import random
+
+from snake_bot import SnakeBot
+from snake_engine import FreeCells, SnakeEngine
+
+
+def test_free_cells_tracks_adds_and_removes():
+    free = FreeCells(10)
+    rng = random.Random(0)
+    for cell in (3, 9, 0, 5):
+        free.remove(cell)
+    free.add(9)
+
+    assert sorted(free.cells) == [1, 2, 4, 6, 7, 8, 9]
+    assert all(free.cells[free.position[cell]] == cell for cell in free.cells)
+    assert all(free.choice(rng) in free.cells for _ in range(50))
+
+
+def test_engine_bookkeeping_matches_the_body():
+    engine = SnakeEngine(8, 6, seed=3)
+    bot = SnakeBot()
+    while engine.alive and engine.ticks < 500:
+        bot.steer(engine)
+        engine.step()
+        body = set(engine.body)
+        assert len(body) == len(engine.body) == engine.score + 1
+        assert {cell for cell in range(engine.size) if engine.occupied[cell]} == body
+        assert len(engine.free) == engine.size - len(body)
+        if engine.alive:
+            assert engine.food not in body
+
+
+def test_wall_kills_and_reversal_is_ignored():
+    engine = SnakeEngine(5, 5, seed=0)
+    assert not engine.queue_turn("LEFT")
+    assert engine.queue_turn("UP")
+    alive = [engine.step() for _ in range(4)]
+    assert alive == [True, True, True, False]
+    assert not engine.alive
+
+
+def test_changed_cells_only_cover_the_last_step():
+    engine = SnakeEngine(20, 20, seed=1)
+    for _ in range(10):
+        engine.step()
+        assert len(engine.changed) <= 4
+        assert engine.head in engine.changed
@@ -0,0 +1,50 @@
+import numpy as np
+
+from snake_engine import SnakeEngine
+from snake_vec import ACTIONS, VecSnakeEnv
+
+
+def test_matches_snake_engine_on_the_same_actions():
+    # Each game runs next to a SnakeEngine taking the same turns, with the
+    # engine's food moved to wherever the batch put it
+    envs = 64
+    env = VecSnakeEnv(envs, 7, 6, seed=3)
+    env.reset()
+
+    def engine_for(i):
+        engine = SnakeEngine(7, 6)
+        engine.food = int(env.food[i])
+        return engine
+
+    engines = [engine_for(i) for i in range(envs)]
+    rng = np.random.default_rng(0)
+    finished = eaten = 0
+    for _ in range(1000):
+        actions = np.where(rng.random(envs) < 0.7, env.direction, rng.integers(0, len(ACTIONS), envs))
+        _, rewards, terminated, truncated, info = env.step(actions)
+        for i, engine in enumerate(engines):
+            engine.queue_turn(ACTIONS[actions[i]])
+            alive = engine.step()
+            if terminated[i] or truncated[i]:
+                assert alive != bool(terminated[i]) or engine.won
+                assert info["final_score"][i] == engine.score
+                finished += 1
+                engines[i] = engine_for(i)
+                continue
+            assert alive
+            if rewards[i] > 0:
+                eaten += 1
+                engine.food = int(env.food[i])
+            assert set(np.flatnonzero(env.body[i]).tolist()) == set(engine.body)
+            assert env.head[i] == engine.head
+            assert env.score[i] == engine.score
+    assert finished > 0 and eaten > 0
+
+
+def test_observation_planes():
+    env = VecSnakeEnv(4, 5, 5, seed=0)
+    obs = env.reset()
+    assert obs.shape == (4,) + env.observation_shape
+    assert (obs[:, 0].sum(axis=(1, 2)) == 1).all()
+    assert (obs[:, 1].sum(axis=(1, 2)) == 1).all()
+    assert (obs[:, 2].sum(axis=(1, 2)) == 1).all()
@@ -0,0 +1,94 @@
+import random
+
+from tetris_engine import BitboardField, Figure, column_tops, lock_rows, rows_collide, skyline_drop
+
+WIDTH, HEIGHT = 10, 20
+FULL_ROW = (1 << WIDTH) - 1
+
+
+def random_rows(rng):
+    rows = [0] * HEIGHT
+    for i in range(rng.randrange(4, HEIGHT), HEIGHT):
+        rows[i] = FULL_ROW if rng.random() < 0.2 else rng.getrandbits(WIDTH)
+    return rows
+
+
+def drop_by_steps(rows, masks, x, y):
+    distance = 0
+    while not rows_collide(rows, FULL_ROW, masks, x, y + distance + 1):
+        distance += 1
+    return distance
+
+
+def test_rows_collide_matches_cell_by_cell_check():
+    rng = random.Random(0)
+    for _ in range(500):
+        rows = random_rows(rng)
+        piece = rng.randrange(7)
+        rotation = rng.randrange(len(Figure.ROW_MASKS[piece]))
+        x, y = rng.randrange(-3, WIDTH), rng.randrange(-2, HEIGHT)
+        expected = False
+        for i, j in Figure.CELLS[piece][rotation]:
+            col, row = x + j, y + i
+            if col < 0 or col >= WIDTH or row >= HEIGHT or (row >= 0 and rows[row] >> col & 1):
+                expected = True
+        assert rows_collide(rows, FULL_ROW, Figure.ROW_MASKS[piece][rotation], x, y) == expected
+
+
+def test_lock_rows_matches_the_field():
+    rng = random.Random(1)
+    for _ in range(300):
+        field = BitboardField(HEIGHT, WIDTH)
+        field.restore(random_rows(rng), [(0,) * WIDTH] * HEIGHT, 0)
+        field.clear_rows(field.full_rows())
+        piece = rng.randrange(7)
+        rotation = rng.randrange(len(Figure.ROW_MASKS[piece]))
+        masks = Figure.ROW_MASKS[piece][rotation]
+        x = rng.randrange(-1, WIDTH - 1)
+        if rows_collide(field.rows, FULL_ROW, masks, x, 0):
+            continue
+        y = drop_by_steps(field.rows, masks, x, 0)
+
+        new_rows, cleared = lock_rows(field.rows, FULL_ROW, masks, x, y)
+        field.place(masks, x, y, 1)
+        lines = field.full_rows()
+        field.clear_rows(lines)
+
+        assert cleared == len(lines)
+        assert new_rows == field.rows
+
+
+def test_field_keeps_column_tops_up_to_date():
+    rng = random.Random(2)
+    field = BitboardField(HEIGHT, WIDTH)
+    for _ in range(400):
+        piece = rng.randrange(7)
+        rotation = rng.randrange(len(Figure.ROW_MASKS[piece]))
+        masks = Figure.ROW_MASKS[piece][rotation]
+        x = rng.randrange(-1, WIDTH - 1)
+        if rows_collide(field.rows, FULL_ROW, masks, x, 0):
+            field.reset()
+            continue
+        field.place(masks, x, drop_by_steps(field.rows, masks, x, 0), 1)
+        field.clear_rows(field.full_rows())
+        assert field.tops == column_tops(field.rows, WIDTH)
+
+
+def test_column_tops_and_skyline_drop():
+    rng = random.Random(3)
+    for _ in range(500):
+        rows = random_rows(rng)
+        tops = column_tops(rows, WIDTH)
+        for j in range(WIDTH):
+            filled = [i for i in range(HEIGHT) if rows[i] >> j & 1]
+            assert tops[j] == (filled[0] if filled else HEIGHT)
+
+        piece = rng.randrange(7)
+        rotation = rng.randrange(len(Figure.ROW_MASKS[piece]))
+        masks = Figure.ROW_MASKS[piece][rotation]
+        x = rng.randrange(-1, WIDTH - 1)
+        if rows_collide(rows, FULL_ROW, masks, x, 0):
+            continue
+        distance = skyline_drop(tops, Figure.BOTTOMS[piece][rotation], x, 0)
+        if distance is not None:
+            assert distance == drop_by_steps(rows, masks, x, 0)
@@ -0,0 +1,54 @@
+from tetris_bot import TetrisBot
+from tetris_engine import SnapshotHistory, Tetris
+
+
+def practice_game(pieces):
+    game = Tetris(20, 10, line_clear_frames=0, seed=7)
+    game.new_figure()
+    game.enable_history()
+    bot = TetrisBot()
+    snapshots = [game.snapshot()]
+    for _ in range(pieces):
+        bot.play_piece(game)
+        snapshots.append(game.snapshot())
+    return game, snapshots
+
+
+def test_undo_then_redo_gives_back_the_same_snapshot():
+    game, snapshots = practice_game(12)
+
+    for expected in reversed(snapshots[:-1]):
+        assert game.undo()
+        assert game.snapshot() == expected
+    assert not game.undo()
+
+    for expected in snapshots[1:]:
+        assert game.redo()
+        assert game.snapshot() == expected
+    assert not game.redo()
+
+
+def test_game_continues_identically_after_undo():
+    game, snapshots = practice_game(6)
+    game.undo()
+    bot = TetrisBot()
+    bot.play_piece(game)
+    assert game.snapshot() == snapshots[-1]
+
+
+def test_snapshots_share_unchanged_rows():
+    game, snapshots = practice_game(3)
+    before, after = snapshots[-2], snapshots[-1]
+    shared = sum(a is b for a, b in zip(before.colors, after.colors))
+    assert shared >= len(before.colors) - 4
+
+
+def test_history_drops_redo_on_push_and_keeps_size():
+    history = SnapshotHistory(size=3)
+    for state in "abcd":
+        history.push(state)
+    assert list(history.done) == ["b", "c", "d"]
+    assert history.undo() == "c"
+    history.push("e")
+    assert history.redo() is None
+    assert history.current() == "e"
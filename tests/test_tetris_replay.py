@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from tetris_bot import TetrisBot
+from tetris_engine import Tetris
+from tetris_replay import Replay, ReplayRecorder, verify_score
+from varint import read_varint, write_varint
+
+
+def play(seed, frames=3000):
+    # The bot clears lines; random inputs on random frames cover the timing
+    game = Tetris(20, 10, seed=seed)
+    game.new_figure()
+    recorder = ReplayRecorder(game)
+    bot = TetrisBot()
+    rng = random.Random(seed)
+    while game.frame < frames and game.state == "start":
+        if rng.random() < 0.05:
+            game.apply(rng.choice(("move_left", "move_right", "rotate_cw", "soft_drop")))
+        elif rng.random() < 0.3:
+            bot.step(game)
+        game.update()
+    return game, recorder
+
+
+def test_varint_round_trip():
+    out = bytearray()
+    values = [0, 1, 127, 128, 300, 2 ** 32 - 1, 2 ** 70]
+    for value in values:
+        write_varint(out, value)
+    assert out[:3] == bytes([0, 1, 127])
+
+    pos = 0
+    for value in values:
+        decoded, pos = read_varint(bytes(out), pos)
+        assert decoded == value
+    assert pos == len(out)
+    with pytest.raises(ValueError):
+        read_varint(bytes([0x80]), 0)
+
+
+def test_negative_varint_is_rejected():
+    with pytest.raises(ValueError):
+        write_varint(bytearray(), -1)
+
+
+def test_replay_reproduces_the_game():
+    for seed in (1, 2, 3):
+        game, recorder = play(seed)
+        data = recorder.get_replay().to_bytes()
+        replay = Replay.from_text(Replay.from_bytes(data).to_text())
+
+        replayed = replay.run()
+        assert replayed.score == game.score
+        assert replayed.field.rows == game.field.rows
+        assert replayed.frame == game.frame
+        assert replayed.stats.pieces_placed == game.stats.pieces_placed
+        assert replayed.stats.lines_cleared == game.stats.lines_cleared > 0
+        assert verify_score(replay, game.score)
+
+
+def test_undo_stops_the_recording():
+    game = Tetris(20, 10, seed=5)
+    game.new_figure()
+    game.enable_history()
+    ReplayRecorder(game)
+    game.apply("hard_drop")
+    game.update()
+    assert game.undo()
+    assert game.recorder is None
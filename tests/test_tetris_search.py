@@ -0,0 +1,17 @@
+import pytest
+
+from tetris_bot import play_game
+from tetris_search import MIN_TABLE_SIZE, SearchBot, TranspositionTable
+
+
+def test_search_survives_evictions_within_one_decision():
+    bot = SearchBot(time_budget=1.0, max_depth=2)
+    bot.table.capacity = 20  # Fewer entries than the moves of one piece
+    game = play_game(bot, seed=0, max_pieces=20)
+    assert game.stats.pieces_placed == 20
+    assert bot.average_depth == 2
+
+
+def test_table_size_has_a_minimum():
+    with pytest.raises(ValueError):
+        TranspositionTable(MIN_TABLE_SIZE - 1)